@@ -0,0 +1,83 @@
+"""
+Memory benchmark for the per-player galaxy objects.
+
+Reports, with tracemalloc, the bytes allocated per Hex, per Planet (with
+its slots, defense and build queue) and per fully materialized player
+galaxy, plus the shallow size of each instance (object + its __dict__ if
+it has one).
+
+Run from the repo root:
+    python -m benchmarks.bench_memory [--size 20] [--count 2000]
+"""
+import argparse
+import gc
+import random
+import sys
+import tracemalloc
+from core.registry import load_registry
+from core.galaxy.galaxy_map import GalaxyMap
+from core.galaxy.hex import Hex
+from core.galaxy.star_system import StarSystem
+from core.planet import Planet
+from core.slot import Slot
+from core.buildqueue import BuildOrder
+from core.defense import DefenseUnit, DefenseLayer
+
+
+def allocated(build):
+    """(result, bytes still allocated after build() returns)."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def shallow(obj):
+    size = sys.getsizeof(obj)
+    if hasattr(obj, "__dict__"):
+        size += sys.getsizeof(obj.__dict__)
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=20, help="galaxy width/height (players get 20x20)")
+    parser.add_argument("--count", type=int, default=2000, help="objects per micro-benchmark")
+    parser.add_argument("--seed", type=int, default=1234)
+    args = parser.parse_args()
+
+    load_registry()
+    random.seed(args.seed)
+    rng = random.Random(args.seed)
+    n = args.count
+
+    hexes, hex_bytes = allocated(lambda: [Hex(i, -i, feature="empty") for i in range(n)])
+    planets, planet_bytes = allocated(lambda: [Planet(rng=rng) for _ in range(n)])
+    slots = sum(len(p.slots) for p in planets)
+
+    def build_galaxy():
+        galaxy = GalaxyMap(args.size, args.size, seed=args.seed)
+        list(galaxy.all_hexes())   # materialize every chunk, like a player browsing the whole map
+        return galaxy
+    galaxy, galaxy_bytes = allocated(build_galaxy)
+    galaxy_planets = sum(
+        len(h.contents.planets) for h in galaxy.all_hexes() if h.feature == "star_system" and h.contents
+    )
+
+    print(f"Hex        {hex_bytes / n:8.0f} B allocated  {shallow(hexes[0]):5d} B shallow")
+    print(f"Planet     {planet_bytes / n:8.0f} B allocated  {shallow(planets[0]):5d} B shallow "
+          f"(incl. {slots / n:.1f} slots, defense, build queue)")
+    print(f"Slot       {'':>8}              {shallow(planets[0].slots[0]):5d} B shallow")
+    print(f"StarSystem {'':>8}              {shallow(StarSystem(planets=[])):5d} B shallow")
+    print(f"BuildOrder {'':>8}              {shallow(BuildOrder('x', 1, {}, 'building', {}, slot=Slot())):5d} B shallow")
+    print(f"DefenseUnit{'':>8}              {shallow(DefenseUnit('x', 'x', DefenseLayer.GROUND, 1, 1)):5d} B shallow")
+    print(f"Galaxy {args.size}x{args.size}: {galaxy_bytes / 1024:8.1f} KiB allocated "
+          f"({galaxy_bytes / (args.size * args.size):.0f} B per hex, {galaxy_planets} planets)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Pathfinding benchmark on generated galaxies.
+
+Compares plain A* (Pathfinder.astar) with Pathfinder.find_path, cold (clusters
+built on the fly), warm (clusters already built, path cache missed: the same
+queries reversed) and cached, on random long-distance queries. The cost
+ratio is find_path's path cost over the exact A* cost.
+
+Run from the repo root:
+    python -m benchmarks.bench_pathfinding [--sizes 100 200 400] [--queries 50]
+"""
+import argparse
+import random
+import time
+from core.registry import load_registry
+from core.galaxy.galaxy_map import GalaxyMap
+from core.galaxy.pathfinding import INF, CostField
+
+
+def random_queries(field, count, min_distance, rng):
+    passable = []
+    while len(passable) < count * 8:
+        q = rng.randrange(field.width)
+        r = rng.randrange(field.height) - q // 2
+        if field.cost(q, r) < INF:
+            passable.append((q, r))
+    queries = []
+    while len(queries) < count:
+        start, goal = rng.sample(passable, 2)
+        if abs(start[0] - goal[0]) + abs(start[1] - goal[1]) >= min_distance:
+            queries.append((start, goal))
+    return queries
+
+
+def timed(fn, queries):
+    t0 = time.perf_counter()
+    paths = [fn(start, goal) for start, goal in queries]
+    return time.perf_counter() - t0, paths
+
+
+def bench(size, shape, count, seed):
+    galaxy = GalaxyMap(size, size, shape=shape, seed=seed)
+    pathfinder = galaxy.pathfinder()
+    queries = random_queries(CostField(galaxy.grid), count, size // 2, random.Random(seed))
+    reversed_queries = [(goal, start) for start, goal in queries]
+
+    pathfinder.stats["expanded"] = 0
+    t_astar, exact = timed(pathfinder.astar, queries)
+    astar_expanded = pathfinder.stats["expanded"]
+
+    pathfinder.stats["expanded"] = 0
+    t_cold, found = timed(pathfinder.find_path, queries)
+    hpa_expanded = pathfinder.stats["expanded"]
+    t_warm, _ = timed(pathfinder.find_path, reversed_queries)
+    t_cached, _ = timed(pathfinder.find_path, queries)
+
+    ratios = [
+        pathfinder.path_cost(h) / pathfinder.path_cost(e)
+        for e, h in zip(exact, found) if e and h and len(e) > 1
+    ]
+    ms = 1000.0 / count
+    print(
+        f"{size:>4}x{size:<4} {shape:<10} "
+        f"A* {t_astar * ms:7.2f} ms ({astar_expanded // count:>6} nodes) | "
+        f"find_path cold {t_cold * ms:7.2f} ms ({hpa_expanded // count:>6} nodes), warm {t_warm * ms:6.2f} ms | "
+        f"cached {t_cached * ms * 1000:6.1f} us | "
+        f"cost ratio avg {sum(ratios) / max(len(ratios), 1):.3f} max {max(ratios, default=1.0):.3f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 200, 400])
+    parser.add_argument("--shapes", nargs="+", default=["uniform", "spiral"])
+    parser.add_argument("--queries", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=1234)
+    args = parser.parse_args()
+
+    load_registry()
+    for size in args.sizes:
+        for shape in args.shapes:
+            bench(size, shape, args.queries, args.seed)
+
+
+if __name__ == "__main__":
+    main()
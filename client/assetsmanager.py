@@ -1,4 +1,5 @@
 import os
+import glob
 import json
 import pygame
 import time
@@ -40,6 +41,7 @@ class AssetsManager:
         self.assets = {}
         self.base_path = base_path
         self.online_mode = online_mode
+        self._planet_gif_variants = {}  # planet_type_id -> sorted list of GIF paths
 
     # ------------------------------
     # 🎞️ GIF Loader
@@ -94,6 +96,22 @@ class AssetsManager:
         self.assets[key] = animated_asset
         return animated_asset
 
+    def resolve_planet_gif(self, planet_type_id, variant, base_folder="assets/planets_rotation"):
+        """
+        Map a planet's rotation variant index (chosen by the server) to a GIF path.
+        Each type folder is globbed once and cached.
+        """
+        if variant is None:
+            return None
+        gifs = self._planet_gif_variants.get(planet_type_id)
+        if gifs is None:
+            type_folder = os.path.join(self.base_path, base_folder, planet_type_id)
+            gifs = sorted(glob.glob(os.path.join(type_folder, "*.gif")))
+            self._planet_gif_variants[planet_type_id] = gifs
+        if not gifs:
+            return None
+        return gifs[variant % len(gifs)]
+
     # ------------------------------
     # 🖼️ Static Image Loader
     # ------------------------------
@@ -1,8 +1,10 @@
 import pygame
+from client.map_renderer import ZOOM_LEVELS
 
 class Camera:
     def __init__(self, screen_width, screen_height, world_width, world_height, speed=20):
         self.offset = [0, 0]  # camera offset (x, y)
+        self.zoom_index = ZOOM_LEVELS.index(1.0)
         self.speed = speed
         self.turbo_speed = speed * 2
 
@@ -31,6 +33,27 @@ class Camera:
         self.clamp()
         return moved and (self.offset != old_offset)
 
+    @property
+    def zoom(self):
+        return ZOOM_LEVELS[self.zoom_index]
+
+    def zoom_at(self, steps, screen_pos, center):
+        """
+        Step through ZOOM_LEVELS (positive = in) keeping the world point under
+        `screen_pos` in place. `center` is where the map origin sits on screen
+        with no offset. Returns True if the zoom changed.
+        """
+        index = max(0, min(len(ZOOM_LEVELS) - 1, self.zoom_index + steps))
+        if index == self.zoom_index:
+            return False
+        ratio = ZOOM_LEVELS[index] / self.zoom
+        for axis in (0, 1):
+            anchor = screen_pos[axis] - center[axis]
+            self.offset[axis] = anchor - (anchor - self.offset[axis]) * ratio
+        self.zoom_index = index
+        self.clamp()
+        return True
+
     def clamp(self):
         # Prevent camera from moving beyond world boundaries
         #self.offset[0] = min(0, max(self.offset[0], self.screen_width - self.world_width))
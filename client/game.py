@@ -1,4 +1,5 @@
 import asyncio
+from client.latency import now_ms
 from core.config import *
 from core.buildings import BuildingManager
 from client.camera import Camera
@@ -46,7 +47,7 @@ class Game:
 
         if self.online:
             # Schedule async send (don't block main loop)
-            asyncio.create_task(self.send_planet_action_to_server(action, planet, data))
+            asyncio.create_task(self.send_planet_action_to_server(action, planet, data, requested_at=now_ms()))
         else:
             # Handle locally
             self.handle_planet_action_local(action, planet, data)
@@ -58,9 +59,9 @@ class Game:
         elif action == "set_mode":
             planet.mode = data
         elif action == "toggle_slot":
-            #Here data is a slot
-            if data in planet.slots:
-                data.active = not data.active
+            #Here data is the slot index
+            if 0 <= data < len(planet.slots):
+                planet.toggle_slot(data)
         
         elif action == "add_slot":
             #Here data is slot_type
@@ -74,8 +75,12 @@ class Game:
         else:
             print(f"[Game] Unknown local action: {action}")
     
-    async def send_planet_action_to_server(self, action, planet, data=None, resource=None):
-        """Online mode: send planet action request to server."""
+    async def send_planet_action_to_server(self, action, planet, data=None, resource=None, requested_at=None):
+        """
+        Online mode: send planet action request to server. The packet carries
+        a correlation ID and client timestamp; the ack echoes them with the
+        server's stage times (see client.latency).
+        """
         if not self.network or not self.network.connected:
             print("[Game] Warning: network client not connected!")
             return
@@ -89,8 +94,11 @@ class Game:
             "resource": resource,
             "player_id":self.player_id
         }
+        trace = self.network.latency.start(action, requested_at)
+        packet.update(trace)
 
         # Use the network client's dedicated method
         await self.network.send_packet(packet)
+        self.network.latency.mark_sent(trace["corr_id"])
         log.debug(f"[Game] Sent planet action '{action}' for {planet.name} to server.")    
 
@@ -5,6 +5,9 @@ from client.camera import *
 from client.ui import *
 from client.notification_panel import NotificationPanel
 from client.assetsmanager import AssetsManager
+from client.map_renderer import MapRenderer, BACKGROUND_COLOR
+
+MAP_CENTER = (500, 300)   # screen position of hex (0, 0) with no camera offset
 
 class GameGUI:
     def __init__(self, game):
@@ -56,12 +59,13 @@ class GameGUI:
         #     self.assets, 
         #     pygame.Rect(570, 60, 330, 300), #notifications_manager=self.notifications
         # )
-        self.redraw_tiles = True
+        self.map_renderer = MapRenderer(HEX_SIZE)
+        self.redraw_tiles = True   # set when hex ownership or features change: the map layer is re-rendered
 
     def render(self, dt):
         """Draw the full game scene."""
-        self.screen.fill((20, 20, 30))
-        self.draw_galaxy(center=(500, 300), hex_size=HEX_SIZE)
+        self.screen.fill(BACKGROUND_COLOR)
+        self.draw_galaxy(center=MAP_CENTER, hex_size=HEX_SIZE * self.camera.zoom)
         #draw order is important ! we draw the galaxy as background, then the pygame_gui panels, then optional, pygame elements on top of it   
         self.ui_manager.draw_ui(self.screen)
         if self.planet_mgmt_panel.panel.visible:
@@ -70,42 +74,25 @@ class GameGUI:
         self.planet_tooltip.draw(self.screen, dt)
         pygame.display.update()
     
-    def draw_galaxy(self, center=(500, 300), hex_size=HEX_SIZE, current_empire=None):
-            cam_offset = self.camera.offset            
-            if self.game.player_id:
-                current_empire=self.game.player_id
-            for hex in self.game.galaxy:
-                # print(f"self.game.player_id: {current_empire}")
-                # print(f"hex.owner_id: {hex.owner_id}")
-                # print(f"hex.reserved_id: {hex.reserved_id}")
-                points = hex.polygon(center, hex_size, cam_offset)
+    def draw_galaxy(self, center=MAP_CENTER, hex_size=HEX_SIZE, current_empire=None):
+        """Blit the pre-rendered map layer at the camera offset (see MapRenderer)."""
+        if self.game.player_id:
+            current_empire = self.game.player_id
+        if self.redraw_tiles:
+            self.map_renderer.invalidate()
+            self.redraw_tiles = False
+        self.map_renderer.hex_size = hex_size
+        self.map_renderer.draw(self.screen, self.game.galaxy, current_empire, center, self.camera.offset)
 
-                # Draw the hex border
-                color = (100, 100, 100)
-                # --- Draw fill based on feature ---
-                if hex.owner_id == current_empire:
-                    if hex.feature == "star_system":
-                        pygame.draw.polygon(self.screen, (255, 255, 0), points)
-                        hx, hy = hex.hex_to_pixel(center, hex_size, cam_offset)
-                        pygame.draw.circle(self.screen, (255, 255, 255), (int(hx), int(hy)), 6)
-                    elif hex.feature == "nebula":
-                        pygame.draw.polygon(self.screen, (100, 150, 255), points)
-                    elif hex.feature == "asteroid_field":
-                        pygame.draw.polygon(self.screen, (120, 120, 120), points)
-                    elif hex.feature == "black_hole":
-                        pygame.draw.polygon(self.screen, (0, 0, 0), points)
-                    else:
-                        pygame.draw.polygon(self.screen, (30, 30, 40), points)
-                else :
-                    pygame.draw.polygon(self.screen, (10, 10, 15), points)
-                # Border
-                pygame.draw.polygon(self.screen, (60, 60, 80), points, 1)
-    
     # def show_planet_panel(self, planet):
     #     self.planet_mgmt_panel.show(planet, self.resource_data)
     #     self.planet_slots_mgmt_panel.show(planet)
     #     self.planet_defense_mgmt_panel.show(planet)
 
+    def hex_at(self, screen_pos):
+        """Hex under a screen position at the current zoom, None outside the map."""
+        return self.map_renderer.hex_at(screen_pos, MAP_CENTER, self.camera.offset)
+
     def update(self, dt):
         """Update UI and animations."""
         self.ui_manager.update(dt)
@@ -1,4 +1,5 @@
 import pygame
+from client.gui import MAP_CENTER
 
 class InputHandler:
     def __init__(self, game, camera):
@@ -18,15 +19,20 @@ class InputHandler:
         if event.type == pygame.MOUSEBUTTONDOWN:
             if event.button == 1:  # left click
                 if not gui.tile_info_panel.visible:
-                    mouse_pos = pygame.mouse.get_pos()
-                    for h in self.game.galaxy:
-                            if h.contains_point(mouse_pos, origin=(500, 300), pixel_offset=self.camera.offset):
-                                self.selected_hextile = h
-                                return "show_tile_info_panel"
+                    # Straight pixel -> axial lookup at the current zoom, no scan over the galaxy
+                    hex = gui.hex_at(pygame.mouse.get_pos())
+                    if hex is not None:
+                        self.selected_hextile = hex
+                        return "show_tile_info_panel"
         
             elif event.button == 3:
                 return "close_window"
             
+        elif event.type == pygame.MOUSEWHEEL:
+            # Zoom the map unless the wheel is scrolling a UI panel
+            if not gui.ui_manager.get_hovering_any_element():
+                self.camera.zoom_at(event.y, pygame.mouse.get_pos(), MAP_CENTER)
+
         elif event.type == pygame.MOUSEMOTION and gui.tile_info_panel.visible:
             pos = pygame.mouse.get_pos()
             gui.tile_info_panel.draw_planet_tooltip(pos)
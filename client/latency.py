@@ -0,0 +1,111 @@
+import time
+import uuid
+from collections import OrderedDict, deque
+from core.logger_setup import get_logger
+
+log = get_logger("Latency")
+
+WINDOW = 500          # samples kept per series for percentiles
+MAX_PENDING = 256     # actions the server never acked are forgotten past this
+SUMMARY_EVERY = 50    # log percentiles every N acked actions
+
+
+def now_ms():
+    """Monotonic milliseconds. Only ever compared with the same machine's clock."""
+    return time.perf_counter() * 1000.0
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(p / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class LatencyTracker:
+    """
+    End-to-end timing of planet actions, matched to their ack by correlation ID.
+
+    Client stages (client clock):   requested -> sent -> acked -> applied
+    Server stages (server clock):   recv -> handler_start -> handler_end -> enqueue -> write
+
+    The two clocks are never compared directly: network time is the RTT
+    minus the time the server held the request (write - recv). Ping/pong
+    frames measure the bare network RTT for comparison.
+    """
+    SERIES = ("client_queue", "rtt", "server", "network", "client_apply", "ping")
+
+    def __init__(self, window=WINDOW):
+        self.pending = OrderedDict()   # corr_id -> {"action", "requested", "sent"}
+        self.samples = {name: deque(maxlen=window) for name in self.SERIES}
+        self.acked = 0
+
+    # ---------------- Actions ----------------
+    def start(self, action, requested_at=None):
+        """Register an outgoing action; returns the fields to add to its packet."""
+        corr_id = uuid.uuid4().hex[:16]
+        client_ts = now_ms()
+        self.pending[corr_id] = {"action": action, "requested": requested_at or client_ts, "sent": None}
+        while len(self.pending) > MAX_PENDING:
+            self.pending.popitem(last=False)
+        return {"corr_id": corr_id, "client_ts": client_ts}
+
+    def mark_sent(self, corr_id):
+        trace = self.pending.get(corr_id)
+        if trace is not None:
+            trace["sent"] = now_ms()
+
+    def on_ack(self, packet, received_at, applied_at=None):
+        """Close the trace of an acked action and log its per-stage breakdown (ms)."""
+        trace = self.pending.pop(packet.get("corr_id"), None)
+        if trace is None:
+            return None
+        applied_at = applied_at or now_ms()
+        sent = trace["sent"] or packet.get("client_ts") or trace["requested"]
+        server = packet.get("timing") or {}
+
+        stages = {
+            "client_queue": sent - trace["requested"],
+            "rtt": received_at - sent,
+            "client_apply": applied_at - received_at,
+        }
+        if server:
+            stages["server_queue"] = server["handler_start"] - server["recv"]
+            stages["handler"] = server["handler_end"] - server["handler_start"]
+            stages["serialize"] = server["enqueue"] - server["handler_end"]
+            stages["write_wait"] = server["write"] - server["enqueue"]
+            stages["server"] = server["write"] - server["recv"]
+            stages["network"] = max(stages["rtt"] - stages["server"], 0.0)
+        for name in self.SERIES:
+            if name in stages:
+                self.samples[name].append(stages[name])
+
+        log.debug("[Latency] %s %s: %s", trace["action"], packet.get("corr_id"),
+                  ", ".join(f"{name} {value:.1f}" for name, value in stages.items()))
+        self.acked += 1
+        if self.acked % SUMMARY_EVERY == 0:
+            log.info("[Latency] %s", self.summary_line())
+        return stages
+
+    # ---------------- Ping ----------------
+    def ping_packet(self):
+        return {"type": "ping", "client_ts": now_ms()}
+
+    def on_pong(self, packet, received_at):
+        rtt = received_at - packet["client_ts"]
+        self.samples["ping"].append(rtt)
+        return rtt
+
+    # ---------------- Stats ----------------
+    def percentiles(self, name, ps=(50, 95, 99)):
+        values = sorted(self.samples[name])
+        return {p: percentile(values, p) for p in ps}
+
+    def summary(self):
+        """{series: {50: ms, 95: ms, 99: ms}} for series with samples."""
+        return {name: self.percentiles(name) for name in self.SERIES if self.samples[name]}
+
+    def summary_line(self):
+        return " | ".join(
+            f"{name} p50 {ps[50]:.1f} p95 {ps[95]:.1f} p99 {ps[99]:.1f}" for name, ps in self.summary().items()
+        )
@@ -17,6 +17,8 @@ async def main_async():
     for hex in game.galaxy:
         if hex.feature == "star_system":
             for planet in hex.contents.planets:
+                if planet.rotation_variant is not None:
+                    planet.rotation_gif_path = gui.assets.resolve_planet_gif(planet.planet_type_id, planet.rotation_variant)
                 if planet.rotation_gif_path is not None :
                     planet.animation = gui.assets.load_gif_as_frames(
                         key = f"planet_anim_{planet.planet_type_id}_{planet.global_id}",
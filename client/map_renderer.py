@@ -0,0 +1,177 @@
+import math
+import time
+from collections import OrderedDict
+import pygame
+from core.config import HEX_SIZE
+from core.galaxy.hex import SQRT3, hex_corner_offsets, pixel_to_axial, axial_range
+from core.logger_setup import get_logger
+
+log = get_logger("MapRenderer")
+
+BACKGROUND_COLOR = (20, 20, 30)
+BORDER_COLOR = (60, 60, 80)
+UNOWNED_COLOR = (10, 10, 15)
+FEATURE_COLORS = {
+    "star_system": (255, 255, 0),
+    "nebula": (100, 150, 255),
+    "asteroid_field": (120, 120, 120),
+    "black_hole": (0, 0, 0),
+}
+EMPTY_COLOR = (30, 30, 40)
+OWNED_COLOR = (90, 90, 140)     # chunk LOD: fully owned chunk
+STAR_COLOR = (255, 255, 255)
+
+# Zoom factors the camera steps through. Discrete, so each one keeps its own tile cache.
+ZOOM_LEVELS = (0.0625, 0.125, 0.25, 0.5, 1.0, 1.5, 2.0)
+
+# Level of detail by on-screen hex size (pixels)
+DETAIL_MIN_SIZE = 8.0    # below: one flat block per hex, no borders or stars
+BLOCK_MIN_SIZE = 2.5     # below: one block per LOD cell, ownership aggregated
+LOD_CHUNK = 8            # chunk LOD: cells about LOD_CHUNK hexes wide and tall
+_CELL_W, _CELL_H = LOD_CHUNK * SQRT3, LOD_CHUNK * 1.5   # in units of hex size
+
+TILE_PX = 256            # side of one pre-rendered map tile
+MAX_TILES = 256          # tiles kept over every zoom level (256 KiB each), least recently drawn dropped first
+TILE_BUDGET = 0.005      # seconds per frame spent rendering new tiles, the rest wait for the next frames
+
+
+def lod_for(size):
+    if size >= DETAIL_MIN_SIZE:
+        return "detail"
+    if size >= BLOCK_MIN_SIZE:
+        return "blocks"
+    return "chunks"
+
+
+class MapRenderer:
+    """
+    Pre-renders the galaxy map into TILE_PX square surfaces in world pixel
+    space (hex (0, 0) centered on world (0, 0)), one set of tiles per hex
+    size. Each frame only blits the tiles under the screen at the camera
+    offset, so panning costs a handful of blits whatever the number of hexes.
+
+    A tile only visits the hexes under it: its rectangle is turned into an
+    axial range and looked up in a (q, r) index. Zoomed out, tiles switch to
+    flat blocks per hex, then to one block per cell of about LOD_CHUNK x
+    LOD_CHUNK hexes shaded by how much of it the player owns (see lod_for).
+
+    Tiles are drawn on first sight, within TILE_BUDGET per frame, and kept
+    until invalidate() (set GameGUI.redraw_tiles when ownership or features
+    change) or until the player or the galaxy changes.
+    """
+    def __init__(self, hex_size=HEX_SIZE):
+        self.hex_size = hex_size
+        self._tiles = OrderedDict()   # (hex_size, tx, ty) -> Surface
+        self._by_coords = {}          # (q, r) -> Hex
+        self._chunk_owned = {}        # (cx, cy) LOD cell -> [owned hexes, hexes]
+        self._bounds = (0.0, 0.0, 0.0, 0.0)   # map extent in units of hex size: x0, y0, x1, y1
+        self._key = None
+
+    def invalidate(self):
+        self._tiles.clear()
+        self._key = None
+
+    def _prepare(self, galaxy, empire):
+        key = (id(galaxy), len(galaxy), empire)
+        if key == self._key:
+            return
+        self._key = key
+        self._tiles.clear()
+        self._by_coords = {(hex.q, hex.r): hex for hex in galaxy}
+        self._chunk_owned = {}
+        xs, ys = [], []
+        for hex in galaxy:
+            x, y = hex.hex_to_pixel((0, 0), 1)
+            xs.append(x)
+            ys.append(y)
+            counts = self._chunk_owned.setdefault((math.floor(x / _CELL_W), math.floor(y / _CELL_H)), [0, 0])
+            counts[0] += hex.owner_id == empire
+            counts[1] += 1
+        if galaxy:
+            self._bounds = (min(xs) - 1, min(ys) - 1, max(xs) + 1, max(ys) + 1)
+        log.debug("[MapRenderer] Indexed %d hexes (%d LOD chunks)", len(galaxy), len(self._chunk_owned))
+
+    def hex_at(self, screen_pos, center, cam_offset):
+        """Hex under a screen position, None if there is none."""
+        x = screen_pos[0] - center[0] - cam_offset[0]
+        y = screen_pos[1] - center[1] - cam_offset[1]
+        return self._by_coords.get(pixel_to_axial(x, y, self.hex_size))
+
+    def visible_hexes(self, screen_rect, center, cam_offset):
+        """Hexes overlapping a screen rectangle, culled in axial coordinates."""
+        x0 = screen_rect[0] - center[0] - cam_offset[0]
+        y0 = screen_rect[1] - center[1] - cam_offset[1]
+        by_coords = self._by_coords
+        coords = axial_range(x0, y0, x0 + screen_rect[2], y0 + screen_rect[3], self.hex_size)
+        return [by_coords[c] for c in coords if c in by_coords]
+
+    # ---------------- Tiles ----------------
+    def _render_tile(self, tx, ty, empire):
+        surface = pygame.Surface((TILE_PX, TILE_PX)).convert()
+        surface.fill(BACKGROUND_COLOR)
+        size = self.hex_size
+        x0, y0 = tx * TILE_PX, ty * TILE_PX
+        lod = lod_for(size)
+        if lod == "chunks":
+            self._draw_chunks(surface, x0, y0)
+            return surface
+
+        by_coords = self._by_coords
+        block_w, block_h = math.ceil(SQRT3 * size), math.ceil(1.5 * size) + 1
+        corners = hex_corner_offsets(size)
+        star_radius = max(2, round(6 * size / HEX_SIZE))
+        for coords in axial_range(x0, y0, x0 + TILE_PX, y0 + TILE_PX, size):
+            hex = by_coords.get(coords)
+            if hex is None:
+                continue
+            x, y = hex.hex_to_pixel((-x0, -y0), size)
+            owned = hex.owner_id == empire
+            color = FEATURE_COLORS.get(hex.feature, EMPTY_COLOR) if owned else UNOWNED_COLOR
+            if lod == "blocks":
+                surface.fill(color, (x - block_w / 2, y - block_h / 2, block_w, block_h))
+                continue
+            points = [(x + dx, y + dy) for dx, dy in corners]
+            pygame.draw.polygon(surface, color, points)
+            if owned and hex.feature == "star_system":
+                pygame.draw.circle(surface, STAR_COLOR, (int(x), int(y)), star_radius)
+            pygame.draw.polygon(surface, BORDER_COLOR, points, 1)
+        return surface
+
+    def _draw_chunks(self, surface, x0, y0):
+        """One block per LOD cell, from unowned to OWNED_COLOR by the share of its hexes the player owns."""
+        cell_w, cell_h = _CELL_W * self.hex_size, _CELL_H * self.hex_size
+        for (cx, cy), (owned, total) in self._chunk_owned.items():
+            x, y = cx * cell_w - x0, cy * cell_h - y0
+            if x + cell_w < 0 or y + cell_h < 0 or x > TILE_PX or y > TILE_PX:
+                continue
+            share = owned / total
+            color = tuple(round(u + (o - u) * share) for u, o in zip(UNOWNED_COLOR, OWNED_COLOR))
+            surface.fill(color, (math.floor(x), math.floor(y), math.ceil(cell_w) + 1, math.ceil(cell_h) + 1))
+
+    def draw(self, screen, galaxy, empire, center, cam_offset):
+        """Blit the visible part of the map; world (0, 0) lands on `center` + `cam_offset`."""
+        self._prepare(galaxy, empire)
+        origin_x = center[0] + cam_offset[0]
+        origin_y = center[1] + cam_offset[1]
+        width, height = screen.get_size()
+        size = self.hex_size
+        deadline = time.perf_counter() + TILE_BUDGET
+        # Tiles under the screen, clipped to the map's extent
+        bx0, by0, bx1, by1 = (bound * size for bound in self._bounds)
+        tx0 = math.floor(max(-origin_x, bx0) / TILE_PX)
+        tx1 = math.floor(min(width - origin_x, bx1) / TILE_PX)
+        ty0 = math.floor(max(-origin_y, by0) / TILE_PX)
+        ty1 = math.floor(min(height - origin_y, by1) / TILE_PX)
+        for tx in range(tx0, tx1 + 1):
+            for ty in range(ty0, ty1 + 1):
+                key = (size, tx, ty)
+                tile = self._tiles.get(key)
+                if tile is None:
+                    if time.perf_counter() > deadline:
+                        continue   # drawn on a later frame
+                    tile = self._tiles[key] = self._render_tile(tx, ty, empire)
+                    while len(self._tiles) > MAX_TILES:
+                        self._tiles.popitem(last=False)
+                else:
+                    self._tiles.move_to_end(key)
+                screen.blit(tile, (origin_x + tx * TILE_PX, origin_y + ty * TILE_PX))
@@ -4,11 +4,12 @@ import msgpack
 from core.galaxy.hex import Hex
 from core.config import FEATURE_NAMES
 from server.hexcordencoder import ext_decoder
-from core.registry import registry_from_dict, REGISTRY
+from core.registry import registry_from_dict, apply_registry_delta, REGISTRY
 from client.assetsmanager import AssetsManager
 from core.logger_setup import get_logger
-from core.slot import Slot
+from core.slot import Slot, SlotArray
 from client.client_config import load_client_config, save_client_config
+from client.latency import LatencyTracker, now_ms
 
 log = get_logger("NetworkClient")
 
@@ -18,6 +19,7 @@ class NetworkClient:
         self.server_port = server_port
         self.client_galaxy = []   # replaces planets[]
         self.connected = False
+        self.latency = LatencyTracker()
 
     async def connect(self):
         self.reader, self.writer = await asyncio.open_connection(
@@ -96,7 +98,8 @@ class NetworkClient:
         hex_data_list = packet.get("galaxy", []).get("grid", [])
         #print(f"hex_data_list: {hex_data_list}")
         # Convert hexes to Hex objects
-        self.client_galaxy = [Hex.from_dict(h) for h in hex_data_list]
+        planet_types = {}
+        self.client_galaxy = [Hex.from_dict(h, planet_types=planet_types) for h in hex_data_list]
 
 
         #if msg_type == "full_sync" and "hexes" in full_sync:
@@ -111,6 +114,7 @@ class NetworkClient:
 
         # Step 3️⃣: Start listening for updates
         asyncio.create_task(self.listen())
+        asyncio.create_task(self.ping_loop())
     
     # =============================
     # Listen for incoming messages
@@ -122,9 +126,10 @@ class NetworkClient:
                 raw_len = await self.reader.readexactly(4)
                 msg_len = int.from_bytes(raw_len, "big")
                 data = await self.reader.readexactly(msg_len)
+                received_at = now_ms()
                 packet = msgpack.unpackb(data, raw=False)
 
-                await self.handle_packet(packet)
+                await self.handle_packet(packet, received_at)
 
         except asyncio.IncompleteReadError:
             log.warning("Connection closed by server.")
@@ -143,7 +148,7 @@ class NetworkClient:
     # =============================
     # Packet dispatcher
     # =============================
-    async def handle_packet(self, packet):
+    async def handle_packet(self, packet, received_at=None):
         ptype = packet.get("type")
 
         if ptype == "delta":
@@ -151,9 +156,19 @@ class NetworkClient:
         elif ptype == "planet_update":
             log.debug("Received ack packet from server, update local planet...")
             self.update_local_planet(packet)
+            if received_at is not None:
+                self.latency.on_ack(packet, received_at)
+        elif ptype == "pong":
+            if received_at is not None:
+                self.latency.on_pong(packet, received_at)
         elif ptype == "planet_resource_update":
             log.debug("Received planet resource update from server")
             self.update_local_planet_resource(packet)
+        elif ptype == "registry_delta":
+            log.info(f"Received registry delta (server version {packet.get('version')})")
+            apply_registry_delta(packet["delta"])
+            if hasattr(self, "on_registry_changed"):
+                self.on_registry_changed(packet["delta"])
         else:
             log.debug(f"Unhandled packet type: {ptype}")
 
@@ -233,7 +248,8 @@ class NetworkClient:
 
         # Update slots
         if "slots" in new_state:
-            planet.slots = [Slot.from_dict(s) for s in new_state["slots"]]
+            planet.slots = SlotArray.from_dicts(new_state["slots"])
+            planet._rebuild_slot_counters()
 
         # Update resources
         if "resources" in new_state:
@@ -298,6 +314,15 @@ class NetworkClient:
         self.writer.write(len(packed).to_bytes(4, "big") + packed)
         await self.writer.drain()
 
+    async def ping_loop(self, interval=5):
+        """Measure the bare network round trip every `interval` seconds."""
+        while self.connected:
+            await asyncio.sleep(interval)
+            try:
+                await self.send_packet(self.latency.ping_packet())
+            except (ConnectionResetError, BrokenPipeError):
+                break
+
     async def receive_deltas(self):
         while True:
             try:
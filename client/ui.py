@@ -1697,7 +1697,8 @@ class SlotsManagement(pygame_gui.elements.UIPanel):
                         slots_of_type = [s for s in self.selected_planet.slots if s.type == slot_type]
                         if slot_index < len(slots_of_type):
                             slot = slots_of_type[slot_index]
-                            self.on_action("toggle_slot", self.selected_planet, slot)
+                            # Send the slot's index: Slot objects can't go through msgpack
+                            self.on_action("toggle_slot", self.selected_planet, self.selected_planet.slots.index(slot))
                     return True
 
         return handled
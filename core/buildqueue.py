@@ -3,6 +3,8 @@ from core.logger_setup import get_logger
 log = get_logger("BuildQueue")
 
 class BuildOrder:
+    __slots__ = ("item_name", "build_time", "cost", "category", "data", "progress", "completed", "slot")
+
     def __init__(self, item_name, build_time, cost, category, data, slot=None):
         self.item_name = item_name
         self.build_time = build_time
@@ -0,0 +1,244 @@
+import numpy as np
+from core.defense import DefenseLayer
+from core.registry import register_derived, derived
+from core.logger_setup import get_logger
+
+log = get_logger("Combat")
+
+MAX_ROUNDS = 50
+DEFENSE_SCALE = 100.0       # a unit with defense 100 takes twice the damage to kill
+DAMAGE_SPREAD = 0.2         # each side's damage rolls in [1 - spread, 1 + spread] per round
+LAYERS = list(DefenseLayer)  # fought in this order: DEEP_SPACE first, GROUND last
+
+ATTACKER_WINS = "attacker"
+DEFENDER_WINS = "defender"
+DRAW = "draw"
+
+# splitmix64 constants
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+_MIX1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX2 = np.uint64(0x94D049BB133111EB)
+
+
+def _uniform(seeds, round_, side):
+    """
+    Counter-based random numbers in [0, 1): one per battle, a pure function
+    of (battle seed, round, side). A battle replays identically whatever
+    else is in the batch.
+    """
+    with np.errstate(over="ignore"):
+        z = seeds * _GOLDEN + np.uint64(round_ * 2 + side + 1) * _MIX2
+        z = (z ^ (z >> np.uint64(30))) * _MIX1
+        z = (z ^ (z >> np.uint64(27))) * _MIX2
+        z = z ^ (z >> np.uint64(31))
+    return (z >> np.uint64(11)).astype(np.float64) * (1.0 / (1 << 53))
+
+
+# --------------------------------------------------------------------
+# Unit table
+# --------------------------------------------------------------------
+class CombatUnits:
+    """
+    Combat stats of every defense and offense unit as arrays over one
+    column index, rebuilt with the registry:
+      offense[u]   damage dealt per unit per round
+      toughness[u] damage needed to kill one unit: hp * (1 + defense / DEFENSE_SCALE)
+      layer[u]     index in LAYERS the unit defends, -1 for units without one
+    """
+    def __init__(self, compiled):
+        self.version = compiled.version
+        records = list(compiled.table("defense_units").values()) + list(compiled.table("offense_units").values())
+        self.ids = [r.id for r in records]
+        self.index = {uid: i for i, uid in enumerate(self.ids)}
+        self.offense = np.array([float(r.offense) for r in records])
+        hp = np.array([max(float(r.hp), 1.0) for r in records])
+        defense = np.array([max(float(r.defense_value), 0.0) for r in records])
+        self.toughness = hp * (1.0 + defense / DEFENSE_SCALE)
+        layer_index = {layer.name: i for i, layer in enumerate(LAYERS)}
+        self.layer = np.array([layer_index.get(r.layer, -1) for r in records], dtype=np.int64)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def vector(self, counts):
+        """Count vector from {unit_id: count}; unknown IDs are ignored."""
+        vec = np.zeros(len(self.ids))
+        for uid, count in counts.items():
+            i = self.index.get(uid)
+            if i is None:
+                log.warning(f"[Combat] Unknown unit '{uid}' ignored")
+                continue
+            vec[i] += count
+        return vec
+
+    def counts(self, vector):
+        """{unit_id: count} of the non-zero entries of a count vector."""
+        return {self.ids[i]: int(vector[i]) for i in np.flatnonzero(vector).tolist()}
+
+
+register_derived("combat_units", CombatUnits)
+
+
+def get_combat_units():
+    return derived("combat_units")
+
+
+# --------------------------------------------------------------------
+# Batched resolver
+# --------------------------------------------------------------------
+def resolve_arrays(attackers, defenders, seeds, units=None, max_rounds=MAX_ROUNDS):
+    """
+    Resolve B battles at once. attackers/defenders: (B, U) unit counts in
+    CombatUnits column order; seeds: (B,) integers. Defenders only fight
+    on their own layer; attackers fight whichever layer is current, moving
+    down once it is cleared.
+
+    Each round, both sides roll their damage and spread it over the
+    opposing units in proportion to their share of the total toughness.
+    Partial damage carries over to the next round, so small forces still
+    wear down big units.
+
+    Returns (attackers, defenders, outcome, rounds, layer_reached) where
+    the first two are the surviving counts and outcome is 1 (attacker
+    won), -1 (defender won) or 0 (draw after max_rounds).
+    """
+    units = units or get_combat_units()
+    attackers = np.array(attackers, dtype=np.float64)
+    defenders = np.array(defenders, dtype=np.float64)
+    seeds = np.asarray(seeds, dtype=np.int64).astype(np.uint64)
+    count = attackers.shape[0]
+    n_layers = len(LAYERS)
+
+    layer_of = units.layer
+    layer_masks = np.stack([layer_of == i for i in range(n_layers)])   # (L, U)
+    attacker_carry = np.zeros_like(attackers)
+    defender_carry = np.zeros_like(defenders)
+    rounds = np.zeros(count, dtype=np.int64)
+    outcome = np.zeros(count, dtype=np.int64)
+
+    def current_layers():
+        # First layer with defenders left, n_layers if none
+        remaining = defenders @ layer_masks.T.astype(np.float64)        # (B, L)
+        has_units = remaining > 0
+        return np.where(has_units.any(axis=1), has_units.argmax(axis=1), n_layers)
+
+    layer = current_layers()
+    ongoing = np.ones(count, dtype=np.bool_)
+    for round_ in range(max_rounds):
+        ongoing &= (layer < n_layers) & (attackers.sum(axis=1) > 0)
+        if not ongoing.any():
+            break
+        rows = np.flatnonzero(ongoing)
+        rounds[rows] += 1
+        att = attackers[rows]
+        dfn = defenders[rows]
+        active = layer_masks[layer[rows]]                                # (b, U) defenders on the current layer
+        engaged = dfn * active
+
+        spread = 2.0 * DAMAGE_SPREAD
+        att_roll = 1.0 - DAMAGE_SPREAD + spread * _uniform(seeds[rows], round_, 0)
+        def_roll = 1.0 - DAMAGE_SPREAD + spread * _uniform(seeds[rows], round_, 1)
+        att_damage = (att @ units.offense) * att_roll                     # (b,)
+        def_damage = (engaged @ units.offense) * def_roll
+
+        # Both sides hit simultaneously
+        defenders[rows] -= _casualties(engaged, att_damage, defender_carry, rows, units.toughness)
+        attackers[rows] -= _casualties(att, def_damage, attacker_carry, rows, units.toughness)
+        layer[rows] = current_layers()[rows]
+
+    attackers_alive = attackers.sum(axis=1) > 0
+    outcome[(layer >= n_layers) & attackers_alive] = 1
+    outcome[~attackers_alive] = -1
+    return attackers, defenders, outcome, rounds, layer
+
+
+def _casualties(targets, damage, carry, rows, toughness):
+    """Units killed when `damage` (b,) is spread over `targets` (b, U) by toughness share."""
+    pool = targets * toughness
+    total = pool.sum(axis=1, keepdims=True)
+    share = np.divide(pool, total, out=np.zeros_like(pool), where=total > 0)
+    carried = carry[rows] + share * damage[:, None]
+    killed = np.minimum(np.floor(carried / toughness), targets)
+    carried -= killed * toughness
+    carried[targets - killed <= 0] = 0.0   # nothing left to carry damage over to
+    carry[rows] = carried
+    return killed
+
+
+# --------------------------------------------------------------------
+# Battle objects
+# --------------------------------------------------------------------
+class Battle:
+    """An attack on a planet: attacker units {unit_id: count} against a PlanetDefense."""
+    def __init__(self, attackers, defense, seed=0, planet=None):
+        self.attackers = dict(attackers)
+        self.defense = defense
+        self.seed = seed
+        self.planet = planet
+
+
+class BattleResult:
+    def __init__(self, battle, outcome, rounds, layer_reached, attacker_losses, defender_losses):
+        self.battle = battle
+        self.outcome = outcome                  # ATTACKER_WINS / DEFENDER_WINS / DRAW
+        self.rounds = rounds
+        self.layer_reached = layer_reached      # DefenseLayer the fight ended on, None if every layer fell
+        self.attacker_losses = attacker_losses  # {unit_id: count}
+        self.defender_losses = defender_losses
+
+    def apply(self):
+        """Remove the defender's losses from the battle's PlanetDefense."""
+        for unit_id, count in self.defender_losses.items():
+            self.battle.defense.remove_unit(unit_id, count)
+
+    def to_dict(self):
+        return {
+            "outcome": self.outcome,
+            "rounds": self.rounds,
+            "layer_reached": self.layer_reached.name if self.layer_reached else None,
+            "attacker_losses": self.attacker_losses,
+            "defender_losses": self.defender_losses,
+            "seed": self.battle.seed,
+        }
+
+    def __repr__(self):
+        return f"<BattleResult {self.outcome} in {self.rounds} rounds>"
+
+
+_OUTCOMES = {1: ATTACKER_WINS, -1: DEFENDER_WINS, 0: DRAW}
+
+
+def resolve_battles(battles, max_rounds=MAX_ROUNDS, apply=False):
+    """
+    Resolve a list of Battle in one vectorized pass; returns a BattleResult
+    per battle. With apply=True, defender losses are removed from each
+    planet's defense.
+    """
+    if not battles:
+        return []
+    units = get_combat_units()
+    attackers = np.stack([units.vector(b.attackers) for b in battles])
+    defenders = np.stack([
+        units.vector({uid: n for counts in b.defense.units.values() for uid, n in counts.items()})
+        for b in battles
+    ])
+    seeds = [b.seed for b in battles]
+    att_left, def_left, outcome, rounds, layer = resolve_arrays(attackers, defenders, seeds, units, max_rounds)
+
+    att_lost = attackers - att_left
+    def_lost = defenders - def_left
+    results = []
+    for i, battle in enumerate(battles):
+        result = BattleResult(
+            battle,
+            _OUTCOMES[int(outcome[i])],
+            int(rounds[i]),
+            LAYERS[layer[i]] if layer[i] < len(LAYERS) else None,
+            units.counts(att_lost[i]),
+            units.counts(def_lost[i]),
+        )
+        if apply:
+            result.apply()
+        results.append(result)
+    log.debug(f"[Combat] Resolved {len(battles)} battles ({int((outcome == 1).sum())} planets fell)")
+    return results
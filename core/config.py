@@ -81,6 +81,15 @@ PLANET_TYPE_IDS = {
     "symbiotic":9
 }
 
+# Movement cost to enter a hex of each feature (None = impassable)
+FEATURE_MOVE_COSTS = {
+    "star_system": 1.0,
+    "empty": 1.0,
+    "nebula": 2.0,         # sensor interference, slow going
+    "asteroid_field": 3.0,
+    "black_hole": None
+}
+
 # Reverse lookup for client
 FEATURE_NAMES = {v: k for k, v in FEATURE_IDS.items()}
 PLANET_TYPE_NAMES = {v: k for k, v in PLANET_TYPE_IDS.items()}
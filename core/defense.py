@@ -1,7 +1,7 @@
 import json
 from enum import Enum
-from collections import defaultdict
-from core.registry import REGISTRY
+from collections import defaultdict, Counter
+from core.registry import compiled_registry, registry_version
 from core.logger_setup import get_logger
 
 log = get_logger("Defense")
@@ -18,6 +18,8 @@ class DefenseLayer(Enum):
 
 # Base class
 class DefenseUnit:
+    __slots__ = ("id", "name", "layer", "defense_value", "upkeep", "power_use", "industry_cost", "credit_cost")
+
     def __init__(self, id, name, layer, defense_value, upkeep, power_use=0, industry_cost=100, credit_cost=100):
         self.id=id
         self.name = name
@@ -50,56 +52,124 @@ def load_defense_units(json_file="data/defense_units.json"):
     return units
 
 class PlanetDefense:
+    """
+    Defense units of a planet as per-layer counters of unit IDs, with
+    running defense totals (per layer and overall) and upkeep totals kept
+    up to date by add_unit/remove_unit, so reads are O(1).
+    Totals are recomputed once if the registry was reloaded since.
+    """
     def __init__(self):
-        # Dict[layer -> list of DefenseUnit]
-        self.units = defaultdict(list)
+        self.units = defaultdict(Counter)   # DefenseLayer -> Counter{unit_id: count}
+        self.layer_defense = Counter()      # DefenseLayer -> total defense value
+        self.total_defense = 0
+        self.upkeep = Counter()             # resource -> total upkeep per tick
+        self._registry_version = registry_version()
+
+    @staticmethod
+    def _record(unit_id):
+        return compiled_registry().get(unit_id, "defense_units")
+
+    @staticmethod
+    def _layer(layer):
+        return layer if isinstance(layer, DefenseLayer) else DefenseLayer[layer]
+
+    def _apply(self, layer, record, count):
+        """Add `count` (negative to remove) units' stats to the running totals."""
+        value = record.defense_value * count if record else 0
+        self.layer_defense[layer] += value
+        self.total_defense += value
+        if record:
+            for resource, amount in record.upkeep.items():
+                self.upkeep[resource] += amount * count
+
+    def _sync(self):
+        # Unit stats changed with a registry reload: rebuild the totals once
+        if self._registry_version == registry_version():
+            return
+        self._registry_version = registry_version()
+        self.layer_defense = Counter()
+        self.total_defense = 0
+        self.upkeep = Counter()
+        for layer, counts in self.units.items():
+            for unit_id, count in counts.items():
+                self._apply(layer, self._record(unit_id), count)
 
-    def add_unit(self, unit: DefenseUnit):
-        # store ID for serialization
-        self.units[unit.layer].append(unit.name)  # or unit.id if you have it
-    
-    def remove_unit(self, unit_id):
-        for layer, unit_ids in self.units.items():
-            if unit_id in unit_ids:
-                unit_ids.remove(unit_id)
-                return
+    # ---------------- Mutations ----------------
+    def add_unit(self, unit, count=1):
+        """Add units by DefenseUnit or unit ID (the layer comes from the registry for IDs)."""
+        self._sync()
+        unit_id = getattr(unit, "id", unit)
+        record = self._record(unit_id)
+        if isinstance(unit, DefenseUnit):
+            layer = unit.layer
+        elif record is not None and record.layer:
+            layer = DefenseLayer[record.layer]
+        else:
+            log.warning(f"[Defense] Unknown defense unit '{unit_id}'")
+            return False
+        self.units[layer][unit_id] += count
+        self._apply(layer, record, count)
+        return True
 
+    def remove_unit(self, unit_id, count=1, layer=None):
+        """Remove up to `count` units of a type (from one layer if given); returns how many were removed."""
+        self._sync()
+        layers = [self._layer(layer)] if layer is not None else list(self.units)
+        removed = 0
+        for layer in layers:
+            counts = self.units.get(layer)
+            if not counts or unit_id not in counts:
+                continue
+            n = min(count - removed, counts[unit_id])
+            counts[unit_id] -= n
+            if not counts[unit_id]:
+                del counts[unit_id]
+            if not counts:
+                del self.units[layer]
+            self._apply(layer, self._record(unit_id), -n)
+            removed += n
+            if removed == count:
+                break
+        return removed
 
+    # ---------------- Reads (O(1)) ----------------
     def get_total_defense_value(self, layer=None):
+        self._sync()
         if layer:
-            return sum(REGISTRY["defense_units"][uid]["defense_value"] for uid in self.units[layer])
-        return sum(
-            REGISTRY["defense_units"][uid]["defense_value"]
-            for unit_ids in self.units.values() for uid in unit_ids
-        )
+            return self.layer_defense[self._layer(layer)]
+        return self.total_defense
+
+    def get_upkeep(self):
+        self._sync()
+        return dict(self.upkeep)
+
+    def count(self, unit_id, layer=None):
+        if layer is not None:
+            return self.units.get(self._layer(layer), {}).get(unit_id, 0)
+        return sum(counts.get(unit_id, 0) for counts in self.units.values())
 
     def get_unit_counts(self):
-        return {layer.name: len(ids) for layer, ids in self.units.items()}
+        return {layer.name: sum(counts.values()) for layer, counts in self.units.items()}
+
+    def __len__(self):
+        return sum(sum(counts.values()) for counts in self.units.values())
 
     def to_dict(self):
         return {
-            "units": {
-                layer.name: [u.id if isinstance(u, DefenseUnit) else u for u in units]
-                for layer, units in self.units.items()
-            }
+            "units": {layer.name: dict(counts) for layer, counts in self.units.items()}
         }
 
-
     @classmethod
     def from_dict(cls, data):
+        """Accepts {layer: {unit_id: count}} and the older {layer: [unit_id, ...]} saves."""
         pd = cls()
-        for layer_name, unit_ids in data.get("units", {}).items():
+        for layer_name, units in data.get("units", {}).items():
             layer = DefenseLayer[layer_name]
-            for uid in unit_ids:
-                unit_data = REGISTRY[uid]
-                pd.units[layer].append(
-                    DefenseUnit(
-                        id=uid,
-                        name=unit_data["name"],
-                        layer=layer,
-                        defense_value=unit_data["defense_value"],
-                        upkeep=unit_data["upkeep"],
-                        power_use=unit_data.get("power_use", 0)
-                    )
-                )
+            counts = units.items() if isinstance(units, dict) else Counter(units).items()
+            for uid, count in counts:
+                if pd._record(uid) is None:
+                    log.warning(f"[Defense] Dropping unknown defense unit '{uid}'")
+                    continue
+                pd.units[layer][uid] += count
+                pd._apply(layer, pd._record(uid), count)
         return pd
@@ -0,0 +1,340 @@
+import time
+import numpy as np
+from core.config import SPECIAL_FEATURES, FEATURE_IDS
+from core.galaxy.hex import Hex
+from core.galaxy.star_system import StarSystem
+from core.logger_setup import get_logger
+
+log = get_logger("GalaxyChunks")
+
+CHUNK_SIZE = 16
+NO_FEATURE = 255  # cell outside the map (edge chunks are only partly used)
+
+
+def axial_to_offset(q, r):
+    """Axial (q, r) -> (col, row) in the map's rectangular layout."""
+    return q, r + q // 2
+
+
+def offset_to_axial(col, row):
+    return col, row - col // 2
+
+
+class GalaxyChunk:
+    """
+    CHUNK_SIZE x CHUNK_SIZE block of the map stored as compact arrays
+    indexed [local_col, local_row]. Hex objects only exist while the chunk
+    is materialized, except pinned ones (modified hexes), which stay alive
+    across evictions because they cannot be regenerated from the seed.
+    """
+    def __init__(self, cx, cy, size=CHUNK_SIZE):
+        self.cx = cx
+        self.cy = cy
+        self.size = size
+        self.feature = np.full((size, size), NO_FEATURE, dtype=np.uint8)
+        self.owner = np.zeros((size, size), dtype=np.int32)     # index into ChunkedGrid.owner_table
+        self.reserved = np.zeros((size, size), dtype=np.int32)  # idem
+        self.protected = np.zeros((size, size), dtype=np.bool_)
+        self.hexes = None       # list[Hex | None] of size*size while materialized
+        self.pinned = {}        # local index -> Hex kept across evictions
+        self.planet_ids = {}    # local index -> planet global IDs handed out, reused on re-materialization
+        self.last_access = 0.0
+
+    @property
+    def materialized(self):
+        return self.hexes is not None
+
+
+class ChunkedGrid:
+    """
+    Galaxy grid split into fixed-size chunks of compact arrays
+    (feature, owner, reserved, protected) with lazy Hex/StarSystem
+    materialization.
+
+    A chunk builds its Hex objects the first time one of its hexes is
+    requested; star systems are regenerated deterministically from the
+    generator seed. evict_cold() drops the objects of chunks idle for too
+    long, writing their ownership state back into the arrays first.
+
+    Iterating the grid (or len()) behaves like the former flat list of
+    hexes, but iterating materializes every chunk: long-running code should
+    prefer materialized_hexes() or get_hex().
+    """
+    def __init__(self, width, height, generator=None, is_pinned=None, chunk_size=CHUNK_SIZE):
+        self.width = width
+        self.height = height
+        self.generator = generator   # GalaxyGenerator; None means hexes can't be regenerated
+        self.is_pinned = is_pinned or (lambda hex: True)
+        self.chunk_size = chunk_size
+        self.chunks_x = (width + chunk_size - 1) // chunk_size
+        self.chunks_y = (height + chunk_size - 1) // chunk_size
+        self.chunks = [
+            [GalaxyChunk(cx, cy, chunk_size) for cy in range(self.chunks_y)]
+            for cx in range(self.chunks_x)
+        ]
+        self.owner_table = [0]           # owner index -> owner/reserved ID (0 = nobody)
+        self._owner_index = {0: 0}
+        self.planet_index = {}           # planet global ID -> (q, r)
+        self.version = 0                 # bumped whenever a hex is replaced
+
+    # ----------------------------------------------
+    # Construction
+    # ----------------------------------------------
+    @classmethod
+    def from_features(cls, width, height, q, r, features, generator, owner=0, reserved_id=0, protected=False, **kwargs):
+        """Fill the arrays from a GalaxyGenerator pass; nothing is materialized."""
+        grid = cls(width, height, generator=generator, **kwargs)
+        owner_idx = grid.owner_code(owner)
+        reserved_idx = grid.owner_code(reserved_id)
+        size = grid.chunk_size
+
+        # Scatter into one padded (col, row) array, then slice it into chunks
+        full = np.full((grid.chunks_x * size, grid.chunks_y * size), NO_FEATURE, dtype=np.uint8)
+        col, row = axial_to_offset(q, r)
+        full[col, row] = features
+        for chunk in grid.iter_chunks():
+            block = full[chunk.cx * size:(chunk.cx + 1) * size, chunk.cy * size:(chunk.cy + 1) * size]
+            chunk.feature[:] = block
+            used = block != NO_FEATURE
+            chunk.owner[used] = owner_idx
+            chunk.reserved[used] = reserved_idx
+            chunk.protected[used] = protected
+        return grid
+
+    @classmethod
+    def from_hexes(cls, width, height, hexes, **kwargs):
+        """
+        Wrap existing Hex objects (legacy full saves). Without a generator
+        they can't be rebuilt, so every hex is pinned.
+        """
+        hexes = list(hexes)
+        if hexes:
+            width = max(width, max(axial_to_offset(h.q, h.r)[0] for h in hexes) + 1)
+            height = max(height, max(axial_to_offset(h.q, h.r)[1] for h in hexes) + 1)
+        grid = cls(width, height, generator=None, **kwargs)
+        for hex in hexes:
+            grid.set_hex(hex)
+        return grid
+
+    def owner_code(self, owner_id):
+        """Compact index for an owner/reserved ID (player IDs are strings)."""
+        owner_id = owner_id or 0
+        idx = self._owner_index.get(owner_id)
+        if idx is None:
+            idx = len(self.owner_table)
+            self.owner_table.append(owner_id)
+            self._owner_index[owner_id] = idx
+        return idx
+
+    # ----------------------------------------------
+    # Lookup
+    # ----------------------------------------------
+    def _locate(self, q, r):
+        col, row = axial_to_offset(q, r)
+        if not (0 <= col < self.width and 0 <= row < self.height):
+            return None, None
+        size = self.chunk_size
+        chunk = self.chunks[col // size][row // size]
+        local = (col % size) * size + (row % size)
+        if chunk.feature.flat[local] == NO_FEATURE:
+            return None, None
+        return chunk, local
+
+    def get_hex(self, q, r):
+        """O(1) access to the Hex at (q, r), materializing its chunk if needed."""
+        chunk, local = self._locate(q, r)
+        if chunk is None:
+            return None
+        if chunk.hexes is None:
+            self.materialize(chunk)
+        chunk.last_access = time.monotonic()
+        return chunk.hexes[local]
+
+    def feature_at(self, q, r):
+        """Feature name at (q, r) read from the arrays (never materializes)."""
+        chunk, local = self._locate(q, r)
+        if chunk is None:
+            return None
+        return SPECIAL_FEATURES[chunk.feature.flat[local]]
+
+    def owner_at(self, q, r):
+        chunk, local = self._locate(q, r)
+        if chunk is None:
+            return None
+        hex = chunk.hexes[local] if chunk.hexes is not None else chunk.pinned.get(local)
+        if hex is not None:
+            return hex.owner_id
+        return self.owner_table[chunk.owner.flat[local]]
+
+    def find_planet(self, global_id):
+        """Planet by global ID, materializing its chunk if it was evicted."""
+        coords = self.planet_index.get(global_id)
+        if coords is None:
+            return None
+        hex = self.get_hex(*coords)
+        if hex is None or not hex.contents:
+            return None
+        for planet in hex.contents.planets:
+            if planet.global_id == global_id:
+                return planet
+        return None
+
+    # ----------------------------------------------
+    # Materialization / eviction
+    # ----------------------------------------------
+    def materialize(self, chunk):
+        size = self.chunk_size
+        hexes = [None] * (size * size)
+        built = 0
+        for local in np.flatnonzero(chunk.feature.ravel() != NO_FEATURE).tolist():
+            hex = chunk.pinned.get(local)
+            if hex is None:
+                hex = self._build_hex(chunk, local)
+                built += 1
+            hexes[local] = hex
+        chunk.hexes = hexes
+        chunk.last_access = time.monotonic()
+        log.debug(f"[Chunks] Materialized chunk ({chunk.cx}, {chunk.cy}): {built} hexes built")
+
+    def _build_hex(self, chunk, local):
+        size = self.chunk_size
+        lc, lr = divmod(local, size)
+        q, r = offset_to_axial(chunk.cx * size + lc, chunk.cy * size + lr)
+        feature = SPECIAL_FEATURES[chunk.feature.flat[local]]
+        hex = Hex(
+            q, r, feature=feature,
+            owner=self.owner_table[chunk.owner.flat[local]],
+            reserved_id=self.owner_table[chunk.reserved.flat[local]],
+            protected=bool(chunk.protected.flat[local]),
+        )
+        if feature == "star_system" and self.generator is not None:
+            hex.contents = StarSystem(hextile=hex, rng=self.generator.system_rng(q, r))
+            known_ids = chunk.planet_ids.get(local)
+            for i, planet in enumerate(hex.contents.planets):
+                if known_ids and i < len(known_ids):
+                    planet.global_id = known_ids[i]
+                self.planet_index[planet.global_id] = (q, r)
+        return hex
+
+    def _write_back(self, chunk, local, hex):
+        chunk.owner.flat[local] = self.owner_code(hex.owner_id)
+        chunk.reserved.flat[local] = self.owner_code(hex.reserved_id)
+        chunk.protected.flat[local] = bool(hex.protected)
+
+    def evict(self, chunk):
+        """Drop a chunk's Hex objects, keeping pinned (modified) hexes alive."""
+        if chunk.hexes is None:
+            return 0
+        dropped = 0
+        for local, hex in enumerate(chunk.hexes):
+            if hex is None:
+                continue
+            self._write_back(chunk, local, hex)
+            if self.is_pinned(hex):
+                chunk.pinned[local] = hex
+                continue
+            if hex.contents:
+                chunk.planet_ids[local] = [p.global_id for p in hex.contents.planets]
+            dropped += 1
+        chunk.hexes = None
+        return dropped
+
+    def evict_cold(self, max_idle=300.0):
+        """Evict every materialized chunk not accessed for `max_idle` seconds."""
+        now = time.monotonic()
+        evicted = dropped = 0
+        for chunk in self.iter_chunks():
+            if chunk.hexes is not None and now - chunk.last_access > max_idle:
+                dropped += self.evict(chunk)
+                evicted += 1
+        if evicted:
+            log.debug(f"[Chunks] Evicted {evicted} cold chunks ({dropped} hexes dropped)")
+        return evicted
+
+    # ----------------------------------------------
+    # Mutation
+    # ----------------------------------------------
+    def set_hex(self, hex):
+        """Insert or replace a hex (e.g. from a save overlay); it is pinned."""
+        col, row = axial_to_offset(hex.q, hex.r)
+        if not (0 <= col < self.width and 0 <= row < self.height):
+            raise IndexError(f"Hex ({hex.q}, {hex.r}) is outside the {self.width}x{self.height} grid")
+        size = self.chunk_size
+        chunk = self.chunks[col // size][row // size]
+        local = (col % size) * size + (row % size)
+        chunk.feature.flat[local] = FEATURE_IDS[hex.feature]
+        self._write_back(chunk, local, hex)
+        chunk.pinned[local] = hex
+        chunk.planet_ids.pop(local, None)
+        if chunk.hexes is not None:
+            chunk.hexes[local] = hex
+        if hex.contents:
+            for planet in hex.contents.planets:
+                self.planet_index[planet.global_id] = (hex.q, hex.r)
+        self.version += 1
+
+    def fill_ownership(self, owner_id=0, reserved_id=0):
+        """Set owner/reserved on every hex (arrays and materialized objects)."""
+        owner_idx = self.owner_code(owner_id)
+        reserved_idx = self.owner_code(reserved_id)
+        for chunk in self.iter_chunks():
+            chunk.owner[:] = owner_idx
+            chunk.reserved[:] = reserved_idx
+            live = list(chunk.pinned.values())
+            if chunk.hexes is not None:
+                live.extend(h for h in chunk.hexes if h is not None)
+            for hex in live:
+                hex.owner_id = owner_id
+                hex.reserved_id = reserved_id
+
+    # ----------------------------------------------
+    # Iteration
+    # ----------------------------------------------
+    def iter_chunks(self):
+        for chunk_row in self.chunks:
+            yield from chunk_row
+
+    def materialized_hexes(self):
+        """Hexes that currently exist as objects (materialized chunks + pinned), no materialization."""
+        for chunk in self.iter_chunks():
+            if chunk.hexes is not None:
+                yield from (h for h in chunk.hexes if h is not None)
+            else:
+                yield from chunk.pinned.values()
+
+    def first_with_feature(self, feature):
+        """(q, r) of the first hex with the given feature in column-major order, from the arrays."""
+        feature_id = FEATURE_IDS[feature]
+        size = self.chunk_size
+        best = None
+        for chunk in self.iter_chunks():
+            cells = np.argwhere(chunk.feature == feature_id)
+            if cells.size == 0:
+                continue
+            lc, lr = min(map(tuple, cells.tolist()))
+            candidate = (chunk.cx * size + lc, chunk.cy * size + lr)
+            if best is None or candidate < best:
+                best = candidate
+        return offset_to_axial(*best) if best else None
+
+    def stats(self):
+        materialized = sum(1 for c in self.iter_chunks() if c.hexes is not None)
+        pinned = sum(len(c.pinned) for c in self.iter_chunks())
+        return {
+            "chunks": self.chunks_x * self.chunks_y,
+            "materialized_chunks": materialized,
+            "pinned_hexes": pinned,
+            "indexed_planets": len(self.planet_index),
+        }
+
+    def __iter__(self):
+        for chunk in self.iter_chunks():
+            if chunk.hexes is None:
+                if not chunk.pinned and not (chunk.feature != NO_FEATURE).any():
+                    continue
+                self.materialize(chunk)
+            chunk.last_access = time.monotonic()
+            yield from (h for h in chunk.hexes if h is not None)
+
+    def __len__(self):
+        return int(sum((c.feature != NO_FEATURE).sum() for c in self.iter_chunks()))
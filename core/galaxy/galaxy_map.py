@@ -1,8 +1,13 @@
-import math
 import uuid
 import os
 import json
 from core.galaxy.hex import Hex
+from core.galaxy.generator import GalaxyGenerator
+from core.galaxy.chunks import ChunkedGrid
+from core.galaxy.hexgrid import hex_distance, hex_neighbors, hex_ring, hex_range
+from core.galaxy.pathfinding import Pathfinder
+from core.planet import Planet
+from core.ledger import ResourceLedger
 from core.logger_setup import get_logger
 
 log = get_logger("GalaxyMap")
@@ -10,12 +15,20 @@ log = get_logger("GalaxyMap")
 class GalaxyMap:
     """
     Generates a 2D hex grid for a galaxy map using pointy-topped axial coordinates.
+    shape/age/seed drive the vectorized GalaxyGenerator; the same seed and
+    parameters always produce the same galaxy.
+    The grid is a ChunkedGrid: compact per-chunk arrays, with Hex/StarSystem
+    objects only built for the chunks actually in use.
     """
-    def __init__(self, width, height, star_density=50, nebula_density=20, authoritative=False, protected=False, owner=0, *args, **kwargs):
+    def __init__(self, width, height, star_density=50, nebula_density=20, authoritative=False, protected=False, owner=0,
+                 shape="uniform", age="mature", seed=None, *args, **kwargs):
         self.width = width
         self.height = height
         self.star_density = star_density
         self.nebula_density = nebula_density
+        self.shape = shape
+        self.age = age
+        self.seed = seed
         self.protected=protected
         self.owner = owner
         self.global_id = str(uuid.uuid4())
@@ -23,7 +36,10 @@ class GalaxyMap:
             self.owner_id = owner.id
         else:
             self.owner_id = 0
+        # Ownership state every hex has unless something changed it; the save overlay only keeps hexes that differ
+        self.hex_defaults = {"owner_id": self.owner_id, "reserved_id": 0, "protected": self.protected}
         self.grid = self._generate_hexes(owner=self.owner_id, protected=self.protected)
+        self.ledger = ResourceLedger()  # resources of every colonized planet, one row each
         self.starting_hex = None
     
     # ----------------------------------------------
@@ -35,33 +51,30 @@ class GalaxyMap:
         Generate a galaxy for a player, assign ownership/reservations,
         and guarantee at least one valid star_system tile as a starting point.
         """
-        start_hex = None
+        start = None
         attempt = 0
 
-        while start_hex is None:
+        while start is None:
             attempt += 1
+            if attempt > 1 and kwargs.get("seed") is not None:
+                kwargs["seed"] += 1  # a fixed seed would fail the same way every time
             galaxy = cls(width, height, star_density, nebula_density, **kwargs)
             log.info(f"[GalaxyGen] Attempt #{attempt}: Created new galaxy for player '{player.name}'")
 
-            for hex in galaxy.grid:
-                if hex.feature == "star_system":
-                    start_hex = hex
-                    break
+            # Read from the feature arrays: no hex gets materialized for the search
+            start = galaxy.grid.first_with_feature("star_system")
 
-            if start_hex is None:
+            if start is None:
                 log.warning("[GalaxyGen] No suitable starting hex found; retrying...")
 
         # Assign ownership
-        for hex in galaxy.grid:
-            if hex is start_hex:
-                hex.owner_id = player.id
-                hex.reserved_id = player.id
-                for planet in hex.contents.planets:
-                    planet.is_colonized=True
-            else:
-                hex.owner_id = 0
-                hex.reserved_id = player.id
+        galaxy.grid.fill_ownership(owner_id=0, reserved_id=player.id)
+        start_hex = galaxy.grid.get_hex(*start)
+        start_hex.owner_id = player.id
+        for planet in start_hex.contents.planets:
+            planet.is_colonized=True
 
+        galaxy.hex_defaults.update(owner_id=0, reserved_id=player.id)
         galaxy.starting_hex = (start_hex.q, start_hex.r)
         galaxy.owner_id = player.id
 
@@ -85,37 +98,240 @@ class GalaxyMap:
         w_empty = max(0.02, base_empty * (1.0 - 0.4 * density_factor))
         return [w_star, w_nebula, base_asteroid, base_black_hole, w_empty]
 
-    def _generate_hexes(self, owner=None, protected=False):
-        grid = []
-        weights = self._feature_weights()
-        for q in range(self.width):
-            q_offset = math.floor(q / 2)
-            for r in range(-q_offset, self.height - q_offset):
-                grid.append(Hex(q, r, weights=weights, owner=owner, protected=protected))
-        return grid
+    def generator(self):
+        """GalaxyGenerator configured for this map (fixes self.seed if it was random)."""
+        generator = GalaxyGenerator(
+            self.width, self.height, shape=self.shape, age=self.age, seed=self.seed,
+            star_density=self.star_density, nebula_density=self.nebula_density
+        )
+        self.seed = generator.seed
+        return generator
+
+    def _generate_hexes(self, owner=None, protected=False, reserved_id=0):
+        """
+        Features for the whole grid come from one vectorized pass and go
+        straight into the chunk arrays; Hex and StarSystem objects are only
+        built when a chunk is first accessed.
+        """
+        generator = self.generator()
+        q_arr, r_arr, features = generator.generate_features()
+        return ChunkedGrid.from_features(
+            self.width, self.height, q_arr, r_arr, features, generator,
+            owner=owner, reserved_id=reserved_id, protected=protected, is_pinned=self._is_hex_pinned
+        )
 
     def all_hexes(self):
         return self.grid
 
+    # ----------------------------------------------
+    # Lookups
+    # ----------------------------------------------
+    def get_hex(self, q, r):
+        """O(1) hex at axial (q, r), or None outside the map."""
+        return self.grid.get_hex(q, r)
+
+    def _existing(self, coords):
+        # Filter on the feature arrays first so off-map cells never touch a chunk
+        return [self.grid.get_hex(q, r) for q, r in coords if self.grid.feature_at(q, r) is not None]
+
+    def neighbors(self, q, r):
+        """Hexes adjacent to (q, r) that exist on the map."""
+        return self._existing(hex_neighbors(q, r))
+
+    def ring(self, q, r, radius):
+        """Hexes exactly `radius` steps from (q, r)."""
+        return self._existing(hex_ring(q, r, radius))
+
+    def hexes_within(self, q, r, radius):
+        """Hexes at most `radius` steps from (q, r), centre included."""
+        return self._existing(hex_range(q, r, radius))
+
+    @staticmethod
+    def distance(a, b):
+        """Hex steps between two axial coordinates (or Hex objects)."""
+        if not isinstance(a, tuple):
+            a = (a.q, a.r)
+        if not isinstance(b, tuple):
+            b = (b.q, b.r)
+        return hex_distance(a, b)
+
+    # ----------------------------------------------
+    # Pathfinding
+    # ----------------------------------------------
+    def pathfinder(self):
+        """Shared Pathfinder for this map; its cache follows the grid version."""
+        pathfinder = getattr(self, "_pathfinder", None)
+        if pathfinder is None or pathfinder.grid is not self.grid:
+            pathfinder = self._pathfinder = Pathfinder(self.grid)
+        return pathfinder
+
+    def find_path(self, start, goal, exact=False):
+        """
+        Hex path between two axial coordinates, or None if unreachable.
+        Long paths are approximate (often 5-10% above the cheapest route)
+        unless exact=True; see Pathfinder.find_path.
+        """
+        return self.pathfinder().find_path(start, goal, exact)
+
+    def travel_cost(self, start, goal):
+        """Movement cost of the cheapest path (exact search), or None if unreachable."""
+        return self.pathfinder().travel_cost(start, goal, exact=True)
+
+    def find_planet(self, global_id):
+        return self.grid.find_planet(global_id)
+
+    def planet_coords(self, planet):
+        """Axial (q, r) of the hex holding a planet (Planet or global ID)."""
+        if isinstance(planet, Planet):
+            coords = planet.hex_coords
+            if coords is not None:
+                return coords
+            planet = planet.global_id
+        return self.grid.planet_index.get(planet)
+
+    def active_planets(self):
+        """
+        Colonized planets. A colonized planet is always in a materialized
+        chunk or pinned, so this never materializes anything.
+        Newly seen ones are attached to the resource ledger on the way.
+        """
+        planets = [
+            planet
+            for hex in self.grid.materialized_hexes() if hex.feature == "star_system" and hex.contents
+            for planet in hex.contents.planets if planet.is_colonized
+        ]
+        for planet in planets:
+            if planet.global_id not in self.ledger.rows:
+                self.ledger.attach(planet)
+        return planets
+
+    def tick_production(self):
+        """Apply one production tick to every colonized planet's stock at once."""
+        return self.ledger.tick()
+
+    def evict_cold_chunks(self, max_idle=300.0):
+        """Release the Hex objects of chunks nobody touched for `max_idle` seconds."""
+        return self.grid.evict_cold(max_idle)
+
     def to_dict(self):
         return {
             "width": self.width,
             "height": self.height,
+            "star_density": self.star_density,
+            "nebula_density": self.nebula_density,
+            "shape": self.shape,
+            "age": self.age,
+            "seed": self.seed,
+            "global_id": self.global_id,
             "grid": [h.to_dict() for h in self.grid],
-            "owner": getattr(self.owner, "id", None),
+            "owner": getattr(self.owner, "id", self.owner or None),
+            "owner_id": self.owner_id,
             "protected": self.protected,
+            "starting_hex": self.starting_hex,
         }
 
     @classmethod
     def from_dict(cls, data):
-        width = data.get("width", 0)
-        height = data.get("height", 0)
-        galaxy = cls(width=width, height=height)
-        galaxy.owner = data.get("owner")
+        """
+        Hydrate a GalaxyMap straight from serialized data.
+        Bypasses __init__, so no random grid (and no planet generation) is
+        built only to be thrown away.
+        """
+        galaxy = cls.__new__(cls)
+        galaxy.width = data.get("width", 0)
+        galaxy.height = data.get("height", 0)
+        galaxy.star_density = data.get("star_density", 50)
+        galaxy.nebula_density = data.get("nebula_density", 20)
+        galaxy.shape = data.get("shape", "uniform")
+        galaxy.age = data.get("age", "mature")
+        galaxy.seed = data.get("seed")
         galaxy.protected = data.get("protected", False)
-        galaxy.grid = [Hex.from_dict(hd) for hd in data.get("grid", data)]
+        galaxy.owner = data.get("owner")
+        galaxy.owner_id = data.get("owner_id", galaxy.owner or 0)
+        galaxy.global_id = data.get("global_id") or str(uuid.uuid4())
+        starting_hex = data.get("starting_hex")
+        galaxy.starting_hex = tuple(starting_hex) if starting_hex else None
+
+        galaxy.ledger = ResourceLedger()
+        galaxy.hex_defaults = data.get(
+            "hex_defaults", {"owner_id": galaxy.owner_id, "reserved_id": 0, "protected": galaxy.protected}
+        )
+
+        # One planet-type cache for the whole grid: registry lookups are paid per type, not per planet
+        planet_types = {}
+        if data.get("overlay") is not None:
+            galaxy._rebuild_from_seed(data, planet_types)
+        else:
+            hexes = [Hex.from_dict(hd, planet_types=planet_types) for hd in data.get("grid", data)]
+            galaxy.grid = ChunkedGrid.from_hexes(galaxy.width, galaxy.height, hexes)
         return galaxy
 
+    # ----------------------------------------------
+    # Seed + overlay storage
+    # ----------------------------------------------
+    def _is_hex_modified(self, hex):
+        """True if the hex no longer matches what the generator produces for it."""
+        defaults = self.hex_defaults
+        if (hex.owner_id != defaults["owner_id"] or hex.reserved_id != defaults["reserved_id"]
+                or hex.protected != defaults["protected"]):
+            return True
+        if hex.feature == "star_system" and hex.contents:
+            return any(planet.is_modified() for planet in hex.contents.planets)
+        return False
+
+    def _is_hex_pinned(self, hex):
+        """Hexes that must survive chunk eviction: modified ones and trade route endpoints."""
+        if self._is_hex_modified(hex):
+            return True
+        if hex.feature == "star_system" and hex.contents:
+            return any(planet.trade_routes for planet in hex.contents.planets)
+        return False
+
+    def to_save_dict(self):
+        """
+        Compact save format: generator seed + parameters + an overlay holding
+        only the hexes that differ from procedural content (owned, reserved
+        differently, colonized, built...). Galaxies without a seed fall back
+        to the full to_dict() format.
+        """
+        if self.seed is None:
+            return self.to_dict()
+        return {
+            "format": "seed_overlay",
+            "width": self.width,
+            "height": self.height,
+            "star_density": self.star_density,
+            "nebula_density": self.nebula_density,
+            "shape": self.shape,
+            "age": self.age,
+            "seed": self.seed,
+            "global_id": self.global_id,
+            "owner": getattr(self.owner, "id", self.owner or None),
+            "owner_id": self.owner_id,
+            "protected": self.protected,
+            "starting_hex": self.starting_hex,
+            "hex_defaults": self.hex_defaults,
+            # Planet IDs handed out so far: regenerated planets must start above any saved one
+            "next_planet_id": Planet._next_global_id,
+            # Hexes never materialized are procedural by definition: only live ones are checked
+            "overlay": [h.to_dict() for h in self.grid.materialized_hexes() if self._is_hex_modified(h)],
+        }
+
+    def _rebuild_from_seed(self, data, planet_types):
+        """Regenerate the grid from seed + parameters, then lay the saved overlay on top."""
+        Planet._next_global_id = max(Planet._next_global_id, data.get("next_planet_id", 1))
+        defaults = self.hex_defaults
+        self.grid = self._generate_hexes(
+            owner=defaults["owner_id"], protected=defaults["protected"], reserved_id=defaults["reserved_id"]
+        )
+
+        for hex_data in data["overlay"]:
+            if self.grid.feature_at(hex_data["q"], hex_data["r"]) is None:
+                log.warning(f"[GalaxyMap] Overlay hex ({hex_data['q']}, {hex_data['r']}) is outside the map; skipped")
+                continue
+            self.grid.set_hex(Hex.from_dict(hex_data, planet_types=planet_types))
+        log.debug(f"[GalaxyMap] Rebuilt galaxy from seed {self.seed} with {len(data['overlay'])} overlay hexes")
+
     
     # ===============================
     # 📦 Save galaxy to disk
@@ -126,7 +342,7 @@ class GalaxyMap:
         """
         try:
             os.makedirs(os.path.dirname(path), exist_ok=True)
-            data = self.to_dict()
+            data = self.to_save_dict()
             with open(path, "w", encoding="utf-8") as f:
                 json.dump(data, f, indent=2)
             log.debug(f"Galaxy saved to {path} ({len(self.grid)} hexes)")
@@ -155,4 +371,4 @@ class GalaxyMap:
             return None
 
     def __repr__(self):
-        return f"<GalaxyMap {self.width}x{self.height} ({len(self.grid)} hexes)>"
+        return f"<GalaxyMap {self.width}x{self.height} {self.shape} ({len(self.grid)} hexes)>"
@@ -0,0 +1,148 @@
+import math
+import random
+import numpy as np
+from core.config import SPECIAL_FEATURES
+from core.logger_setup import get_logger
+
+log = get_logger("GalaxyGenerator")
+
+GALAXY_SHAPES = ("uniform", "spiral", "elliptical", "ring")
+
+# Per-age multipliers on the [star, nebula, asteroid, black_hole, empty] weights
+GALAXY_AGES = {
+    "young":   (1.0, 1.8, 1.0, 0.5, 0.8),
+    "mature":  (1.0, 1.0, 1.0, 1.0, 1.0),
+    "ancient": (0.9, 0.5, 1.2, 1.8, 1.3),
+}
+
+_MASK64 = (1 << 64) - 1
+
+
+def system_seed(seed, q, r):
+    """
+    Deterministic per-hex seed derived from the galaxy seed (splitmix64 mix),
+    so a star system always regenerates identically at the same coordinates.
+    """
+    x = (seed * 0x9E3779B97F4A7C15 + (q & 0xFFFFFFFF) * 0xBF58476D1CE4E5B9 + (r & 0xFFFFFFFF)) & _MASK64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return x ^ (x >> 31)
+
+
+class GalaxyGenerator:
+    """
+    Vectorized feature generator for a pointy-topped axial hex grid.
+
+    The whole grid is processed as NumPy arrays: a density field is computed
+    for the chosen shape, turned into per-hex feature weights, and every hex
+    is sampled in one pass from a single seeded generator. Only the star
+    systems picked are later materialized (see system_rng).
+    """
+    def __init__(self, width, height, shape="uniform", age="mature", seed=None,
+                 star_density=50, nebula_density=20, arms=2, twist=2.5):
+        if shape not in GALAXY_SHAPES:
+            raise ValueError(f"Unknown galaxy shape '{shape}', expected one of {GALAXY_SHAPES}")
+        if age not in GALAXY_AGES:
+            raise ValueError(f"Unknown galaxy age '{age}', expected one of {tuple(GALAXY_AGES)}")
+        self.width = width
+        self.height = height
+        self.shape = shape
+        self.age = age
+        self.seed = seed if seed is not None else random.getrandbits(32)
+        self.star_density = star_density
+        self.nebula_density = nebula_density
+        self.arms = arms
+        self.twist = twist
+
+    # ----------------------------------------------
+    # Grid
+    # ----------------------------------------------
+    def axial_grid(self):
+        """
+        Axial (q, r) of every hex, flattened in the same order as the legacy
+        generator: q outer, r inner, r starting at -floor(q/2).
+        """
+        q = np.repeat(np.arange(self.width, dtype=np.int32), self.height)
+        row = np.tile(np.arange(self.height, dtype=np.int32), self.width)
+        r = row - q // 2
+        return q, r
+
+    def density_field(self, q, r):
+        """Matter density in [0, 1] per hex for the configured shape."""
+        if self.shape == "uniform":
+            return np.ones(q.shape, dtype=np.float64)
+
+        # Axial -> cartesian, centred and normalised so the grid spans about [-1, 1]
+        x = math.sqrt(3) * (q + r / 2.0)
+        y = 1.5 * r
+        x = x - (x.max() + x.min()) / 2.0
+        y = y - (y.max() + y.min()) / 2.0
+        radius = max(np.abs(x).max(), np.abs(y).max(), 1e-9)
+        x = x / radius
+        y = y / radius
+        rn = np.sqrt(x * x + y * y)
+
+        if self.shape == "elliptical":
+            density = np.exp(-2.5 * (x * x + (y / 0.65) ** 2))
+        elif self.shape == "ring":
+            density = np.exp(-((rn - 0.65) / 0.18) ** 2) + 0.15 * np.exp(-(rn / 0.12) ** 2)
+        else:  # spiral
+            theta = np.arctan2(y, x)
+            phase = self.arms * (theta - self.twist * np.log(rn + 0.05))
+            arm = np.cos(phase) ** 2
+            bulge = np.exp(-(rn / 0.2) ** 2)
+            disk = np.exp(-1.2 * rn)
+            density = bulge + disk * (0.1 + 0.9 * arm ** 4)
+        return np.clip(density, 0.0, 1.0)
+
+    def base_weights(self):
+        """Feature weights for a full-density hex (same formula as GalaxyMap._feature_weights)."""
+        base_star, base_nebula, base_asteroid, base_black_hole, base_empty = (
+            0.30, 0.12, 0.14, 0.04, 0.10
+        )
+        star_scale = 0.2 + (self.star_density / 100.0)
+        nebula_scale = 0.2 + (self.nebula_density / 100.0)
+        density_factor = (self.star_density + self.nebula_density) / 200.0
+        w_empty = max(0.02, base_empty * (1.0 - 0.4 * density_factor))
+        return np.array([base_star * star_scale, base_nebula * nebula_scale,
+                         base_asteroid, base_black_hole, w_empty])
+
+    def feature_weights(self, density):
+        """
+        (n, 5) weight matrix, columns ordered like SPECIAL_FEATURES.
+        A density of 1 reproduces base_weights exactly; sparse regions shift
+        weight from stars/nebulae/asteroids to empty space.
+        """
+        weights = np.empty((density.shape[0], len(SPECIAL_FEATURES)))
+        weights[:] = self.base_weights() * np.array(GALAXY_AGES[self.age])
+        weights[:, 0] *= density
+        weights[:, 1] *= density
+        weights[:, 2] *= np.sqrt(density)
+        if self.shape in ("spiral", "elliptical"):
+            # Black holes gather in dense cores
+            weights[:, 3] *= 0.3 + 0.7 * density ** 2
+        weights[:, 4] *= 1.0 + 8.0 * (1.0 - density)
+        return weights
+
+    # ----------------------------------------------
+    # Sampling
+    # ----------------------------------------------
+    def generate_features(self):
+        """
+        Sample every hex in one vectorized pass.
+        Returns (q, r, features) where features holds indexes into SPECIAL_FEATURES.
+        """
+        rng = np.random.default_rng(self.seed)
+        q, r = self.axial_grid()
+        cumulative = np.cumsum(self.feature_weights(self.density_field(q, r)), axis=1)
+        draws = rng.random(q.shape[0]) * cumulative[:, -1]
+        features = (cumulative < draws[:, None]).sum(axis=1).astype(np.uint8)
+        log.debug(
+            f"[GalaxyGen] {self.width}x{self.height} {self.shape}/{self.age} galaxy, seed {self.seed}: "
+            f"{int((features == 0).sum())} star systems"
+        )
+        return q, r, features
+
+    def system_rng(self, q, r):
+        """Dedicated RNG for the star system at (q, r)."""
+        return random.Random(system_seed(self.seed, q, r))
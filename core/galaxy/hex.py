@@ -1,12 +1,55 @@
 import random
 import math
+from functools import lru_cache
 from pygame.math import Vector2
 from core.planet import Planet
 from core.galaxy.star_system import StarSystem
 from core.config import *
 from server.hexcordencoder import *
 
+SQRT3 = math.sqrt(3)
+
+
+@lru_cache(maxsize=None)
+def hex_corner_offsets(size):
+    """(dx, dy) of the six corners of a pointy-top hex of `size`, computed once per size."""
+    return tuple(
+        (size * math.cos(math.radians(60 * i - 30)), size * math.sin(math.radians(60 * i - 30)))
+        for i in range(6)
+    )
+
+
+def pixel_to_axial(x, y, size):
+    """Axial (q, r) of the pointy-top hex containing world pixel (x, y), hex (0, 0) at the origin."""
+    qf = (SQRT3 / 3 * x - y / 3) / size
+    rf = (2 / 3 * y) / size
+    sf = -qf - rf
+    q, r, s = round(qf), round(rf), round(sf)
+    dq, dr, ds = abs(q - qf), abs(r - rf), abs(s - sf)
+    if dq > dr and dq > ds:
+        q = -r - s
+    elif dr > ds:
+        r = -q - s
+    return q, r
+
+
+def axial_range(x0, y0, x1, y1, size):
+    """
+    (q, r) of every hex overlapping the world pixel rectangle [x0, x1) x [y0, y1),
+    row by row: the rectangle is culled in axial coordinates, no hex is tested.
+    """
+    width = SQRT3 * size
+    for r in range(math.floor((y0 - size) / (1.5 * size)), math.ceil((y1 + size) / (1.5 * size)) + 1):
+        q_min = math.floor((x0 - width / 2) / width - r / 2)
+        q_max = math.ceil((x1 + width / 2) / width - r / 2)
+        for q in range(q_min, q_max + 1):
+            yield q, r
+
+
 class Hex:
+    # Every player owns a full grid of these: no per-instance __dict__
+    __slots__ = ("q", "r", "s", "owner_id", "protected", "reserved_id", "_feature_weights", "feature", "contents")
+
     def __init__(self, q, r, s=None, weights=None, owner=0, reserved_id=0, feature=None, contents=None, protected=False):
         self.q = q
         self.r = r
@@ -93,7 +136,7 @@ class Hex:
 
 
     @classmethod
-    def from_dict(cls, data: dict):
+    def from_dict(cls, data: dict, planet_types=None):
         """
         Reconstruct Hex from MsgPack dictionary.
         Assumes:
@@ -101,6 +144,8 @@ class Hex:
         - data['feature'] is an integer ID
         - data['owner'] is an integer ID
         - data['contents'] is a dict or None
+        planet_types: optional per-type metadata cache shared across a bulk
+        load, forwarded to Planet.from_dict.
         """
         #print(f"data: {data}")
         feature_name = FEATURE_NAMES.get(data.get("feature"), "unknown")
@@ -117,7 +162,7 @@ class Hex:
             planets = []
 
             for planet_data in data["contents"]["planets"]:
-                planet = Planet.from_dict(planet_data)
+                planet = Planet.from_dict(planet_data, planet_types=planet_types)
                 planets.append(planet)
 
             # ✅ Corrected parameter name: `planets`, not `planest`
@@ -150,16 +195,10 @@ class Hex:
 
     # Hex <-> pixel functions for GUI
     def hex_to_pixel(self, center, size=HEX_SIZE, cam_offset=(0,0)):
-        x = size * math.sqrt(3) * (self.q + self.r/2) + center[0] + cam_offset[0]
+        x = size * SQRT3 * (self.q + self.r/2) + center[0] + cam_offset[0]
         y = size * 3/2 * self.r + center[1] + cam_offset[1]
         return (x, y)
 
     def polygon(self, center, size=HEX_SIZE, cam_offset=(0,0)):
         cx, cy = self.hex_to_pixel(center, size, cam_offset)
-        points = []
-        for i in range(6):
-            angle = math.radians(60 * i - 30)
-            px = cx + size * math.cos(angle)
-            py = cy + size * math.sin(angle)
-            points.append((px, py))
-        return points
+        return [(cx + dx, cy + dy) for dx, dy in hex_corner_offsets(size)]
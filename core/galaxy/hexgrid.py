@@ -0,0 +1,47 @@
+"""
+Axial hex coordinate math (pointy-topped, s = -q - r).
+Pure functions on (q, r) tuples; GalaxyMap maps them onto its grid.
+"""
+
+# Neighbor offsets, counter-clockwise starting east
+HEX_DIRECTIONS = (
+    (1, 0), (1, -1), (0, -1),
+    (-1, 0), (-1, 1), (0, 1),
+)
+
+
+def hex_distance(a, b):
+    """Cube distance between two axial coordinates, in hex steps."""
+    dq = a[0] - b[0]
+    dr = a[1] - b[1]
+    return (abs(dq) + abs(dr) + abs(dq + dr)) // 2
+
+
+def hex_neighbors(q, r):
+    """The six axial coordinates around (q, r)."""
+    return [(q + dq, r + dr) for dq, dr in HEX_DIRECTIONS]
+
+
+def hex_ring(q, r, radius):
+    """Coordinates exactly `radius` steps from (q, r), walked in ring order."""
+    if radius <= 0:
+        return [(q, r)]
+    # Start `radius` steps toward direction 4, then walk each side of the ring
+    cq = q + HEX_DIRECTIONS[4][0] * radius
+    cr = r + HEX_DIRECTIONS[4][1] * radius
+    results = []
+    for dq, dr in HEX_DIRECTIONS:
+        for _ in range(radius):
+            results.append((cq, cr))
+            cq += dq
+            cr += dr
+    return results
+
+
+def hex_range(q, r, radius):
+    """Every coordinate within `radius` steps of (q, r), centre included."""
+    results = []
+    for dq in range(-radius, radius + 1):
+        for dr in range(max(-radius, -dq - radius), min(radius, -dq + radius) + 1):
+            results.append((q + dq, r + dr))
+    return results
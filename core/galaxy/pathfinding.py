@@ -0,0 +1,363 @@
+import heapq
+import math
+from collections import OrderedDict
+import numpy as np
+from core.config import SPECIAL_FEATURES, FEATURE_MOVE_COSTS
+from core.galaxy.chunks import NO_FEATURE
+from core.galaxy.hexgrid import HEX_DIRECTIONS, hex_distance
+from core.logger_setup import get_logger
+
+log = get_logger("Pathfinding")
+
+INF = math.inf
+LONG_ENTRANCE = 6   # border runs at least this long get two entrances instead of one
+
+# Offsets of the 8 clusters around a cluster (hex neighbors can cross chunk corners)
+_CLUSTER_AROUND = [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if dx or dy]
+
+
+class CostField:
+    """
+    Dense movement cost per hex, indexed [col][row], built once per grid
+    version straight from the chunk feature arrays (no hex materialized).
+    """
+    def __init__(self, grid):
+        self.version = grid.version
+        self.width = grid.width
+        self.height = grid.height
+
+        lookup = np.full(256, INF)
+        for feature_id, name in enumerate(SPECIAL_FEATURES):
+            cost = FEATURE_MOVE_COSTS.get(name)
+            if cost is not None:
+                lookup[feature_id] = cost
+        lookup[NO_FEATURE] = INF
+
+        size = grid.chunk_size
+        features = np.full((grid.chunks_x * size, grid.chunks_y * size), NO_FEATURE, dtype=np.uint8)
+        for chunk in grid.iter_chunks():
+            features[chunk.cx * size:(chunk.cx + 1) * size, chunk.cy * size:(chunk.cy + 1) * size] = chunk.feature
+        # Nested lists: scalar lookups in the search loops are much cheaper than numpy indexing
+        self.costs = lookup[features[:self.width, :self.height]].tolist()
+
+        passable = [c for c in FEATURE_MOVE_COSTS.values() if c is not None]
+        self.min_cost = min(passable) if passable else 1.0
+
+    def cost(self, q, r):
+        """Cost to enter (q, r); INF if impassable or off the map."""
+        row = r + q // 2
+        if 0 <= q < self.width and 0 <= row < self.height:
+            return self.costs[q][row]
+        return INF
+
+
+class Pathfinder:
+    """
+    A* over a ChunkedGrid with per-feature movement costs (FEATURE_MOVE_COSTS).
+
+    Long queries use a hierarchical abstraction (HPA*): every chunk is a
+    cluster, border crossings between neighbouring clusters are reduced to
+    a few entrances per contiguous stretch of passable border, and the search
+    runs on the entrance graph before being refined into hexes. Cluster
+    data is built lazily, only for the clusters a search reaches. The
+    abstraction trades accuracy for speed: its paths are usually a few
+    percent costlier than the optimum (find_path(exact=True) for the latter).
+
+    Results are kept in an LRU cache; everything is dropped when the grid
+    version changes (a hex was replaced).
+    """
+    def __init__(self, grid, cache_size=2048, hierarchical_min_distance=None):
+        self.grid = grid
+        self.cluster_size = grid.chunk_size
+        self.cache_size = cache_size
+        # Below this hex distance a plain A* is cheaper than going through the abstraction
+        self.hierarchical_min_distance = hierarchical_min_distance or 2 * grid.chunk_size
+        self.field = None
+        self._cache = OrderedDict()   # (start, goal) -> tuple path or None
+        self._pairs = {}              # (cluster_a, cluster_b) sorted -> [(hex_a, hex_b)] entrances
+        self._cluster_nodes = {}      # cluster -> set of entrance hexes inside it
+        self._links = {}              # entrance hex -> {hex across the border: cost}
+        self._searches = {}           # entrance hex -> (dist, parent) limited to its cluster
+        self.stats = {"hits": 0, "misses": 0, "expanded": 0}
+
+    # ----------------------------------------------
+    # Public API
+    # ----------------------------------------------
+    def find_path(self, start, goal, exact=False):
+        """
+        Path from start to goal as a list of axial (q, r), both ends included,
+        or None if goal can't be reached.
+
+        Short queries and queries within one cluster use plain A* and are
+        optimal. Longer ones go through the hierarchical abstraction and are
+        approximate: on average 5-10% costlier than the cheapest route, up to
+        about 20% on some queries. Pass exact=True when the result must be the cheapest route
+        (travel costs, distances); it is a full A*, slower but cached alike.
+        """
+        field = self._sync()
+        start = tuple(start)
+        goal = tuple(goal)
+        key = (start, goal, exact)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            self.stats["hits"] += 1
+            path = self._cache[key]
+            return list(path) if path is not None else None
+
+        self.stats["misses"] += 1
+        if field.cost(*start) == INF or field.cost(*goal) == INF:
+            path = None
+        elif (not exact and hex_distance(start, goal) >= self.hierarchical_min_distance
+              and self._cluster_of(start) != self._cluster_of(goal)):
+            # Approximate route; the abstraction can also miss a path that exists
+            # (detours leaving and re-entering a cluster), then only a full search finds it
+            path = self._hierarchical(start, goal) or self.astar(start, goal)
+        else:
+            path = self.astar(start, goal)
+
+        self._cache[key] = tuple(path) if path is not None else None
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return path
+
+    def path_cost(self, path):
+        """Total movement cost of a path (the start hex is free)."""
+        field = self._sync()
+        return sum(field.cost(q, r) for q, r in path[1:])
+
+    def travel_cost(self, start, goal, exact=True):
+        """Movement cost from start to goal, of the cheapest route unless exact=False; None if unreachable."""
+        path = self.find_path(start, goal, exact)
+        return self.path_cost(path) if path is not None else None
+
+    def invalidate(self):
+        """Forget every cached path and cluster (called automatically on grid changes)."""
+        self.field = None
+
+    # ----------------------------------------------
+    # Plain A*
+    # ----------------------------------------------
+    def astar(self, start, goal):
+        """Optimal path over the whole map (uncached; find_path(exact=True) caches it)."""
+        field = self._sync()
+        costs = field.costs
+        width, height = field.width, field.height
+        min_cost = field.min_cost
+        gq, gr = goal
+
+        g = {start: 0.0}
+        parent = {start: None}
+        open_heap = [(hex_distance(start, goal) * min_cost, 0.0, start)]
+        expanded = 0
+        while open_heap:
+            _, cost, node = heapq.heappop(open_heap)
+            if node == goal:
+                break
+            if cost > g[node]:
+                continue
+            expanded += 1
+            q, r = node
+            for dq, dr in HEX_DIRECTIONS:
+                nq = q + dq
+                nr = r + dr
+                row = nr + nq // 2
+                if not (0 <= nq < width and 0 <= row < height):
+                    continue
+                step = costs[nq][row]
+                if step == INF:
+                    continue
+                new_cost = cost + step
+                neighbor = (nq, nr)
+                if new_cost < g.get(neighbor, INF):
+                    g[neighbor] = new_cost
+                    parent[neighbor] = node
+                    dq_goal = nq - gq
+                    dr_goal = nr - gr
+                    h = (abs(dq_goal) + abs(dr_goal) + abs(dq_goal + dr_goal)) // 2 * min_cost
+                    heapq.heappush(open_heap, (new_cost + h, new_cost, neighbor))
+        self.stats["expanded"] += expanded
+
+        if goal not in parent:
+            return None
+        return self._unwind(parent, goal)
+
+    # ----------------------------------------------
+    # Hierarchical search
+    # ----------------------------------------------
+    def _hierarchical(self, start, goal):
+        field = self.field
+        min_cost = field.min_cost
+        goal_cluster = self._cluster_of(goal)
+
+        g = {start: 0.0}
+        came_from = {start: None}    # node -> (previous node, "intra" | "link")
+        open_heap = [(hex_distance(start, goal) * min_cost, 0.0, start)]
+        expanded = 0
+        while open_heap:
+            _, cost, node = heapq.heappop(open_heap)
+            if node == goal:
+                break
+            if cost > g[node]:
+                continue
+            expanded += 1
+            cluster = self._cluster_of(node)
+            dist, _ = self._cluster_search(node)
+
+            successors = [(other, dist[other], "intra") for other in self._nodes(cluster)
+                          if other != node and other in dist]
+            if cluster == goal_cluster and goal in dist:
+                successors.append((goal, dist[goal], "intra"))
+            successors.extend((other, step, "link") for other, step in self._links.get(node, {}).items())
+
+            for other, step, kind in successors:
+                new_cost = cost + step
+                if new_cost < g.get(other, INF):
+                    g[other] = new_cost
+                    came_from[other] = (node, kind)
+                    heapq.heappush(open_heap, (new_cost + hex_distance(other, goal) * min_cost, new_cost, other))
+        self.stats["expanded"] += expanded
+
+        if goal not in came_from:
+            return None
+
+        # Refine: stitch the cluster-local paths behind each abstract edge
+        path = [goal]
+        node = goal
+        while came_from[node] is not None:
+            previous, kind = came_from[node]
+            if kind == "intra":
+                _, parent = self._cluster_search(previous)
+                segment = self._unwind(parent, node)
+                path.extend(reversed(segment[:-1]))
+            else:
+                path.append(previous)
+            node = previous
+        path.reverse()
+        return path
+
+    def _cluster_of(self, coord):
+        q, r = coord
+        size = self.cluster_size
+        return (q // size, (r + q // 2) // size)
+
+    def _nodes(self, cluster):
+        """Entrance hexes of a cluster, computing its borders on first use."""
+        nodes = self._cluster_nodes.get(cluster)
+        if nodes is None:
+            nodes = set()
+            cx, cy = cluster
+            for dx, dy in _CLUSTER_AROUND:
+                other = (cx + dx, cy + dy)
+                for a, b in self._pair_entrances(cluster, other):
+                    nodes.add(a if self._cluster_of(a) == cluster else b)
+            self._cluster_nodes[cluster] = nodes
+        return nodes
+
+    def _pair_entrances(self, cluster_a, cluster_b):
+        """
+        Crossings between two neighbouring clusters: the border hex pairs are
+        grouped into contiguous runs and the middle pair of each run is kept
+        (both ends for long runs).
+        """
+        key = (cluster_a, cluster_b) if cluster_a < cluster_b else (cluster_b, cluster_a)
+        entrances = self._pairs.get(key)
+        if entrances is not None:
+            return entrances
+
+        low, high = key
+        field = self.field
+        size = self.cluster_size
+        edges = []
+        for col in range(low[0] * size, min((low[0] + 1) * size, field.width)):
+            for row in range(low[1] * size, min((low[1] + 1) * size, field.height)):
+                if field.costs[col][row] == INF:
+                    continue
+                q, r = col, row - col // 2
+                for dq, dr in HEX_DIRECTIONS:
+                    neighbor = (q + dq, r + dr)
+                    if self._cluster_of(neighbor) == high and field.cost(*neighbor) < INF:
+                        edges.append(((q, r), neighbor))
+
+        runs = []
+        for edge in sorted(edges):
+            if not runs or hex_distance(edge[0], runs[-1][-1][0]) > 1:
+                runs.append([])
+            runs[-1].append(edge)
+        entrances = []
+        for run in runs:
+            if len(run) >= LONG_ENTRANCE:
+                entrances.extend((run[0], run[-1]))   # long openings keep both ends (classic HPA*)
+            else:
+                entrances.append(run[len(run) // 2])
+
+        for a, b in entrances:
+            self._links.setdefault(a, {})[b] = field.cost(*b)
+            self._links.setdefault(b, {})[a] = field.cost(*a)
+        self._pairs[key] = entrances
+        return entrances
+
+    def _cluster_search(self, source):
+        """Dijkstra from source restricted to its cluster; cached for entrance hexes."""
+        cached = self._searches.get(source)
+        if cached is not None:
+            return cached
+
+        field = self.field
+        costs = field.costs
+        size = self.cluster_size
+        cx, cy = self._cluster_of(source)
+        col_lo, col_hi = cx * size, min((cx + 1) * size, field.width)
+        row_lo, row_hi = cy * size, min((cy + 1) * size, field.height)
+
+        dist = {source: 0.0}
+        parent = {source: None}
+        heap = [(0.0, source)]
+        while heap:
+            cost, node = heapq.heappop(heap)
+            if cost > dist[node]:
+                continue
+            q, r = node
+            for dq, dr in HEX_DIRECTIONS:
+                nq = q + dq
+                nr = r + dr
+                row = nr + nq // 2
+                if not (col_lo <= nq < col_hi and row_lo <= row < row_hi):
+                    continue
+                step = costs[nq][row]
+                if step == INF:
+                    continue
+                new_cost = cost + step
+                neighbor = (nq, nr)
+                if new_cost < dist.get(neighbor, INF):
+                    dist[neighbor] = new_cost
+                    parent[neighbor] = node
+                    heapq.heappush(heap, (new_cost, neighbor))
+
+        result = (dist, parent)
+        if source in self._links:
+            self._searches[source] = result
+        return result
+
+    # ----------------------------------------------
+    # Helpers
+    # ----------------------------------------------
+    def _sync(self):
+        if self.field is None or self.field.version != self.grid.version:
+            if self.field is not None:
+                log.debug(f"[Pathfinding] Grid changed (version {self.grid.version}); path cache cleared")
+            self.field = CostField(self.grid)
+            self._cache.clear()
+            self._pairs.clear()
+            self._cluster_nodes.clear()
+            self._links.clear()
+            self._searches.clear()
+        return self.field
+
+    @staticmethod
+    def _unwind(parent, node):
+        path = []
+        while node is not None:
+            path.append(node)
+            node = parent[node]
+        path.reverse()
+        return path
@@ -2,17 +2,21 @@ import random
 from core.planet import Planet
 
 class StarSystem:
-    def __init__(self, hextile=None, name=None, planets=None):
-        self.name = name or self.generate_name()
+    __slots__ = ("name", "hextile", "planets")
+
+    def __init__(self, hextile=None, name=None, planets=None, rng=None):
+        # rng: optional random.Random (see GalaxyGenerator.system_rng) for reproducible systems
+        rng = rng or random
+        self.name = name or self.generate_name(rng)
         self.hextile = hextile
         # Server generates planets if not provided
         if planets is None:
-            self.planets = [Planet(star_system=self) for _ in range(random.randint(1,4))]
+            self.planets = [Planet(star_system=self, rng=rng) for _ in range(rng.randint(1,4))]
         else:
             self.planets = planets
 
-    def generate_name(self):
-        return "System-" + str(random.randint(100, 999))
+    def generate_name(self, rng=random):
+        return "System-" + str(rng.randint(100, 999))
 
     # Convert to dict for sending to client
     def to_dict(self):
@@ -23,6 +27,9 @@ class StarSystem:
 
     # Reconstruct from dict (client side)
     @classmethod
-    def from_dict(cls, data):
-        planets = [Planet.from_dict(pdata) for pdata in data.get("planets", [])]
-        return cls(name=data.get("name"), planets=planets)
+    def from_dict(cls, data, planet_types=None):
+        planets = [Planet.from_dict(pdata, planet_types=planet_types) for pdata in data.get("planets", [])]
+        system = cls(name=data.get("name"), planets=planets)
+        for planet in planets:
+            planet.star_system = system
+        return system
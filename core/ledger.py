@@ -0,0 +1,210 @@
+from collections import defaultdict
+from collections.abc import MutableMapping
+import numpy as np
+from core.registry import REGISTRY
+from core.logger_setup import get_logger
+
+log = get_logger("ResourceLedger")
+
+EPSILON = 1e-9
+
+
+class PlanetResources(MutableMapping):
+    """
+    Dict-like view of one planet's row in a ResourceLedger. Reads of unknown
+    resources return 0.0 like the defaultdict(float) it replaces; iteration
+    only yields resources the planet actually holds.
+    """
+    __slots__ = ("ledger", "row")
+
+    def __init__(self, ledger, row):
+        self.ledger = ledger
+        self.row = row
+
+    def __getitem__(self, resource_id):
+        col = self.ledger.columns.get(resource_id)
+        if col is None:
+            return 0.0
+        return float(self.ledger.stock[self.row, col])
+
+    def __setitem__(self, resource_id, value):
+        self.ledger.stock[self.row, self.ledger.column(resource_id)] = value
+
+    def __delitem__(self, resource_id):
+        col = self.ledger.columns.get(resource_id)
+        if col is not None:
+            self.ledger.stock[self.row, col] = 0.0
+
+    def __iter__(self):
+        ids = self.ledger.resource_ids
+        return iter([ids[c] for c in np.flatnonzero(self.ledger.stock[self.row]).tolist()])
+
+    def __len__(self):
+        return int(np.count_nonzero(self.ledger.stock[self.row]))
+
+    def copy(self):
+        """Plain dict snapshot (what goes into packets and saves)."""
+        ids = self.ledger.resource_ids
+        stock = self.ledger.stock[self.row]
+        return {ids[c]: float(stock[c]) for c in np.flatnonzero(stock).tolist()}
+
+    # ---------------- Rates ----------------
+    def set_production(self, kind, resource_id, amount):
+        self.ledger.set_production(self.row, kind, resource_id, amount)
+
+    def set_conversion(self, consumed=None, produced=None):
+        self.ledger.set_conversion(self.row, consumed, produced)
+
+    @property
+    def conversion_blocked(self):
+        """True if the last tick skipped this planet's conversion for lack of inputs, or no tick checked it yet."""
+        return bool(self.ledger.blocked[self.row])
+
+    def __repr__(self):
+        return f"PlanetResources({self.copy()})"
+
+
+class ResourceLedger:
+    """
+    Structure-of-arrays resource storage for every attached planet
+    (rows = planets, columns = resources in registry order, unknown
+    resource IDs get a new column on first write).
+
+    Per tick, tick() applies in whole-array operations:
+      - production: fixed yields (mining, farming), always applied
+      - conversion: refining, consumes inputs and adds outputs, applied only
+        on rows that hold enough of every input
+      - caps: per planet/resource storage limits (infinite by default)
+    """
+    def __init__(self, capacity=64):
+        self.resource_ids = list(REGISTRY.get("resources", {}))
+        self.columns = {rid: i for i, rid in enumerate(self.resource_ids)}
+        cols = max(len(self.resource_ids), 1)
+        self.stock = np.zeros((capacity, cols))
+        self.production = np.zeros((capacity, cols))
+        self.conversion = np.zeros((capacity, cols))
+        self.caps = np.full((capacity, cols), np.inf)
+        self.has_conversion = np.zeros(capacity, dtype=np.bool_)
+        self.blocked = np.zeros(capacity, dtype=np.bool_)
+        self.rows = {}                          # planet global ID -> row
+        self._free = []
+        self._size = 0                          # rows in use (high-water mark)
+        self._production_parts = defaultdict(dict)  # row -> {kind: (resource, amount)}
+
+    def __len__(self):
+        return len(self.rows)
+
+    # ---------------- Layout ----------------
+    def column(self, resource_id):
+        col = self.columns.get(resource_id)
+        if col is not None:
+            return col
+        col = len(self.resource_ids)
+        self.resource_ids.append(resource_id)
+        self.columns[resource_id] = col
+        if col >= self.stock.shape[1]:
+            extra = max(4, col // 2)
+            self.stock = np.hstack([self.stock, np.zeros((self.stock.shape[0], extra))])
+            self.production = np.hstack([self.production, np.zeros((self.production.shape[0], extra))])
+            self.conversion = np.hstack([self.conversion, np.zeros((self.conversion.shape[0], extra))])
+            self.caps = np.hstack([self.caps, np.full((self.caps.shape[0], extra), np.inf)])
+        return col
+
+    def _grow_rows(self):
+        capacity = self.stock.shape[0] * 2
+        def grow(array, fill):
+            new = np.full((capacity,) + array.shape[1:], fill, dtype=array.dtype)
+            new[:array.shape[0]] = array
+            return new
+        self.stock = grow(self.stock, 0.0)
+        self.production = grow(self.production, 0.0)
+        self.conversion = grow(self.conversion, 0.0)
+        self.caps = grow(self.caps, np.inf)
+        self.has_conversion = grow(self.has_conversion, False)
+        self.blocked = grow(self.blocked, False)
+
+    # ---------------- Planets ----------------
+    def attach(self, planet):
+        """Move a planet's resources into the ledger; planet.resources becomes a view."""
+        row = self.rows.get(planet.global_id)
+        if row is not None:
+            if not isinstance(planet.resources, PlanetResources) or planet.resources.ledger is not self:
+                planet.resources = PlanetResources(self, row)
+            return planet.resources
+        if self._free:
+            row = self._free.pop()
+        else:
+            if self._size == self.stock.shape[0]:
+                self._grow_rows()
+            row = self._size
+            self._size += 1
+        self.rows[planet.global_id] = row
+        view = PlanetResources(self, row)
+        for resource_id, amount in dict(planet.resources).items():
+            view[resource_id] = amount
+        planet.resources = view
+        return view
+
+    def detach(self, planet):
+        """Give a planet back a standalone dict and free its row."""
+        row = self.rows.pop(planet.global_id, None)
+        if row is None:
+            return
+        planet.resources = defaultdict(float, planet.resources.copy())
+        self.stock[row] = 0.0
+        self.production[row] = 0.0
+        self.conversion[row] = 0.0
+        self.caps[row] = np.inf
+        self.has_conversion[row] = False
+        self.blocked[row] = False
+        self._production_parts.pop(row, None)
+        self._free.append(row)
+
+    # ---------------- Rates ----------------
+    def set_production(self, row, kind, resource_id, amount):
+        """Per-tick yield of one production source (e.g. "mine", "farm") of a planet."""
+        parts = self._production_parts[row]
+        if resource_id is None or not amount:
+            if parts.pop(kind, None) is None:
+                return
+        else:
+            self.column(resource_id)
+            if parts.get(kind) == (resource_id, amount):
+                return
+            parts[kind] = (resource_id, amount)
+        self.production[row] = 0.0
+        for res, value in parts.values():
+            self.production[row, self.columns[res]] += value
+
+    def set_conversion(self, row, consumed=None, produced=None):
+        """Per-tick all-or-nothing conversion (refining): {resource: amount} consumed/produced."""
+        self.conversion[row] = 0.0
+        for resource_id, amount in (consumed or {}).items():
+            self.conversion[row, self.column(resource_id)] -= amount
+        for resource_id, amount in (produced or {}).items():
+            self.conversion[row, self.column(resource_id)] += amount
+        self.has_conversion[row] = bool(consumed or produced)
+        self.blocked[row] = self.has_conversion[row]   # until a tick finds the inputs
+
+    def set_cap(self, row, resource_id, cap):
+        self.caps[row, self.column(resource_id)] = np.inf if cap is None else cap
+
+    # ---------------- Tick ----------------
+    def tick(self):
+        """Apply one tick of production, conversion and caps to every planet at once."""
+        n = self._size
+        if n == 0:
+            return 0
+        stock = self.stock[:n]
+        stock += self.production[:n]
+        conversion = self.conversion[:n]
+        feasible = (stock + conversion >= -EPSILON).all(axis=1)
+        stock[feasible] += conversion[feasible]
+        np.minimum(stock, self.caps[:n], out=stock)
+        np.maximum(stock, 0.0, out=stock)
+        blocked = self.has_conversion[:n] & ~feasible
+        self.blocked[:n] = blocked
+        count = int(blocked.sum())
+        if count:
+            log.debug("[Ledger] %d planets lacked refining inputs this tick", count)
+        return count
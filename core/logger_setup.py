@@ -1,28 +1,157 @@
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
 import time
 import shutil
+from collections import OrderedDict
 
 LOG_DIR = "logs"
-os.makedirs(LOG_DIR, exist_ok=True)
-log_file = os.path.join(LOG_DIR, "game.log")
-
-# Optional: backup previous log
-if os.path.exists(log_file):
-    timestamp = time.strftime("%Y%m%d_%H%M%S")
-    shutil.move(log_file, os.path.join(LOG_DIR, f"game_{timestamp}.log"))
-
-# Create a root logger
-logging.basicConfig(
-    level=logging.DEBUG,
-    format="%(asctime)s | %(levelname)s | %(name)s | %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S",
-    handlers=[
-        logging.FileHandler(log_file, mode="w")  # Overwrite current log
-        #logging.StreamHandler()                  # Also log to console
-    ]
-)
+PLAYER_LOG_DIR = os.path.join(LOG_DIR, "players")
+LOG_FORMAT = "%(asctime)s | %(levelname)s | %(name)s | %(message)s"
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Per-subsystem levels, e.g. NEXORA_LOG_LEVELS="Planet=INFO,Trade=WARNING"
+LOG_LEVELS_ENV = "NEXORA_LOG_LEVELS"
+
+_listener = None
+
+
+# --------------------------------------------------------------------
+# Per-player routing
+# --------------------------------------------------------------------
+class PlayerLogRouter(logging.Handler):
+    """
+    Copies records carrying a `player_id` (see player_logger) to
+    logs/players/player_<id>.log. Files are opened on first use and the
+    least recently used ones closed past `max_open`.
+    """
+    def __init__(self, folder=PLAYER_LOG_DIR, max_open=64, level=logging.NOTSET):
+        super().__init__(level)
+        self.folder = folder
+        self.max_open = max_open
+        self._handlers = OrderedDict()   # player_id -> FileHandler
+
+    def _handler_for(self, player_id):
+        handler = self._handlers.get(player_id)
+        if handler is not None:
+            self._handlers.move_to_end(player_id)
+            return handler
+        os.makedirs(self.folder, exist_ok=True)
+        handler = logging.FileHandler(os.path.join(self.folder, f"player_{player_id}.log"), encoding="utf-8")
+        handler.setFormatter(self.formatter)
+        self._handlers[player_id] = handler
+        while len(self._handlers) > self.max_open:
+            _, oldest = self._handlers.popitem(last=False)
+            oldest.close()
+        return handler
+
+    def emit(self, record):
+        player_id = getattr(record, "player_id", None)
+        if player_id is None:
+            return
+        try:
+            self._handler_for(player_id).emit(record)
+        except Exception:
+            self.handleError(record)
+
+    def close(self):
+        for handler in self._handlers.values():
+            handler.close()
+        self._handlers.clear()
+        super().close()
+
+
+def player_logger(logger, player):
+    """Logger adapter tagging records with a player (or player ID) so they also go to that player's file."""
+    return logging.LoggerAdapter(logger, {"player_id": getattr(player, "id", player)})
+
+
+# --------------------------------------------------------------------
+# Setup
+# --------------------------------------------------------------------
+def setup_logging(name="game", console=False, level=logging.DEBUG, levels=None, per_player=True):
+    """
+    Route every record through a QueueHandler: callers only enqueue, and a
+    QueueListener thread does the file/console I/O off the event loop.
+    The first call wins (like logging.basicConfig); later calls only
+    apply `levels`.
+    """
+    global _listener
+    if _listener is not None:
+        set_log_levels(levels or {})
+        return
+
+    os.makedirs(LOG_DIR, exist_ok=True)
+    log_file = os.path.join(LOG_DIR, f"{name}.log")
+    # Optional: backup previous log
+    if os.path.exists(log_file):
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
+        shutil.move(log_file, os.path.join(LOG_DIR, f"{name}_{timestamp}.log"))
+
+    formatter = logging.Formatter(LOG_FORMAT, datefmt=DATE_FORMAT)
+    handlers = [logging.FileHandler(log_file, mode="w", encoding="utf-8")]  # Overwrite current log
+    if console:
+        handlers.append(logging.StreamHandler())
+    if per_player:
+        handlers.append(PlayerLogRouter())
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.setLevel(level)
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+    set_log_levels(parse_log_levels(os.environ.get(LOG_LEVELS_ENV, "")))
+    set_log_levels(levels or {})
+
+
+def stop_logging():
+    """Flush the queue and stop the listener thread (registered atexit)."""
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
+
+
+def log_queue_size():
+    """Records waiting for the listener thread (0 when logging isn't set up)."""
+    return _listener.queue.qsize() if _listener is not None else 0
+
+
+def parse_log_levels(spec):
+    """"Planet=INFO,Trade=WARNING" -> {"Planet": "INFO", "Trade": "WARNING"}."""
+    levels = {}
+    for part in spec.split(","):
+        if "=" in part:
+            name, level = part.split("=", 1)
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def set_log_level(subsystem, level):
+    """Change one subsystem's level at runtime ("root" for the default)."""
+    logger = logging.getLogger() if subsystem == "root" else logging.getLogger(subsystem)
+    logger.setLevel(level.upper() if isinstance(level, str) else level)
+
+
+def set_log_levels(levels):
+    for subsystem, level in levels.items():
+        set_log_level(subsystem, level)
+
 
 # Convenience function to get module-specific loggers
 def get_logger(name):
+    setup_logging()
     return logging.getLogger(name)
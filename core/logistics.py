@@ -0,0 +1,223 @@
+from collections import defaultdict, deque
+from core.registry import REGISTRY
+from core.logger_setup import get_logger
+
+log = get_logger("Logistics")
+
+EPSILON = 1e-9
+_SOURCE = "__source__"
+_SINK = "__sink__"
+
+
+# --------------------------------------------------------------------
+# Min-cost flow (successive shortest paths)
+# --------------------------------------------------------------------
+class FlowGraph:
+    """
+    Residual graph for min-cost flow. Edge i and i ^ 1 are a forward edge
+    and its reverse; each edge is [to, residual capacity, cost, tag].
+    """
+    def __init__(self):
+        self.adjacency = defaultdict(list)
+        self.edges = []
+        self.capacity = []   # original capacity per forward edge
+
+    def add_edge(self, u, v, capacity, cost, tag=None):
+        self.adjacency[u].append(len(self.edges))
+        self.edges.append([v, float(capacity), float(cost), tag])
+        self.capacity.append(float(capacity))
+        self.adjacency[v].append(len(self.edges))
+        self.edges.append([u, 0.0, -float(cost), None])
+        self.capacity.append(0.0)
+
+    def flow(self, edge):
+        return self.capacity[edge] - self.edges[edge][1]
+
+    def min_cost_flow(self, source, sink):
+        """
+        Push as much flow as possible from source to sink at minimum cost.
+        Shortest paths use SPFA (Bellman-Ford with a queue) since residual
+        edges carry negative costs. Returns (total flow, total cost).
+        """
+        edges = self.edges
+        adjacency = self.adjacency
+        total_flow = total_cost = 0.0
+        while True:
+            dist = {source: 0.0}
+            via = {}
+            queue = deque([source])
+            queued = {source}
+            while queue:
+                u = queue.popleft()
+                queued.discard(u)
+                du = dist[u]
+                for i in adjacency[u]:
+                    v, cap, cost, _ = edges[i]
+                    if cap <= EPSILON:
+                        continue
+                    if du + cost < dist.get(v, float("inf")) - EPSILON:
+                        dist[v] = du + cost
+                        via[v] = i
+                        if v not in queued:
+                            queue.append(v)
+                            queued.add(v)
+            if sink not in dist:
+                break
+
+            push = float("inf")
+            node = sink
+            while node != source:
+                i = via[node]
+                push = min(push, edges[i][1])
+                node = edges[i ^ 1][0]
+            node = sink
+            while node != source:
+                i = via[node]
+                edges[i][1] -= push
+                edges[i ^ 1][1] += push
+                node = edges[i ^ 1][0]
+            total_flow += push
+            total_cost += push * dist[sink]
+        return total_flow, total_cost
+
+
+class GoodFlows:
+    """Solved shipping plan for one good."""
+    def __init__(self, good):
+        self.good = good
+        self.route_flows = {}   # route id -> units/turn shipped
+        self.shipped = {}       # planet id -> units/turn sent (local use excluded)
+        self.received = {}      # planet id -> units/turn delivered
+        self.unmet = {}         # planet id -> demand left unsatisfied
+        self.cost = 0.0
+
+    def to_dict(self):
+        return {
+            "good": self.good,
+            "route_flows": self.route_flows,
+            "shipped": self.shipped,
+            "received": self.received,
+            "unmet": self.unmet,
+            "cost": self.cost,
+        }
+
+
+# --------------------------------------------------------------------
+# Supply network
+# --------------------------------------------------------------------
+class SupplyNetwork:
+    """
+    Assigns flows of each good from producing to consuming planets over the
+    TradeManager's routes, minimizing total transport cost (route distance
+    per unit). A route carries at most amount * efficiency per turn.
+
+    Goods are solved independently and only when something touching them
+    changed: a route of that good (through the TradeManager listener) or a
+    supply/demand rate. Other goods keep their previous solution.
+    """
+    def __init__(self, trade_manager):
+        self.trade_manager = trade_manager
+        trade_manager.listeners.append(self._on_route_changed)
+        self.supply = defaultdict(dict)   # good -> {planet id: units/turn produced}
+        self.demand = defaultdict(dict)   # good -> {planet id: units/turn consumed}
+        self.solutions = {}               # good -> GoodFlows
+        self._dirty = set()
+
+    # ---------------- Rates ----------------
+    def set_supply(self, planet_id, good, rate):
+        self._set_rate(self.supply[good], planet_id, good, rate)
+
+    def set_demand(self, planet_id, good, rate):
+        self._set_rate(self.demand[good], planet_id, good, rate)
+
+    def set_refining_demand(self, planet_id, product, rate):
+        """Demand for every refining input of `product` (resources.json "inputs") at `rate` units/turn."""
+        inputs = REGISTRY.get("resources", {}).get(product, {}).get("inputs", {})
+        for good, per_unit in inputs.items():
+            self.set_demand(planet_id, good, per_unit * rate)
+
+    def _set_rate(self, rates, planet_id, good, rate):
+        rate = max(0.0, float(rate))
+        if abs(rates.get(planet_id, 0.0) - rate) <= EPSILON:
+            return
+        if rate > 0:
+            rates[planet_id] = rate
+        else:
+            rates.pop(planet_id, None)
+        self._dirty.add(good)
+
+    def _on_route_changed(self, route):
+        self._dirty.add(route.good)
+
+    # ---------------- Solving ----------------
+    def solve(self):
+        """Re-solve the goods whose routes or rates changed; returns the goods solved."""
+        if not self._dirty:
+            return []
+        # Route capacities depend on efficiency, refreshed for dirty routes only
+        self.trade_manager.update_all_routes()
+        solved = sorted(self._dirty)
+        for good in solved:
+            self.solutions[good] = self._solve_good(good)
+        self._dirty.clear()
+        log.debug(f"[Logistics] Re-solved {len(solved)} goods: {', '.join(solved)}")
+        return solved
+
+    def _solve_good(self, good):
+        result = GoodFlows(good)
+        supply = dict(self.supply.get(good, {}))
+        demand = dict(self.demand.get(good, {}))
+
+        # Producers consume their own output first: no transport needed
+        for planet_id in list(demand):
+            local = min(supply.get(planet_id, 0.0), demand[planet_id])
+            if local > 0:
+                supply[planet_id] -= local
+                demand[planet_id] -= local
+
+        graph = FlowGraph()
+        for planet_id, rate in supply.items():
+            if rate > EPSILON:
+                graph.add_edge(_SOURCE, ("planet", planet_id), rate, 0.0)
+        sink_edges = {}
+        for planet_id, rate in demand.items():
+            if rate > EPSILON:
+                sink_edges[planet_id] = len(graph.edges)
+                graph.add_edge(("planet", planet_id), _SINK, rate, 0.0)
+
+        route_edges = {}
+        for route in self.trade_manager.routes_by_good.get(good, {}).values():
+            throughput = route.amount * route.efficiency
+            if throughput <= EPSILON:
+                continue
+            route_edges[route.id] = (len(graph.edges), route)
+            graph.add_edge(
+                ("planet", route.origin.global_id), ("planet", route.destination.global_id),
+                throughput, route.distance, tag=route.id
+            )
+
+        if sink_edges and route_edges:
+            _, result.cost = graph.min_cost_flow(_SOURCE, _SINK)
+
+        for route_id, (edge, route) in route_edges.items():
+            flow = graph.flow(edge)
+            if flow > EPSILON:
+                result.route_flows[route_id] = flow
+                origin, destination = route.origin.global_id, route.destination.global_id
+                result.shipped[origin] = result.shipped.get(origin, 0.0) + flow
+                result.received[destination] = result.received.get(destination, 0.0) + flow
+        for planet_id, edge in sink_edges.items():
+            missing = graph.capacity[edge] - graph.flow(edge)
+            if missing > EPSILON:
+                result.unmet[planet_id] = missing
+        return result
+
+    # ---------------- Queries ----------------
+    def flow_on(self, route):
+        """Units/turn the current plan sends along a route."""
+        solution = self.solutions.get(route.good)
+        return solution.route_flows.get(route.id, 0.0) if solution else 0.0
+
+    def unmet_demand(self, good):
+        solution = self.solutions.get(good)
+        return dict(solution.unmet) if solution else dict(self.demand.get(good, {}))
@@ -0,0 +1,135 @@
+import time
+from core.logger_setup import get_logger
+from core.registry import REGISTRY
+
+log = get_logger("Patents")
+
+
+class Patent:
+    """
+    Yield bonus on one building type, optionally narrowed to resource
+    types, refinement levels or tags (see data/patent-ex.json).
+    An empty filter matches everything.
+    """
+    def __init__(self, patent_id, target_building_type, bonus_multiplier=1.0,
+                 applies_to_resource_type=None, applies_to_refinement_level=None, applies_to_tags=None,
+                 owner_id=None, licensees=None, expires_at=None):
+        self.id = patent_id
+        self.target_building_type = target_building_type
+        self.bonus_multiplier = bonus_multiplier
+        self.applies_to_resource_type = list(applies_to_resource_type or [])
+        self.applies_to_refinement_level = list(applies_to_refinement_level or [])
+        self.applies_to_tags = list(applies_to_tags or [])
+        self.owner_id = owner_id
+        self.licensees = set(licensees or [])
+        self.expires_at = expires_at   # epoch seconds, None = never
+
+    def is_expired(self, now=None):
+        return self.expires_at is not None and (now or time.time()) >= self.expires_at
+
+    def is_usable_by(self, owner):
+        """Owner (player or ID) holds or licenses the patent and it hasn't expired."""
+        owner_id = getattr(owner, "id", owner)
+        if self.is_expired():
+            return False
+        return owner_id == self.owner_id or owner_id in self.licensees
+
+    def matches(self, resource_type, refinement_level, tags):
+        if self.applies_to_resource_type and resource_type not in self.applies_to_resource_type:
+            return False
+        if self.applies_to_refinement_level and refinement_level not in self.applies_to_refinement_level:
+            return False
+        if self.applies_to_tags and not any(tag in tags for tag in self.applies_to_tags):
+            return False
+        return True
+
+    def apply_bonus(self, yield_amount, resource_type=None, refinement_level=None):
+        return yield_amount * self.bonus_multiplier
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "target_building_type": self.target_building_type,
+            "bonus_multiplier": self.bonus_multiplier,
+            "applies_to_resource_type": self.applies_to_resource_type,
+            "applies_to_refinement_level": self.applies_to_refinement_level,
+            "applies_to_tags": self.applies_to_tags,
+            "owner_id": self.owner_id,
+            "licensees": sorted(self.licensees),
+            "expires_at": self.expires_at,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            data["id"],
+            data["target_building_type"],
+            bonus_multiplier=data.get("bonus_multiplier", 1.0),
+            applies_to_resource_type=data.get("applies_to_resource_type"),
+            applies_to_refinement_level=data.get("applies_to_refinement_level"),
+            applies_to_tags=data.get("applies_to_tags"),
+            owner_id=data.get("owner_id"),
+            licensees=data.get("licensees"),
+            expires_at=data.get("expires_at"),
+        )
+
+    def __repr__(self):
+        return f"<Patent {self.id} x{self.bonus_multiplier} on {self.target_building_type}>"
+
+
+class PatentIndex:
+    """
+    Combined patent bonus per (target_type, resource_type, refinement_level,
+    tags) for one player, pre-multiplied when the patent set changes.
+    Lookups are O(1) whatever the number of patents; the index rebuilds
+    itself when a patent expires (next_expiry is checked on every lookup).
+    """
+    def __init__(self, patents=()):
+        self.version = 0
+        self.rebuild(patents)
+
+    def rebuild(self, patents):
+        now = time.time()
+        self._patents = [p for p in patents if not p.is_expired(now)]
+        self._by_target = {}
+        for patent in self._patents:
+            self._by_target.setdefault(patent.target_building_type, []).append(patent)
+        expiries = [p.expires_at for p in self._patents if p.expires_at is not None]
+        self.next_expiry = min(expiries) if expiries else None
+        self._factors = {}
+        # Precompute every resource the registry knows; other keys are filled on first lookup
+        for resource_id, data in REGISTRY.get("resources", {}).items():
+            for target_type in self._by_target:
+                self.factor(target_type, resource_id)
+        self.version += 1
+
+    @staticmethod
+    def _resource_key(resource_id):
+        data = REGISTRY.get("resources", {}).get(resource_id, {})
+        return (
+            data.get("resource_type", "generic"),
+            data.get("refinement_level", "raw"),
+            frozenset(data.get("tags", []) or []),
+        )
+
+    def factor(self, target_type, resource_id):
+        """Combined multiplier of every patent applying to target_type on resource_id."""
+        if self.next_expiry is not None and time.time() >= self.next_expiry:
+            log.debug("[Patents] A patent expired; rebuilding index")
+            self.rebuild(self._patents)
+        patents = self._by_target.get(target_type)
+        if not patents:
+            return 1.0
+        resource_type, refinement_level, tags = self._resource_key(resource_id)
+        key = (target_type, resource_type, refinement_level, tags)
+        factor = self._factors.get(key)
+        if factor is None:
+            factor = 1.0
+            for patent in patents:
+                if patent.matches(resource_type, refinement_level, tags):
+                    factor *= patent.bonus_multiplier
+            self._factors[key] = factor
+        return factor
+
+    def __len__(self):
+        return len(self._patents)
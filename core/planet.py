@@ -1,73 +1,98 @@
 import asyncio
+import logging
 from pickle import NONE
 import random
 import json
-import glob
 import os
 import msgpack
 import time
-from collections import defaultdict
+from collections import defaultdict, Counter
 from core.logger_setup import get_logger
-from core.slot import Slot
-from core.registry import REGISTRY
+from core.slot import Slot, SlotArray
+from core.registry import REGISTRY, compiled_registry, register_derived, registry_version
+from core.planet_tables import get_planet_tables
+from core.recipes import get_recipe_graph
 from core.defense import *
 from core.buildqueue import *
 from core.config import *
 
 log = get_logger("Planet")
 
-def build_resource_helpers_dynamic():
-    """
-    Dynamically build helper dictionaries from REGISTRY["resources"].
-    
-    Returns:
-        RESOURCE_NAMES_BY_TYPE: dict[str, list[str]]  # resource IDs grouped by type
-        RESOURCES_DATA: dict[str, dict]               # raw resource data by ID
-        RESOURCE_TYPES: list[str]                     # all resource types found
-    """
-    RESOURCES_DATA = REGISTRY.get("resources", {})
-    
-    # Detect all resource types dynamically
-    RESOURCE_TYPES = sorted({res.get("resource_type") for res in RESOURCES_DATA.values() if "resource_type" in res})
-    
-    RESOURCE_NAMES_BY_TYPE = {rtype: [] for rtype in RESOURCE_TYPES}
-    for res_id, res_data in RESOURCES_DATA.items():
-        rtype = res_data.get("resource_type")
-        if rtype in RESOURCE_TYPES:
-            RESOURCE_NAMES_BY_TYPE[rtype].append(res_id)
-        else:
-            log.warning(f"[Registry] Resource '{res_id}' has unknown type '{rtype}'")
-    
+_KEEP = object()  # update_slot: leave the building as is
+
+# Resource helper tables, refilled in place on every registry load (so names
+# imported elsewhere stay valid):
+RESOURCE_NAMES_BY_TYPE = {}  # resource type -> resource IDs
+RESOURCES_DATA = {}          # resource ID -> raw resource data
+RESOURCE_TYPES = []          # all resource types found
+
+
+def build_resource_helpers_dynamic(compiled):
+    """Refill the resource helper tables from the compiled registry."""
+    resources = compiled.table("resources")
+    RESOURCES_DATA.clear()
+    RESOURCES_DATA.update((res_id, record.raw) for res_id, record in resources.items())
+    RESOURCE_TYPES[:] = sorted(compiled.resources_by_type)
+    RESOURCE_NAMES_BY_TYPE.clear()
+    RESOURCE_NAMES_BY_TYPE.update((rtype, list(ids)) for rtype, ids in compiled.resources_by_type.items())
+    for res_id, record in resources.items():
+        if "resource_type" not in record.raw:
+            log.warning(f"[Registry] Resource '{res_id}' has no resource_type")
     log.info(f"[Registry] Detected resource types: {RESOURCE_TYPES}")
-    return RESOURCE_NAMES_BY_TYPE, RESOURCES_DATA, RESOURCE_TYPES
+    return RESOURCES_DATA
+
 
-# Usage after loading registry
-RESOURCE_NAMES_BY_TYPE, RESOURCES_DATA, RESOURCE_TYPES = build_resource_helpers_dynamic()
+register_derived("resource_helpers", build_resource_helpers_dynamic)
 
 
 class Planet:
     _next_global_id = 1
-    def __init__(self, name=None, star_system=None, population=None):
-        self.name = name or self.generate_name()
+    DEFAULT_RESOURCE = "basaltic_ore"
+    # Planets are the bulk of a player's resident memory: fixed attribute
+    # layout instead of a per-instance __dict__. New attributes go here.
+    __slots__ = (
+        # identity / type
+        "name", "global_id", "id", "star_system", "planet_type_id", "planet_type",
+        "name_display", "description", "rarity", "colonization_cost", "habitability",
+        "climate", "features", "bonuses", "resource_bonus", "defense_bonus",
+        # colonization / production
+        "current_resource_type", "current_resource", "mode", "can_refine", "is_colonized",
+        "resources", "statistics", "resource_mined", "resource_refined", "resource_farmed",
+        # population / slots (see update_slot)
+        "population_max", "population", "slots", "_slot_counts", "_slot_type_versions", "slot_version",
+        # trade / industry / defense
+        "trade_routes", "trade_capacity", "industry_points", "defense", "defense_value", "build_queue",
+        # caches
+        "_last_cache_signature", "_resource_cache", "_cache_signatures", "_patent_version",
+        # graphics (client)
+        "rotation_gif_path", "rotation_variant", "animation",
+        # sync
+        "_last_sent_resources", "_last_sync_time", "_last_resource_sync",
+    )
+
+    def __init__(self, name=None, star_system=None, population=None, rng=None):
+        """
+        rng: optional random.Random used for every roll, so a seeded star system
+        regenerates the same planets. Defaults to the global random module.
+        """
+        rng = rng or random
+        self.name = name or self.generate_name(rng)
         self.global_id = Planet._next_global_id
         Planet._next_global_id += 1
         self.star_system = star_system
         self.id=0 # TODO : immediately modified when construct by star system, we can keep it for id inside a star system 
 
         # --- Planet type ---
-        self.planet_type_id = self.generate_planet_type()
+        self.planet_type_id = self.generate_planet_type(rng)
         self.planet_type = REGISTRY["planets"][self.planet_type_id]
 
-        self.climate = self.assign_random_climate()
+        self.climate = self.assign_random_climate(rng)
         #TODO refactoring climate in json to gather all attributes (and description)
         self.features=None #Prevent attribute error
-        self.assign_features()
+        self.assign_features(rng=rng)
 
         #self.bonuses = self.planet_type.get("bonuses", {})
-        bonuses = self.assign_planet_bonuses(
-                planet_type=self.planet_type_id,
-                all_resources=REGISTRY["resources"]
-            )
+        bonuses = self.assign_planet_bonuses(planet_type=self.planet_type_id, rng=rng)
         #print(f"[Planet__init__] self.bonuses: {self.bonuses}")
         self.resource_bonus = bonuses
         #print(f"[Planet__init__] self.resource_bonus: {self.resource_bonus}")
@@ -84,15 +109,16 @@ class Planet:
 
         # --- Colonization / Resources ---
         self.current_resource_type = None
-        self.current_resource = "basaltic_ore" #prevent attribute error
+        self.current_resource = Planet.DEFAULT_RESOURCE #prevent attribute error
         self.mode = None  # "mine" or "refine"
         self.can_refine = False
         self.is_colonized = False
 
         # --- Population / Slots ---
-        self.population_max = population or random.randint(1, 20)
+        self.population_max = population or rng.randint(1, 20)
         self.population= 0
-        self.slots = [Slot() for _ in range(self.population_max)]
+        self.slots = SlotArray(self.population_max)
+        self._rebuild_slot_counters()
         #Trade
         self.trade_routes = []  # list[TradeRoute]
         self.trade_capacity = max(1, self.population_max// 4)
@@ -134,69 +160,44 @@ class Planet:
             "farm": None
         }
         # ---Graphics---
-        self.rotation_gif_path = None
-        self.assign_planet_gif()
+        self.rotation_gif_path = None  # resolved client-side from rotation_variant
+        self.rotation_variant = None
+        self.assign_planet_gif(rng)
         self.animation = None
 
         # ---Updates---
         self._last_sent_resources = {}
         self._last_sync_time = time.time()
+        self._last_resource_sync = 0.0
 
 
     # ---------------- Name / Type ----------------
-    def generate_name(self):
-        return f"Planet-{random.randint(1000, 9999)}"
+    def generate_name(self, rng=random):
+        return f"Planet-{rng.randint(1000, 9999)}"
 
-    def generate_planet_type(self):
-        planets = REGISTRY.get("planets", {})
+    def generate_planet_type(self, rng=random):
+        # Rarity weights live in a precomputed alias table (see core.planet_tables)
+        type_table = get_planet_tables().type_table
         # Safety: make sure registry actually has entries
-        if not planets:
+        if type_table is None:
             log.error("[Planet] No planet types loaded in REGISTRY['planets']!")
             # fallback to a generic terrestrial world
             return "terrestrial"
-
-        weights = {}
-        weights_map = {
-            "common": 0.25,
-            "uncommon": 0.15,
-            "rare": 0.05,
-            "very_rare": 0.02
-        }
-
-        for planet_type_id, data in planets.items():
-            rarity = data.get("rarity", "common").lower()
-            weights[planet_type_id] = weights_map.get(rarity, 0.1)
-
-        # Safety: filter out any invalid or zero weights
-        valid_items = [(pid, w) for pid, w in weights.items() if w > 0]
-
-        if not valid_items:
-            log.error("[Planet] No valid planet type weights found — using fallback.")
-            return "terrestrial"
-
-        # Unzip into two lists for random.choices
-        planet_ids, probs = zip(*valid_items)
-        return random.choices(planet_ids, weights=probs, k=1)[0]
+        return type_table.sample(rng)
     
     # ---------------- Feature Helpers ----------------
-    def get_features_for_type(self):
-        return [
-            f for f in REGISTRY["planet_features"].values()
-            if f["planet_type"] == self.planet_type_id
-        ]
+    def get_features_for_type(self, allow_negative=True):
+        tables = get_planet_tables()
+        by_type = tables.features_by_type if allow_negative else tables.positive_features_by_type
+        return by_type.get(self.planet_type_id, [])
 
-    def assign_features(self, min_features=1, max_features=3, allow_negative=True):
-        available_features = self.get_features_for_type()
+    def assign_features(self, min_features=1, max_features=3, allow_negative=True, rng=random):
+        available_features = self.get_features_for_type(allow_negative)
         if not available_features:
             return
-        if not allow_negative:
-            available_features = [
-                f for f in available_features
-                if not any(k.endswith("_penalty") for k in f.get("effects", {}))
-            ]
 
-        feature_count = random.randint(min_features, max_features)
-        self.features = random.sample(available_features, k=min(feature_count, len(available_features)))
+        feature_count = rng.randint(min_features, max_features)
+        self.features = rng.sample(available_features, k=min(feature_count, len(available_features)))
 
     def apply_feature_effects(self):
         for f in self.features:
@@ -206,41 +207,33 @@ class Planet:
                 else:
                     self.dynamic_effects[stat] = self.dynamic_effects.get(stat, 0) + value
 
-    def assign_planet_bonuses(self, planet_type, all_resources):
+    def assign_planet_bonuses(self, planet_type, rng=random):
         """
         Assign both raw and refined resource bonuses for a planet.
         
         planet_type: string
-        all_resources: list of dicts from resources.json
         Returns: dict with bonus multipliers
         """
         bonuses = {}
+        tables = get_planet_tables()
 
-        # Determine eligible resources for this planet type
-        eligible_ids = PLANET_TYPE_ALLOWED.get(planet_type, [])
-        
-        # Filter resources to planet-allowed only
-        eligible_resources = [r for id, r in all_resources.items() if r["id"] in eligible_ids]
+        # Eligible resources for this planet type, already filtered against the registry
+        eligible_ids = tables.eligible_resources_by_type.get(planet_type, [])
         
         # Apply rarity multiplier
-        rarity_multiplier = PLANET_RARITY_BONUS.get(planet_type, 1.0)
+        rarity_multiplier = tables.rarity_bonus.get(planet_type, 1.0)
+        # Make raw bonuses smaller than refined
+        raw_bonus = round(1.05 * rarity_multiplier, 2)  # +5% base, scaled
         
-        for res in eligible_resources:
-            base_multiplier = random.uniform(1.1, 1.5)  # +10% to +50% base
+        for res_id in eligible_ids:
+            base_multiplier = rng.uniform(1.1, 1.5)  # +10% to +50% base
             # Scale with rarity
             final_multiplier = base_multiplier * rarity_multiplier
-            bonuses[res["id"]] = round(final_multiplier, 2)
-            
-        # Optional: assign a smaller bonus to raw extraction (tier 1 resources) if planet allows it
-        for id, res in all_resources.items():
-            if res["id"] in PLANET_TYPE_ALLOWED.get(planet_type, []):
-                # Make raw bonuses smaller than refined
-                raw_bonus = 1.05 * rarity_multiplier  # +5% base, scaled
-                bonuses[res["id"]] = max(bonuses.get(res["id"], 1.0), round(raw_bonus, 2))
+            bonuses[res_id] = max(round(final_multiplier, 2), raw_bonus)
         
         return bonuses
     
-    def assign_random_climate(self):
+    def assign_random_climate(self, rng=random):
         """
         Assigns a random climate appropriate for this planet type.
         """
@@ -250,7 +243,7 @@ class Planet:
         if not possible:
             self.climate = "unknown"
         else:
-            self.climate = random.choice(possible)
+            self.climate = rng.choice(possible)
         
         return self.climate
 
@@ -261,6 +254,15 @@ class Planet:
         for f in self.features:
             print(f"- {f['name']}: {f['description']}")
 
+    # ---------------- Location ----------------
+    @property
+    def hex_coords(self):
+        """Axial (q, r) of the hex this planet orbits in, or None if detached."""
+        hextile = getattr(self.star_system, "hextile", None)
+        if hextile is None:
+            return None
+        return (hextile.q, hextile.r)
+
     # ---------------- Colonization ----------------
     def colonize(self, resource_type, resource_name, mode="mine"):
         self.current_resource_type = resource_type
@@ -284,6 +286,57 @@ class Planet:
 
     def get_used_slots(self):
         return [s for s in self.slots if not s.is_empty()]
+
+    def used_slot_count(self):
+        return len(self.slots) - self._slot_counts[("empty", "empty")]
+
+    # ---------------- Slot mutation ----------------
+    # Every slot change goes through update_slot so the per-type counters and
+    # versions stay exact; production caches compare versions instead of
+    # rebuilding tuples of every slot's state.
+    def _rebuild_slot_counters(self):
+        self._slot_counts = Counter()       # (type, "built"/"active"/"under_construction"/"empty") -> n
+        self._slot_type_versions = Counter()  # type -> version, bumped on any change touching that type
+        self.slot_version = getattr(self, "slot_version", 0) + 1
+        for slot in self.slots:
+            self._count_slot(slot, 1)
+
+    def _count_slot(self, slot, delta):
+        self._slot_counts[(slot.type, slot.status)] += delta
+        if slot.status == "built" and slot.active:
+            self._slot_counts[(slot.type, "active")] += delta
+
+    def count_slots(self, slot_type, state="built"):
+        """Slots of a type in a state: "built", "active" (built and switched on), "under_construction", "empty"."""
+        return self._slot_counts[(slot_type, state)]
+
+    def update_slot(self, slot, slot_type=None, status=None, building=_KEEP, active=None):
+        """Single mutation API for slots (build, complete, clear, toggle)."""
+        old_type = slot.type
+        self._count_slot(slot, -1)
+        if slot_type is not None:
+            slot.type = slot_type
+        if status is not None:
+            slot.status = status
+        if building is not _KEEP:
+            slot.building = building
+        if active is not None:
+            slot.active = active
+        self._count_slot(slot, 1)
+        self.slot_version += 1
+        self._slot_type_versions[old_type] += 1
+        self._slot_type_versions[slot.type] += 1
+
+    def clear_slot(self, slot):
+        log.info(f"[Slot] Clearing slot ({slot.type}).")
+        self.update_slot(slot, slot_type="empty", status="empty", building=None, active=True)
+
+    def toggle_slot(self, index):
+        """Toggle the slot at `index` in self.slots active/inactive; returns the slot."""
+        slot = self.slots[index]
+        self.update_slot(slot, active=not slot.active)
+        log.debug("[Slot] Slot (%s) active=%s", slot.type, slot.active)
+        return slot
     
     def remove_building_from_slot(self, building_type=None):
         """
@@ -299,8 +352,9 @@ class Planet:
             # Check if we match the desired building type (if specified)
             if building_type is None or slot.type == building_type:
                 removed_building_name = getattr(slot.building, "name", slot.type)
-                slot.clear()  # Or slot.free(), depending on your Slot API
-                return f"Removed {removed_building_name} and freed one {slot.type} slot."
+                removed_type = slot.type
+                self.clear_slot(slot)
+                return f"Removed {removed_building_name} and freed one {removed_type} slot."
         
         # Nothing to remove
         if building_type:
@@ -314,7 +368,7 @@ class Planet:
 
     def get_total_industry_points(self):
         total = self.industry_points
-        total += sum(100 for s in self.slots if s.type == "industry" and s.status == "built")
+        total += 100 * self.count_slots("industry", "built")
         return total
     
     def get_active_buildings_by_type(self, building_type):
@@ -327,11 +381,11 @@ class Planet:
     def extract_resources(self, force_recompute=False, player=None, server=None):
         if not self.is_colonized or not self.star_system:
             #changed, farm, mine, refine
-            log.debug(f"function returned False. orgigin : {self.star_system}")
+            log.debug("function returned False. orgigin : %s", self.star_system)
             return False
         
         if player is None:
-            log.debug(f"function returned False. origin : player is None : {player}")
+            log.debug("function returned False. origin : player is None")
             return False
         # Ensure resource structures exist
         self._resource_cache = getattr(self, "_resource_cache", {"mine": 0.0, "farm": 0.0, "refine": 0.0})
@@ -339,7 +393,13 @@ class Planet:
         self.statistics = getattr(self, "statistics", {"mine": 0.0, "refine": 0.0, "farm": 0.0})
         
         tech_level = 1.0
-        owner_patents = getattr(player, "patents", [])
+        # PatentIndex when the player has one (O(1) lookups), else a plain patent list
+        owner_patents = getattr(player, "patent_index", None) or getattr(player, "patents", [])
+        patent_version = getattr(owner_patents, "version", None)
+        if patent_version != getattr(self, "_patent_version", None):
+            # Granted, sold or expired patents change yields the signatures don't cover
+            force_recompute = True
+            self._patent_version = patent_version
         total_yield_mine = 0.0
         total_yield_farm = 0.0
         total_yield_refine = 0.0
@@ -355,7 +415,7 @@ class Planet:
             log.debug("No recomputing farm for this turn")
             total_yield_farm = self._resource_cache["farm"]
         else :
-            farm_count = len([s for s in self.slots if s.type == "farm" and s.status == "built" and s.active])
+            farm_count = self.count_slots("farm", "active")
             if farm_count > 0:
 
                 # Base yield per farm slot (you can define this elsewhere)
@@ -368,10 +428,9 @@ class Planet:
             self._resource_cache["farm"] = total_yield_farm
             self._cache_signatures["farm"] = farm_signature
         # Apply production (even if cached)
+        farm_resource = "Organifera" #basic funtion for now
+        self._produce("farm", farm_resource, total_yield_farm)
         if total_yield_farm > 0:
-            #basic funtion for now
-            farm_resource = "Organifera"
-            self.resources[farm_resource] = self.resources.get(farm_resource, 0) + total_yield_farm
             self.statistics["farm"] = total_yield_farm
             self.resource_farmed = farm_resource
 
@@ -380,11 +439,14 @@ class Planet:
         # ---------------------------
         resource_info = RESOURCES_DATA.get(self.current_resource)
         if resource_info:
-            if resource_info.get("inputs"):
+            if get_recipe_graph().is_refinable(self.current_resource):
                 # This resource needs inputs -> it’s a refined product
+                self._produce("mine", None, 0.0)
                 self.compute_refining(tech_level, owner_patents, force_recompute=force_recompute)
             else:
                 # No inputs -> it’s a raw extractable resource
+                self._convert(None, None)
+                self._cache_signatures["refine"] = None  # switching back must re-register the conversion
                 self.compute_mining(tech_level, owner_patents, force_recompute=force_recompute)
 
         # --- Send packet to client ---
@@ -395,16 +457,17 @@ class Planet:
                 packet = {
                     "type": "planet_resource_update",
                     "planet_global_id": self.global_id,
-                    "resources": self.resources,
                     "statistics": self.statistics,
                 }
                 async def _send_update():
                     try:
+                        # Snapshot at send time: a ledger tick may run between scheduling and sending
+                        packet["resources"] = self.resources.copy()
                         packed = msgpack.packb(packet, use_bin_type=True)
                         async with server.client_locks[writer]:
                             writer.write(len(packed).to_bytes(4, "big") + packed)
                             await writer.drain()
-                        log.debug(f"Sent resource_update packet for {self.name} to player {player.name}")
+                        log.debug("Sent resource_update packet for %s to player %s", self.name, player.name)
                     except Exception as e:
                         log.exception(f"Failed to send resource_update packet: {e}")
                 asyncio.create_task(_send_update())
@@ -417,7 +480,7 @@ class Planet:
 
         Args:
             yield_amount (float): base yield before patents
-            patents (list): list of Patent objects
+            patents (PatentIndex | list): the owner's patent index, or a list of Patent objects
             target_type (str): e.g. "mine", "refine", "organics"
             resource_name (str, optional): overrides self.current_resource for special cases
         """
@@ -426,6 +489,10 @@ class Planet:
             log.warning(f"apply_patents: unknown resource '{res_name}'")
             return yield_amount
 
+        # --- Fast path: pre-multiplied factor from the owner's PatentIndex ---
+        if hasattr(patents, "factor"):
+            return yield_amount * patents.factor(target_type, res_name)
+
         res_data = RESOURCES_DATA[res_name]
 
         # --- Extract relevant fields ---
@@ -435,7 +502,7 @@ class Planet:
 
         # --- Apply matching patents ---
         for patent in patents:
-            if not patent.is_usable_by(self.star_system.hextile.owner):
+            if not patent.is_usable_by(self.star_system.hextile.owner_id):
                 continue
 
             # Basic match by building type (e.g. mine, refine, organics)
@@ -461,7 +528,25 @@ class Planet:
 
         return yield_amount
 
-    
+    # ---------------- Production bookkeeping ----------------
+    @property
+    def _ledger_backed(self):
+        return hasattr(self.resources, "set_production")
+
+    def _produce(self, kind, resource_id, amount):
+        """
+        Ledger-backed planets register a per-tick rate (applied to all planets
+        at once by ResourceLedger.tick); standalone planets add it right away.
+        """
+        if self._ledger_backed:
+            self.resources.set_production(kind, resource_id, amount)
+        elif resource_id and amount:
+            self.resources[resource_id] = self.resources.get(resource_id, 0) + amount
+
+    def _convert(self, consumed, produced):
+        if self._ledger_backed:
+            self.resources.set_conversion(consumed, produced)
+
     def compute_mining(self, tech_level, owner_patents, force_recompute=False):
         """Compute mining yield for the current planet."""
         mine_signature = self._get_mine_signature()
@@ -473,7 +558,7 @@ class Planet:
             total_yield_mine = self._resource_cache["mine"]
 
         else:
-            mine_count = len([s for s in self.slots if s.type == "mine" and s.status == "built"])
+            mine_count = self.count_slots("mine", "built")
             total_yield_mine = 0.0  # default
 
             if mine_count > 0:
@@ -485,7 +570,7 @@ class Planet:
 
                 resource_data = RESOURCES_DATA.get(self.current_resource, {})
                 if resource_data.get("refinement_level") != "raw":
-                    log.warning(f"{self.name} is mining a non-raw resource ({self.current_resource})")
+                    log.warning("%s is mining a non-raw resource (%s)", self.name, self.current_resource)
                 refinement_level = resource_data.get("refinement_level", "raw")
                 refine_multiplier = REFINEMENT_YIELD_MULTIPLIERS.get(refinement_level, 1.0)
 
@@ -501,7 +586,9 @@ class Planet:
                     * refine_multiplier
                     * resource_yield
                 )
-                log.debug(f"mine_count :{mine_count}, yield_bonus : {self.get_resource_yield_bonus()}, refine_multiplier : {refine_multiplier}, resource_yield : {resource_yield}")
+                if log.isEnabledFor(logging.DEBUG):  # get_resource_yield_bonus() isn't free
+                    log.debug("mine_count :%s, yield_bonus : %s, refine_multiplier : %s, resource_yield : %s",
+                              mine_count, self.get_resource_yield_bonus(), refine_multiplier, resource_yield)
 
                 # --- Apply patents ---
                 total_yield_mine = self.apply_patents(
@@ -525,14 +612,16 @@ class Planet:
             changed = True  # <- flag to trigger packet update
 
         # --- Apply to stored resources ---
-        self.resources[self.current_resource] = (
-            self.resources.get(self.current_resource, 0) + total_yield_mine
-        )
+        self._produce("mine", self.current_resource, total_yield_mine)
 
-        log.debug(f"[{self.name}] mined {total_yield_mine:.2f} units of {self.current_resource}")
+        log.debug("[%s] mined %.2f units of %s", self.name, total_yield_mine, self.current_resource)
         return total_yield_mine
 
 
+    def _update_refine_statistic(self):
+        """Ledger-backed refining: report what the last tick did, 0 while it lacked inputs."""
+        self.statistics["refine"] = 0 if self.resources.conversion_blocked else round(self._resource_cache["refine"], 3)
+
     def compute_refining(self, tech_level, owner_patents, force_recompute=False):
         """Compute refined resource output based on available inputs and slots."""
 
@@ -541,41 +630,55 @@ class Planet:
         self._resource_cache.setdefault("refine", 0.0)
         # Skip recomputation if nothing changed
         if not force_recompute and refine_signature == self._cache_signatures.get("refine"):
+            if self._ledger_backed:
+                self._update_refine_statistic()
             return self._resource_cache["refine"]
 
         total_yield_refine = 0
-        refine_count = len([s for s in self.slots if s.type == "refine" and s.status == "built"])
+        refine_count = self.count_slots("refine", "built")
+        self._convert(None, None)
 
         if refine_count == 0:
             self.statistics["refine"] = 0
             return 0
 
-        # --- Get refining resource info ---
-        resource_info = RESOURCES_DATA.get(self.current_resource)
-        if not resource_info:
-            log.warning(f"{self.name}: current resource '{self.current_resource}' not found in RESOURCES_DATA.")
+        # --- Get the compiled recipe ---
+        if self.current_resource not in RESOURCES_DATA:
+            log.warning("%s: current resource '%s' not found in RESOURCES_DATA.", self.name, self.current_resource)
             self.statistics["refine"] = 0
             return 0
 
-        inputs = resource_info.get("inputs", {})
-        yield_factor = resource_info.get("yield", 1.0)
+        inputs, yield_factor = get_recipe_graph().recipe(self.current_resource)
 
         # --- Check if this resource is actually refinable ---
         if not inputs:
-            log.info(f"{self.name}: Resource '{self.current_resource}' has no inputs, cannot refine.")
+            log.info("%s: Resource '%s' has no inputs, cannot refine.", self.name, self.current_resource)
             self.statistics["refine"] = 0
             return 0
 
         # --- Base yield before modifiers ---
         total_yield_refine = refine_count * tech_level * self.get_refine_bonus()
         total_yield_refine = self.apply_patents(total_yield_refine, owner_patents, target_type="refine")
+        refined_amount = total_yield_refine * yield_factor
+
+        if self._ledger_backed:
+            # The ledger checks input availability for every planet at tick time
+            self._convert(
+                {input_res: total_yield_refine * ratio for input_res, ratio in inputs.items()},
+                {self.current_resource: refined_amount},
+            )
+            self.resource_refined = self.current_resource
+            self._cache_signatures["refine"] = refine_signature
+            self._resource_cache["refine"] = refined_amount
+            self._update_refine_statistic()
+            return refined_amount
 
         # --- Check if we have enough input materials ---
         for input_res, ratio in inputs.items():
             required = total_yield_refine * ratio
             available = self.resources.get(input_res, 0)
             if available < required:
-                log.info(f"[{self.name}] Not enough {input_res} ({available}/{required}) to refine {self.current_resource}")
+                log.info("[%s] Not enough %s (%s/%s) to refine %s", self.name, input_res, available, required, self.current_resource)
                 self.statistics["refine"] = 0
                 return 0
 
@@ -585,7 +688,6 @@ class Planet:
             self.resources[input_res] -= consumed
 
         # --- Produce output ---
-        refined_amount = total_yield_refine * yield_factor
         self.resources[self.current_resource] = self.resources.get(self.current_resource, 0) + refined_amount
 
         self.resource_refined = self.current_resource
@@ -593,29 +695,23 @@ class Planet:
         self._cache_signatures["refine"] = refine_signature
         self._resource_cache["refine"] = refined_amount
 
-        log.debug(f"[{self.name}] Refined {self.current_resource}: +{refined_amount:.2f} (yield {yield_factor}, inputs {inputs})")
+        log.debug("[%s] Refined %s: +%.2f (yield %s, inputs %s)", self.name, self.current_resource, refined_amount, yield_factor, inputs)
         return
 
     # ---------------- Build Queue ----------------
 
     def start_build(self, item_id, building_manager=None):
         """Start building anything (building or defense) by ID."""
-        categories_to_check = ["buildings", "defense_units"]
-
-        data = None
-        for cat in categories_to_check:
-            if item_id in REGISTRY.get(cat, {}):
-                data = REGISTRY[cat][item_id]
-                break
-
-        if not data:
+        record = compiled_registry().get(item_id)
+        if record is None or record.category not in ("building", "defense"):
             log.warning(f"[Planet] {self.name}: Unknown build item '{item_id}'")
             return "Unknown build item - see logs for more details"
 
+        data = record.raw
         cost = data.get("cost", {})
-        industry_cost=cost.get("industry", 1000)
+        industry_cost = record.cost.get("industry", 1000)
         build_time=(industry_cost/self.get_total_industry_points())*60
-        category = data.get("category", cat)
+        category = record.category
 
         log.info(f"[Planet] {self.name}: Started building {data['name']} ({category})")
 
@@ -633,9 +729,7 @@ class Planet:
                 new_building.status = "under_construction"
 
             # Assign to the slot
-            slot.building = new_building
-            slot.status = "under_construction"
-            slot.type = slot.building.slot_type
+            self.update_slot(slot, slot_type=new_building.slot_type, status="under_construction", building=new_building)
 
             # Queue the construction
             order = BuildOrder(
@@ -669,13 +763,17 @@ class Planet:
         data = order.data
 
         if order.category == "defense":
-            layer = DefenseLayer[data["layer"].upper()]
+            record = compiled_registry().get(data["id"], "defense_units")
+            if record is None:
+                log.warning(f"[Defense] {self.name}: '{data['id']}' is no longer in the registry")
+                return
             new_unit = DefenseUnit(
-                name=data["name"],
-                layer=layer,
-                defense_value=data["defense_value"],
-                upkeep=data["upkeep"],
-                power_use=data.get("power_use", 0)
+                id=record.id,
+                name=record.name,
+                layer=DefenseLayer[record.layer],
+                defense_value=record.defense_value,
+                upkeep=record.upkeep,
+                power_use=record.power_use
             )
             self.defense.add_unit(new_unit)
             #notification_mgmt.show(f"Added {new_unit.name} to {self.name}")
@@ -685,7 +783,7 @@ class Planet:
             slot = getattr(order, "slot", None)
             if slot and slot.building:
                 #slot.building.complete()
-                slot.status = "built"
+                self.update_slot(slot, status="built")
                 
                 #notification_mgmt.show(f"{slot.building.name} completed on {self.name}")
                 log.info(f"[Building] {slot.building.name} completed on {self.name}")
@@ -716,11 +814,7 @@ class Planet:
                 asyncio.create_task(_send_update())
 
     def get_total_defense_points(self):
-        total = 0
-        for unit in self.defense:
-            total +=unit.defense_value
-        
-        return total
+        return self.defense.get_total_defense_value()
     # ---------------- Bonuses ----------------
     def get_resource_yield_bonus(self):
         """
@@ -779,29 +873,27 @@ class Planet:
         return total
     
     # ---------------- Caching ----------------
+    # Signatures include the registry version: a hot reload (new yields,
+    # recipes...) invalidates every cached production value.
     def _get_cache_signature(self):
-        active_slots = [(s.type, s.status, s.active) for s in self.slots]
-        return (self.mode, self.current_resource, tuple(active_slots))
+        return (self.mode, self.current_resource, self.slot_version, registry_version())
     
     def _get_main_signature(self):
         """Cache key for mine/refine logic"""
-        relevant_slots = [(s.type, s.status, s.active) for s in self.slots if s.type in ("mine", "refine")]
-        return (self.mode, self.current_resource, tuple(relevant_slots))
+        versions = self._slot_type_versions
+        return (self.mode, self.current_resource, versions["mine"], versions["refine"], registry_version())
     
     def _get_mine_signature(self):
         """Cache key for mine logic"""
-        mine_slots = [(s.type, s.status, s.active) for s in self.slots if s.type == "mine"]
-        return (self.mode, self.current_resource, tuple(mine_slots))
+        return (self.mode, self.current_resource, self._slot_type_versions["mine"], registry_version())
     
     def _get_refine_signature(self):
         """Cache key for refine logic"""
-        refine_slots = [(s.type, s.status, s.active) for s in self.slots if s.type == "refine"]
-        return (self.mode, self.current_resource, tuple(refine_slots))
+        return (self.mode, self.current_resource, self._slot_type_versions["refine"], registry_version())
 
     def _get_farm_signature(self):
         """Cache key for farming logic"""
-        farm_slots = [(s.type, s.status, s.active) for s in self.slots if s.type == "farm"]
-        return tuple(farm_slots)
+        return (self._slot_type_versions["farm"], registry_version())
     
     def on_slots_changed(self, slot_type=None, action=None):
         """
@@ -846,6 +938,18 @@ class Planet:
             self._resource_cache = {"mine": 0.0, "farm": 0.0, "refine": 0.0}
             log.debug(f"[Planet:{self.name}] All caches invalidated (unknown slot type : {slot_type}).")
 
+    def is_modified(self):
+        """
+        True once the planet differs from what generation produced
+        (colonized, built on, stocked...). Unmodified planets are not saved:
+        they are regenerated from the galaxy seed.
+        """
+        if self.is_colonized or self.mode is not None or self.current_resource != Planet.DEFAULT_RESOURCE:
+            return True
+        if any(self.resources.values()) or self.build_queue.queue or self.defense.units:
+            return True
+        return any(s.type != "empty" or s.status != "empty" or not s.active for s in self.slots)
+
     # ---------------- Statistics ----------------
     def get_statistics(self):
         return {
@@ -857,7 +961,7 @@ class Planet:
 
     # ---------------- Representations ----------------
     def __repr__(self):
-        used = len(self.get_used_slots())
+        used = self.used_slot_count()
         total = len(self.slots)
         if not self.is_colonized:
             return f"[{self.name_display} Uncolonized], Pop={self.population_max}B, Slots={used}/{total}"
@@ -880,7 +984,7 @@ class Planet:
             "planet_type": self.planet_type_id,
             "is_colonized": self.is_colonized,
             "bonuses": self.bonuses,
-            "gif_path": self.rotation_gif_path,
+            "gif_variant": self.rotation_variant,
             "statistics": self.statistics,
             "climate":self.climate,
             "features":self.features,
@@ -918,8 +1022,31 @@ class Planet:
         return deltas
     
     #Hydration
+    @staticmethod
+    def _planet_type_meta(planet_type_id, planet_types=None):
+        """
+        Return the registry-derived metadata shared by every planet of a type.
+        When a `planet_types` dict is given it is used as a cache, so bulk
+        hydration only hits the registry once per planet type.
+        """
+        if planet_types is not None and planet_type_id in planet_types:
+            return planet_types[planet_type_id]
+
+        planet_type = REGISTRY["planets"].get(planet_type_id, {})
+        meta = (
+            planet_type,
+            planet_type.get("name", planet_type_id.title()),
+            planet_type.get("description", ""),
+            planet_type.get("rarity", "common"),
+            planet_type.get("colonization_cost", {"credits": 100, "resources": {}}),
+            planet_type.get("habitability", 0.5),
+        )
+        if planet_types is not None:
+            planet_types[planet_type_id] = meta
+        return meta
+
     @classmethod
-    def from_dict(cls, data: dict, star_system=None):
+    def from_dict(cls, data: dict, star_system=None, planet_types=None):
         """
         Rebuild a Planet instance from a serialized dictionary.
         Expected structure:
@@ -931,6 +1058,8 @@ class Planet:
             "planet_type": "volcanic",
             "is_colonized": False
         }
+        planet_types: optional dict shared across a bulk load to cache
+        per-type registry metadata (see _planet_type_meta).
         """
         # 1️⃣ Create a new Planet (but skip random generation)
         planet = cls.__new__(cls)
@@ -941,20 +1070,24 @@ class Planet:
         planet.name = data.get("name", f"Planet-{planet.id}")
         planet.star_system = star_system
 
+        # Keep freshly generated planets from reusing a loaded global ID
+        if planet.global_id >= Planet._next_global_id:
+            Planet._next_global_id = planet.global_id + 1
+
         # 2️⃣ Planet type and metadata from registry
         planet.planet_type_id = data.get("planet_type", "terrestrial")
-        planet.planet_type = REGISTRY["planets"].get(planet.planet_type_id, {})
+        (
+            planet.planet_type,
+            planet.name_display,
+            planet.description,
+            planet.rarity,
+            planet.colonization_cost,
+            planet.habitability,
+        ) = cls._planet_type_meta(planet.planet_type_id, planet_types)
 
         planet.bonuses = data.get("bonuses", {})
         planet.resource_bonus = planet.bonuses.get("resources", {})
         planet.defense_bonus = planet.bonuses.get("defense", 1.0)
-        planet.name_display = planet.planet_type.get("name", planet.planet_type_id.title())
-        planet.description = planet.planet_type.get("description", "")
-        planet.rarity = planet.planet_type.get("rarity", "common")
-        planet.colonization_cost = planet.planet_type.get(
-            "colonization_cost", {"credits": 100, "resources": {}}
-        )
-        planet.habitability = planet.planet_type.get("habitability", 0.5)
 
         # 3️⃣ Colonization & resources
         planet.current_resource_type = data.get("current_resource_type")
@@ -962,35 +1095,33 @@ class Planet:
         planet.mode = data.get("mode", None)
         planet.can_refine = data.get("can_refine", False)
         planet.is_colonized = data.get("is_colonized", False)
-        planet.resources = data.get("resources", {})
+        planet.resources = defaultdict(float, data.get("resources", {}))
 
         planet.population_max = data.get("population_max", 1)
         planet.population = data.get("population", 0)
 
         # 4️⃣ Slots (simplify hydration)
-        slot_data = data.get("slots", [])
-        planet.slots = []
-        for s in slot_data:
-            slot = Slot(
-                slot_type=s.get("type", "empty"),              
-            )
-            slot.active=s.get("active", True)
-            #has_building=s.get("has_building", False),
-            #building_name=s.get("building_name"),
-            planet.slots.append(slot)
+        # Keeps status too: a built slot must still count as built after a reload
+        planet.slots = SlotArray.from_dicts(data.get("slots", []))
+        planet._rebuild_slot_counters()
 
         # 5️⃣ Defaults for non-serialized components
         planet.industry_points = 1000
-        planet.defense = PlanetDefense()
         planet.defense_value = data.get("defense_value", 0)
+        planet.trade_routes = []
+        planet.trade_capacity = max(1, planet.population_max // 4)
 
         planet.build_queue = BuildQueue()
 
         planet._last_cache_signature = None
-        planet._resource_cache = {"main": 0.0, "farm": 0.0, "total": 0.0}
-        planet._cache_signatures = {"main": None, "farm": None}
-
-        planet.rotation_gif_path = data.get("gif_path", None)
+        planet._resource_cache = {"mine": 0.0, "refine": 0.0, "farm": 0.0}
+        planet._cache_signatures = {"mine": None, "refine": None, "farm": None}
+        planet._last_sent_resources = {}
+        planet._last_sync_time = time.time()
+        planet._last_resource_sync = 0.0
+
+        planet.rotation_variant = data.get("gif_variant", None)
+        planet.rotation_gif_path = data.get("gif_path", None)  # saves from before gif_variant
         planet.animation = None
 
         planet.statistics = data.get("statistics", {})
@@ -1003,11 +1134,12 @@ class Planet:
     def set_resource(self, resource):
         self.current_resource=resource
     
-    def assign_planet_gif(self, base_folder="assets/planets_rotation"):
-        type_folder = os.path.join(base_folder, self.planet_type_id)
-        gifs = glob.glob(os.path.join(type_folder, "*.gif"))
-        # TODO even simplier, just planet.rotation_variant = 3
-        # and then the client interpret f"assets/planet_rotation/{planet.planet_type_id}/volcanic_{planet.rotation_variant:02d}.gif"
-        if gifs:
-            chosen = random.choice(gifs)
-            self.rotation_gif_path = chosen
\ No newline at end of file
+    def assign_planet_gif(self, rng=random):
+        """
+        Pick a rotation GIF variant index for this planet type.
+        The client resolves the index to a file (AssetsManager.resolve_planet_gif),
+        so the server never touches the filesystem here.
+        """
+        variants = get_planet_tables().rotation_variants.get(self.planet_type_id, 0)
+        if variants > 0:
+            self.rotation_variant = rng.randrange(variants)
\ No newline at end of file
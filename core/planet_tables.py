@@ -0,0 +1,121 @@
+import random
+from core.logger_setup import get_logger
+from core.registry import REGISTRY, register_derived, derived
+from core.config import PLANET_TYPE_ALLOWED, PLANET_RARITY_BONUS
+
+log = get_logger("PlanetTables")
+
+# Relative weight of each planet rarity when rolling a planet type
+PLANET_RARITY_WEIGHTS = {
+    "common": 0.25,
+    "uncommon": 0.15,
+    "rare": 0.05,
+    "very_rare": 0.02
+}
+DEFAULT_RARITY_WEIGHT = 0.1
+
+
+# --------------------------------------------------------------------
+# Weighted sampling
+# --------------------------------------------------------------------
+class AliasTable:
+    """
+    Walker/Vose alias table: O(n) to build, O(1) per weighted draw.
+    """
+    def __init__(self, items, weights):
+        items = list(items)
+        weights = [float(w) for w in weights]
+        if not items or len(items) != len(weights):
+            raise ValueError("AliasTable needs one positive weight per item")
+
+        total = sum(weights)
+        if total <= 0:
+            raise ValueError("AliasTable weights must sum to a positive value")
+
+        n = len(items)
+        scaled = [w * n / total for w in weights]
+        self.items = items
+        self.prob = [1.0] * n
+        self.alias = list(range(n))
+
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] = scaled[l] + scaled[s] - 1.0
+            if scaled[l] < 1.0:
+                small.append(l)
+            else:
+                large.append(l)
+        # Whatever remains is 1.0 up to rounding error
+        for i in small + large:
+            self.prob[i] = 1.0
+
+    def sample(self, rng=random):
+        """Draw one item; `rng` is anything with a random() method."""
+        u = rng.random() * len(self.items)
+        i = int(u)
+        if u - i < self.prob[i]:
+            return self.items[i]
+        return self.items[self.alias[i]]
+
+    def __len__(self):
+        return len(self.items)
+
+
+# --------------------------------------------------------------------
+# Registry-derived planet generation tables
+# --------------------------------------------------------------------
+class PlanetTables:
+    """
+    Everything Planet.__init__ needs from the registry, precomputed once per
+    registry version:
+      - type_table: alias table over planet type IDs weighted by rarity
+      - features_by_type / positive_features_by_type: planet features per type
+      - eligible_resources_by_type: resource IDs a type gets bonuses for
+      - rotation_variants: number of rotation GIF variants per type
+    """
+    def __init__(self, version):
+        self.version = version
+        planets = REGISTRY.get("planets", {})
+
+        self.type_table = None
+        valid = [
+            (pid, PLANET_RARITY_WEIGHTS.get(data.get("rarity", "common").lower(), DEFAULT_RARITY_WEIGHT))
+            for pid, data in planets.items()
+        ]
+        valid = [(pid, w) for pid, w in valid if w > 0]
+        if valid:
+            ids, weights = zip(*valid)
+            self.type_table = AliasTable(ids, weights)
+
+        self.features_by_type = {}
+        self.positive_features_by_type = {}
+        for feature in REGISTRY.get("planet_features", {}).values():
+            ptype = feature.get("planet_type")
+            self.features_by_type.setdefault(ptype, []).append(feature)
+            if not any(k.endswith("_penalty") for k in feature.get("effects", {})):
+                self.positive_features_by_type.setdefault(ptype, []).append(feature)
+
+        resources = REGISTRY.get("resources", {})
+        self.eligible_resources_by_type = {
+            ptype: [rid for rid in resources if rid in allowed]
+            for ptype, allowed in PLANET_TYPE_ALLOWED.items()
+        }
+        self.rarity_bonus = dict(PLANET_RARITY_BONUS)
+
+        self.rotation_variants = {
+            pid: int(data.get("rotation_variants", 0)) for pid, data in planets.items()
+        }
+        log.debug(f"[PlanetTables] Built tables for registry version {version} ({len(planets)} planet types)")
+
+
+register_derived("planet_tables", lambda compiled: PlanetTables(compiled.version))
+
+
+def get_planet_tables():
+    """Return the planet tables for the current registry (rebuilt on every registry load)."""
+    return derived("planet_tables")
@@ -0,0 +1,177 @@
+from collections import deque
+import numpy as np
+from core.logger_setup import get_logger
+from core.registry import REGISTRY, register_derived, derived
+
+log = get_logger("RecipeGraph")
+
+
+class RecipeGraph:
+    """
+    Refining recipes from resources.json compiled into dense arrays, once per
+    registry version.
+
+    Resources are indexed in topological order (inputs before products). For
+    a refining batch of size b on product p:
+        consumes  b * inputs[p, i]  of every input i
+        produces  b * yields[p]     units of p
+    raw[p] holds the raw resources needed per unit of p, expanded through
+    every intermediate tier.
+
+    Validation problems (unknown inputs, cycles, inconsistent refines_to)
+    are logged and kept in self.errors. Resources caught in a cycle stay
+    refinable, but they go last in the order and are not expanded through
+    each other: their raw requirements list cyclic inputs as they are.
+    """
+    def __init__(self, version):
+        self.version = version
+        self.errors = []
+        resources = REGISTRY.get("resources", {})
+
+        # --- Validate inputs ---
+        recipes = {}
+        for rid, data in resources.items():
+            inputs = {}
+            for input_id, ratio in (data.get("inputs") or {}).items():
+                if input_id not in resources:
+                    self.errors.append(f"'{rid}' needs unknown input '{input_id}'")
+                    continue
+                inputs[input_id] = float(ratio)
+            recipes[rid] = inputs
+            target = data.get("refines_to")
+            if target and target not in resources:
+                self.errors.append(f"'{rid}' refines to unknown resource '{target}'")
+            elif target and rid not in (resources[target].get("inputs") or {}):
+                self.errors.append(f"'{rid}' refines to '{target}', which doesn't list it as an input")
+
+        # --- Topological order (Kahn) ---
+        pending = {rid: len(inputs) for rid, inputs in recipes.items()}
+        users = {rid: [] for rid in recipes}
+        for rid, inputs in recipes.items():
+            for input_id in inputs:
+                users[input_id].append(rid)
+        queue = deque(rid for rid in resources if pending[rid] == 0)
+        order = []
+        while queue:
+            rid = queue.popleft()
+            order.append(rid)
+            for user in users[rid]:
+                pending[user] -= 1
+                if pending[user] == 0:
+                    queue.append(user)
+        cyclic = [rid for rid in resources if pending[rid] > 0]
+        if cyclic:
+            self.errors.append(f"refining cycle between {sorted(cyclic)}")
+            order.extend(cyclic)
+        self.cyclic = set(cyclic)
+
+        for error in self.errors:
+            log.warning(f"[Recipes] {error}")
+
+        # --- Dense arrays ---
+        self.resource_ids = order
+        self.index = {rid: i for i, rid in enumerate(order)}
+        n = len(order)
+        self.inputs = np.zeros((n, n))
+        self.yields = np.ones(n)
+        self.refinable = np.zeros(n, dtype=np.bool_)
+        self.tier = np.zeros(n, dtype=np.int32)
+        for rid in order:
+            p = self.index[rid]
+            for input_id, ratio in recipes[rid].items():
+                self.inputs[p, self.index[input_id]] = ratio
+            if recipes[rid]:
+                self.refinable[p] = True
+                self.yields[p] = float(resources[rid].get("yield", 1.0)) or 1.0
+                acyclic = [self.tier[self.index[i]] for i in recipes[rid] if i not in self.cyclic]
+                self.tier[p] = 1 + max(acyclic, default=0)
+
+        # Raw bill of materials per unit, filled in topological order
+        self.raw = np.zeros((n, n))
+        for p, rid in enumerate(order):
+            if not self.refinable[p]:
+                self.raw[p, p] = 1.0
+                continue
+            for input_id, ratio in recipes[rid].items():
+                i = self.index[input_id]
+                if input_id in self.cyclic:
+                    self.raw[p, i] += ratio / self.yields[p]
+                else:
+                    self.raw[p] += ratio / self.yields[p] * self.raw[i]
+        log.debug(f"[Recipes] Compiled {n} resources ({int(self.refinable.sum())} refinable) for registry version {version}")
+
+    # ---------------- Lookups ----------------
+    def is_refinable(self, resource_id):
+        i = self.index.get(resource_id)
+        return i is not None and bool(self.refinable[i])
+
+    def recipe(self, resource_id):
+        """({input: ratio per batch}, yield per batch) of a product, or (None, None) if it isn't refined."""
+        p = self.index.get(resource_id)
+        if p is None or not self.refinable[p]:
+            return None, None
+        row = self.inputs[p]
+        inputs = {self.resource_ids[i]: float(row[i]) for i in np.flatnonzero(row).tolist()}
+        return inputs, float(self.yields[p])
+
+    def raw_requirements(self, resource_id, amount=1.0):
+        """Raw resources needed to end up with `amount` units of a product, e.g. for UI tooltips."""
+        p = self.index.get(resource_id)
+        if p is None:
+            return {}
+        need = self.raw[p] * amount
+        return {self.resource_ids[i]: float(need[i]) for i in np.flatnonzero(need).tolist()}
+
+    # ---------------- Batched planet computations ----------------
+    def columns_in(self, resource_ids):
+        """
+        Map the graph's columns into another column layout (e.g. a
+        ResourceLedger's resource_ids). -1 where the layout lacks a resource.
+        """
+        position = {rid: i for i, rid in enumerate(resource_ids)}
+        return np.array([position.get(rid, -1) for rid in self.resource_ids], dtype=np.int64)
+
+    def _product_indexes(self, products):
+        return np.array([self.index.get(p, -1) if p else -1 for p in products], dtype=np.int64)
+
+    def max_batches(self, stock, products):
+        """
+        Largest refining batch each planet can run with its current stock.
+        stock: (planets, resources) in graph column order; products: one
+        resource ID (or None) per planet.
+        """
+        idx = self._product_indexes(products)
+        valid = idx >= 0
+        ratios = np.zeros_like(stock)
+        ratios[valid] = self.inputs[idx[valid]]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            per_input = np.where(ratios > 0, stock / ratios, np.inf)
+        batches = per_input.min(axis=1) if stock.shape[1] else np.zeros(stock.shape[0])
+        batches[~valid | ~self.refinable[np.maximum(idx, 0)]] = 0.0
+        return batches
+
+    def feasible(self, stock, products, batches):
+        """Boolean per planet: is there enough stock to run the requested batch."""
+        return self.max_batches(stock, products) >= np.asarray(batches) - 1e-9
+
+    def consumption(self, products, batches):
+        """
+        (planets, resources) stock deltas for running the given batches:
+        inputs negative, products positive.
+        """
+        idx = self._product_indexes(products)
+        batches = np.asarray(batches, dtype=np.float64)
+        valid = (idx >= 0)
+        delta = np.zeros((len(idx), len(self.resource_ids)))
+        delta[valid] = -self.inputs[idx[valid]] * batches[valid, None]
+        rows = np.flatnonzero(valid)
+        delta[rows, idx[valid]] += self.yields[idx[valid]] * batches[valid]
+        return delta
+
+
+register_derived("recipe_graph", lambda compiled: RecipeGraph(compiled.version))
+
+
+def get_recipe_graph():
+    """Return the recipe graph for the current registry (recompiled on every registry load)."""
+    return derived("recipe_graph")
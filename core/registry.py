@@ -1,6 +1,7 @@
 import json
 import os
 from core.logger_setup import get_logger
+from core.registry_records import CompiledRegistry
 
 log = get_logger("Registry")
 
@@ -18,24 +19,94 @@ REGISTRY = {
     "all": {}
 }
 
+# Bumped on every load / rehydrate / merge so derived tables can tell they are stale
+REGISTRY_VERSION = 0
+
+# Typed records + indexes of the current REGISTRY content (see core.registry_records)
+_compiled = CompiledRegistry(REGISTRY, REGISTRY_VERSION)
+
+
+def registry_version():
+    """Return the version of the currently loaded registry content."""
+    return REGISTRY_VERSION
+
+
+def compiled_registry():
+    """Typed, immutable records and indexes for the current registry version."""
+    return _compiled
+
+
+def _bump_registry_version():
+    """Called after every load / rehydrate / merge: new version, recompiled records, rebuilt tables."""
+    global REGISTRY_VERSION, _compiled
+    REGISTRY_VERSION += 1
+    _compiled = CompiledRegistry(REGISTRY, REGISTRY_VERSION)
+    _rebuild_derived()
+
+
+# --------------------------------------------------------------------
+# Derived tables
+# --------------------------------------------------------------------
+# Modules register a builder(compiled) -> table once at import; every table
+# is rebuilt right after each load / rehydrate / merge and read with
+# derived(name), so nothing is computed at import time or per call.
+_derived_builders = {}   # name -> builder
+_derived = {}            # name -> table for the current version
+
+
+def register_derived(name, builder):
+    """Register a registry-derived table. Built now if a registry is already loaded."""
+    _derived_builders[name] = builder
+    _derived.pop(name, None)
+    if REGISTRY_VERSION > 0:
+        _build_derived(name)
+
+
+def derived(name):
+    """Current table of a registered builder."""
+    table = _derived.get(name)
+    if table is None:
+        table = _build_derived(name, strict=True)
+    return table
+
+
+def _build_derived(name, strict=False):
+    try:
+        table = _derived[name] = _derived_builders[name](_compiled)
+        return table
+    except Exception:
+        if strict:
+            raise
+        # Don't let one broken table abort a registry load; derived() retries and raises
+        log.exception(f"[Registry] Failed to build derived table '{name}'")
+        return None
+
+
+def _rebuild_derived():
+    _derived.clear()
+    for name in _derived_builders:
+        _build_derived(name)
+    if _derived_builders:
+        log.debug(f"[Registry] Rebuilt {len(_derived)} derived tables for version {REGISTRY_VERSION}")
+
 # --------------------------------------------------------------------
 # Loading functions
 # --------------------------------------------------------------------
-def load_registry(folder_path="data/"):
-    """Load all registry categories from JSON files in a folder."""
-    files = {
-        "buildings.json": "buildings",
-        "defense_units.json": "defense_units",
-        "planet_types.json": "planets",
-        "planet_features.json": "planet_features",
-        "resources.json": "resources",
-        "offense_units.json":"offense_units",
-        "ships.json":"ships"
-    }
+REGISTRY_FILES = {
+    "buildings.json": "buildings",
+    "defense_units.json": "defense_units",
+    "planet_types.json": "planets",
+    "planet_features.json": "planet_features",
+    "resources.json": "resources",
+    "offense_units.json":"offense_units",
+    "ships.json":"ships"
+}
 
-    REGISTRY["all"].clear()
 
-    for filename, category in files.items():
+def read_registry_files(folder_path="data/"):
+    """Read the registry JSON files into {category: {id: entry}} without touching REGISTRY."""
+    tables = {}
+    for filename, category in REGISTRY_FILES.items():
         path = os.path.join(folder_path, filename)
         if not os.path.exists(path):
             log.warning(f"[Registry] Missing file: {filename}")
@@ -47,15 +118,32 @@ def load_registry(folder_path="data/"):
         if not isinstance(data, list):
             raise ValueError(f"{filename} must contain a list of entries, not a dict")
 
+        table = tables.setdefault(category, {})
         for item in data:
             if "id" not in item:
                 raise ValueError(f"[Registry] Entry missing 'id' in {filename}: {item}")
-            REGISTRY[category][item["id"]] = item
-            REGISTRY["all"][item["id"]] = item
-
+            table[item["id"]] = item
             log.debug(f"[Registry] Loaded {item['id']} → {category}")
+    return tables
+
+
+def registry_files_mtime(folder_path="data/"):
+    """Latest modification time of the registry files (for file watching)."""
+    paths = [os.path.join(folder_path, filename) for filename in REGISTRY_FILES]
+    return max((os.path.getmtime(p) for p in paths if os.path.exists(p)), default=0.0)
+
+
+def load_registry(folder_path="data/"):
+    """Load all registry categories from JSON files in a folder."""
+    tables = read_registry_files(folder_path)
+
+    REGISTRY["all"].clear()
+    for category, table in tables.items():
+        REGISTRY.setdefault(category, {}).update(table)
+        REGISTRY["all"].update(table)
 
     validate_registry()
+    _bump_registry_version()
     log.info(f"[Registry] Loaded registry with {len(REGISTRY['all'])} total entries.")
 
 
@@ -112,9 +200,63 @@ def registry_from_dict(data: dict):
         if key != "all":  # rebuild "all" separately
             for id_, item in table.items():
                 REGISTRY["all"][id_] = item
+    _bump_registry_version()
     log.info(f"[Registry] Rehydrated from network with {len(REGISTRY['all'])} entries.")
 
 
+# --------------------------------------------------------------------
+# Hot reload / deltas
+# --------------------------------------------------------------------
+def registry_diff(new_tables):
+    """
+    Entries of `new_tables` ({category: {id: entry}}) that differ from
+    REGISTRY: {"changed": {category: {id: entry}}, "removed": {category: [ids]}}.
+    """
+    changed, removed = {}, {}
+    for category, table in new_tables.items():
+        current = REGISTRY.get(category, {})
+        updates = {id_: entry for id_, entry in table.items() if current.get(id_) != entry}
+        if updates:
+            changed[category] = updates
+        gone = [id_ for id_ in current if id_ not in table]
+        if gone:
+            removed[category] = gone
+    return {"changed": changed, "removed": removed}
+
+
+def apply_registry_delta(delta):
+    """Apply a registry_diff result in place (REGISTRY tables keep their identity)."""
+    for category, updates in delta.get("changed", {}).items():
+        table = REGISTRY.setdefault(category, {})
+        table.update(updates)
+        REGISTRY["all"].update(updates)
+    for category, ids in delta.get("removed", {}).items():
+        table = REGISTRY.get(category, {})
+        for id_ in ids:
+            table.pop(id_, None)
+            REGISTRY["all"].pop(id_, None)
+    _bump_registry_version()
+    log.info(
+        f"[Registry] Applied delta: {sum(len(t) for t in delta.get('changed', {}).values())} changed, "
+        f"{sum(len(ids) for ids in delta.get('removed', {}).values())} removed (version {REGISTRY_VERSION})"
+    )
+
+
+def reload_registry(folder_path="data/"):
+    """
+    Re-read the JSON files and apply what changed. Returns the delta, or
+    None if nothing changed. Raises if a file can't be parsed, in which
+    case the current registry is left untouched.
+    """
+    delta = registry_diff(read_registry_files(folder_path))
+    if not delta["changed"] and not delta["removed"]:
+        log.info("[Registry] Reload: no changes.")
+        return None
+    apply_registry_delta(delta)
+    validate_registry()
+    return delta
+
+
 # --------------------------------------------------------------------
 # Optional: Merge registry (for mods / DLC)
 # --------------------------------------------------------------------
@@ -126,4 +268,5 @@ def merge_registry(extra_registry: dict):
         for id_, entry in items.items():
             REGISTRY[cat][id_] = entry
             REGISTRY["all"][id_] = entry
+    _bump_registry_version()
     log.info("[Registry] Merged external registry data.")
@@ -0,0 +1,195 @@
+from types import MappingProxyType
+from core.logger_setup import get_logger
+
+log = get_logger("RegistryRecords")
+
+_EMPTY = MappingProxyType({})
+
+
+def _frozen(value):
+    """Read-only copy of a JSON value (dicts become mapping proxies, lists tuples)."""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _frozen(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_frozen(v) for v in value)
+    return value
+
+
+# --------------------------------------------------------------------
+# Typed records
+# --------------------------------------------------------------------
+class RegistryRecord:
+    """
+    Immutable, typed view of one registry entry. Subclasses add the fields
+    of their category; `raw` keeps the original dict for code that still
+    needs it (packets, BuildOrder.data).
+    """
+    __slots__ = ("id", "name", "category", "description", "tags", "raw")
+
+    def __init__(self, data, category):
+        self._set("id", data["id"])
+        self._set("name", data.get("name", data["id"]))
+        self._set("category", data.get("category", category))
+        self._set("description", data.get("description", ""))
+        self._set("tags", tuple(data.get("tags", None) or ()))
+        self._set("raw", data)
+
+    def _set(self, field, value):
+        object.__setattr__(self, field, value)
+
+    def __setattr__(self, field, value):
+        raise AttributeError(f"{type(self).__name__} is read-only (reload the registry instead)")
+
+    def __delattr__(self, field):
+        raise AttributeError(f"{type(self).__name__} is read-only (reload the registry instead)")
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.id}>"
+
+
+class BuildingRecord(RegistryRecord):
+    __slots__ = ("type", "slot_type", "cost", "upkeep", "resource_bonus", "defense_value", "production_points",
+                 "construction_priority", "base_yield", "max_per_planet", "unique")
+
+    def __init__(self, data, category="buildings"):
+        super().__init__(data, category)
+        self._set("type", data.get("type", ""))
+        self._set("slot_type", data.get("slot_type", ""))
+        self._set("cost", _frozen(data.get("cost", {})))
+        self._set("upkeep", _frozen(data.get("upkeep", {})))
+        self._set("resource_bonus", _frozen(data.get("resource_bonus", {})))
+        self._set("defense_value", data.get("defense_value", 0))
+        self._set("production_points", data.get("production_points", 0))
+        self._set("construction_priority", data.get("construction_priority", 0))
+        self._set("base_yield", data.get("base_yield", 1))
+        self._set("max_per_planet", data.get("max_per_planet", 0))
+        self._set("unique", data.get("unique", False))
+
+
+class UnitRecord(RegistryRecord):
+    """Defense/offense units. defense_value is stats.defense (older entries had a top-level defense_value)."""
+    __slots__ = ("layer", "icon", "stats", "offense", "defense_value", "hp", "cost", "upkeep", "power_use",
+                 "storage_space")
+
+    def __init__(self, data, category="defense_units"):
+        super().__init__(data, category)
+        stats = data.get("stats", {})
+        self._set("layer", (data.get("layer") or "").upper() or None)
+        self._set("icon", data.get("icon"))
+        self._set("stats", _frozen(stats))
+        self._set("offense", stats.get("offense", 0))
+        self._set("defense_value", stats.get("defense", data.get("defense_value", 0)))
+        self._set("hp", stats.get("hp", 0))
+        self._set("cost", _frozen(data.get("cost", {})))
+        self._set("upkeep", _frozen(data.get("upkeep", {})))
+        self._set("power_use", data.get("power_use", 0))
+        self._set("storage_space", data.get("storage_space", 0))
+
+
+class ResourceRecord(RegistryRecord):
+    __slots__ = ("resource_type", "refinement_level", "refines_to", "inputs", "yield_amount", "icon")
+
+    def __init__(self, data, category="resources"):
+        super().__init__(data, category)
+        self._set("resource_type", data.get("resource_type", "generic"))
+        self._set("refinement_level", data.get("refinement_level", "raw"))
+        self._set("refines_to", data.get("refines_to"))
+        self._set("inputs", _frozen(data.get("inputs") or {}))
+        self._set("yield_amount", float(data.get("yield", 1.0)) or 1.0)
+        self._set("icon", data.get("resource_icon"))
+
+
+class PlanetTypeRecord(RegistryRecord):
+    __slots__ = ("rarity", "icon", "rotation_variants", "possible_climates", "defense_base_bonus",
+                 "environment", "bonuses", "colonization")
+
+    def __init__(self, data, category="planets"):
+        super().__init__(data, category)
+        self._set("rarity", data.get("rarity", "common"))
+        self._set("icon", data.get("icon"))
+        self._set("rotation_variants", int(data.get("rotation_variants", 0)))
+        self._set("possible_climates", tuple(data.get("possible_climates", ())))
+        self._set("defense_base_bonus", data.get("defense_base_bonus", 1.0))
+        self._set("environment", _frozen(data.get("environment", {})))
+        self._set("bonuses", _frozen(data.get("bonuses", {})))
+        self._set("colonization", _frozen(data.get("colonization", {})))
+
+
+class PlanetFeatureRecord(RegistryRecord):
+    __slots__ = ("planet_type", "effects")
+
+    def __init__(self, data, category="planet_features"):
+        super().__init__(data, category)
+        self._set("planet_type", data.get("planet_type"))
+        self._set("effects", _frozen(data.get("effects", {})))
+
+
+RECORD_TYPES = {
+    "buildings": BuildingRecord,
+    "defense_units": UnitRecord,
+    "offense_units": UnitRecord,
+    "resources": ResourceRecord,
+    "planets": PlanetTypeRecord,
+    "planet_features": PlanetFeatureRecord,
+}
+
+
+# --------------------------------------------------------------------
+# Compiled registry
+# --------------------------------------------------------------------
+class CompiledRegistry:
+    """
+    Typed records of every registry entry plus derived indexes, built once
+    per registry load/merge and tagged with that load's version:
+      - records[category][id]
+      - category_of[id]: which category an item lives in
+      - features_by_planet_type[planet_type]: PlanetFeatureRecords
+      - resources_by_type[resource_type] / resources_by_tier[refinement_level]: resource IDs
+      - buildings_by_slot_type[slot_type]: building IDs
+    """
+    def __init__(self, registry, version):
+        self.version = version
+        self.records = {}
+        self.category_of = {}
+        for category, table in registry.items():
+            if category == "all":
+                continue
+            record_type = RECORD_TYPES.get(category, RegistryRecord)
+            records = {}
+            for item_id, data in table.items():
+                try:
+                    records[item_id] = record_type(data, category)
+                except (KeyError, TypeError, ValueError) as e:
+                    log.warning(f"[Registry] Skipping malformed {category}:{item_id} ({e})")
+                    continue
+                self.category_of[item_id] = category
+            self.records[category] = records
+
+        self.features_by_planet_type = {}
+        for feature in self.records.get("planet_features", {}).values():
+            self.features_by_planet_type.setdefault(feature.planet_type, []).append(feature)
+
+        self.resources_by_type = {}
+        self.resources_by_tier = {}
+        for resource in self.records.get("resources", {}).values():
+            self.resources_by_type.setdefault(resource.resource_type, []).append(resource.id)
+            self.resources_by_tier.setdefault(resource.refinement_level, []).append(resource.id)
+
+        self.buildings_by_slot_type = {}
+        for building in self.records.get("buildings", {}).values():
+            self.buildings_by_slot_type.setdefault(building.slot_type, []).append(building.id)
+
+    def get(self, item_id, category=None):
+        """Record of an item, optionally only if it belongs to `category`; None if unknown."""
+        found = self.category_of.get(item_id)
+        if found is None or (category is not None and found != category):
+            return None
+        return self.records[found][item_id]
+
+    def table(self, category):
+        """{id: record} of a category (empty mapping if the category is unknown)."""
+        return self.records.get(category, _EMPTY)
+
+    def __repr__(self):
+        counts = ", ".join(f"{cat}={len(recs)}" for cat, recs in self.records.items())
+        return f"<CompiledRegistry v{self.version} {counts}>"
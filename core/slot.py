@@ -2,21 +2,201 @@ from core.logger_setup import get_logger
 
 log = get_logger("Slot")
 
+# Slot type / status names <-> the byte codes stored in a SlotArray.
+# Types from the registry that aren't listed get a code on first use.
+SLOT_TYPES = ["empty", "farm", "mine", "refine", "industry", "energy", "science"]
+SLOT_STATUSES = ("empty", "under_construction", "built")
+_TYPE_CODES = {t: i for i, t in enumerate(SLOT_TYPES)}
+_STATUS_CODES = {s: i for i, s in enumerate(SLOT_STATUSES)}
+
+# Flag byte layout
+_ACTIVE = 0x01
+_SENT_KNOWN = 0x02    # _last_sent has been set
+_SENT_ACTIVE = 0x04   # value of _last_sent
+_STATUS_SHIFT = 3
+
+
+def _type_code(slot_type):
+    code = _TYPE_CODES.get(slot_type)
+    if code is None:
+        code = len(SLOT_TYPES)
+        if code > 255:
+            raise ValueError(f"Too many slot types, can't add '{slot_type}'")
+        SLOT_TYPES.append(slot_type)
+        _TYPE_CODES[slot_type] = code
+    return code
+
+
+class SlotArray:
+    """
+    Every slot of a planet packed into one bytearray, two bytes per slot
+    (type code, flags: active / last sent / status). Buildings are kept in a
+    dict by index, only for slots that hold one.
+
+    Behaves like the list of Slot it replaces: indexing and iteration return
+    Slot views reading and writing this array.
+    """
+    __slots__ = ("_state", "_buildings")
+
+    def __init__(self, count=0):
+        self._state = bytearray(bytes((0, _ACTIVE)) * count)
+        self._buildings = None   # index -> Building, created on first building
+
+    @classmethod
+    def from_dicts(cls, slot_dicts, building_lookup=None):
+        slots = cls()
+        for data in slot_dicts:
+            slots.append(Slot.from_dict(data, building_lookup))
+        return slots
+
+    def __len__(self):
+        return len(self._state) // 2
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [Slot._view(self, i) for i in range(*index.indices(len(self)))]
+        count = len(self)
+        if index < 0:
+            index += count
+        if not 0 <= index < count:
+            raise IndexError("slot index out of range")
+        return Slot._view(self, index)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield Slot._view(self, i)
+
+    def index(self, slot):
+        if isinstance(slot, Slot) and slot._array is self:
+            return slot._index
+        raise ValueError(f"{slot!r} is not in this planet's slots")
+
+    def __contains__(self, slot):
+        return isinstance(slot, Slot) and slot._array is self
+
+    def append(self, slot=None):
+        """Add a slot, copying the state of `slot` (a new empty slot if None)."""
+        index = len(self)
+        self._state += bytes((0, _ACTIVE))
+        if slot is not None:
+            self._state[2 * index:2 * index + 2] = slot._array._state[2 * slot._index:2 * slot._index + 2]
+            self._set_building(index, slot.building)
+
+    # ---------------- Packed fields ----------------
+    def get_type(self, index):
+        return SLOT_TYPES[self._state[2 * index]]
+
+    def set_type(self, index, slot_type):
+        self._state[2 * index] = _type_code(slot_type)
+
+    def _get_building(self, index):
+        return self._buildings.get(index) if self._buildings else None
+
+    def _set_building(self, index, building):
+        if building is None:
+            if self._buildings:
+                self._buildings.pop(index, None)
+            return
+        if self._buildings is None:
+            self._buildings = {}
+        self._buildings[index] = building
+
+    def __repr__(self):
+        return f"SlotArray({list(self)})"
+
+
 class Slot:
+    """
+    One slot of a planet: a view (array, index) into a SlotArray. A Slot
+    built directly (Slot(), Slot.from_dict) owns a one-slot array until it
+    is appended to a planet's SlotArray, which copies its state.
+    """
+    __slots__ = ("_array", "_index")
+
     def __init__(self, slot_type="empty", building=None):
         """
         :param slot_type: "farm", "mine", "refine", "industry", "energy", "science" or "empty"
         :param building: Building object currently in the slot (under construction or completed)
         """
+        self._array = SlotArray(1)
+        self._index = 0
         self.type = slot_type
         self.building = building  # None if empty
         self.status = "empty" if building is None else ("under_construction" if building.under_construction else "built")
         self.active = True     # new flag for active/inactive
-    
+
+    @classmethod
+    def _view(cls, array, index):
+        slot = cls.__new__(cls)
+        slot._array = array
+        slot._index = index
+        return slot
+
+    # --- Packed state ---
+    @property
+    def type(self):
+        return self._array.get_type(self._index)
+
+    @type.setter
+    def type(self, slot_type):
+        self._array.set_type(self._index, slot_type)
+
+    @property
+    def building(self):
+        return self._array._get_building(self._index)
+
+    @building.setter
+    def building(self, building):
+        self._array._set_building(self._index, building)
+
+    @property
+    def status(self):
+        return SLOT_STATUSES[self._array._state[2 * self._index + 1] >> _STATUS_SHIFT]
+
+    @status.setter
+    def status(self, status):
+        i = 2 * self._index + 1
+        flags = self._array._state[i] & ((1 << _STATUS_SHIFT) - 1)
+        self._array._state[i] = flags | (_STATUS_CODES[status] << _STATUS_SHIFT)
+
+    @property
+    def active(self):
+        return bool(self._array._state[2 * self._index + 1] & _ACTIVE)
+
+    @active.setter
+    def active(self, active):
+        self._set_flag(_ACTIVE, active)
+
+    @property
+    def _last_sent(self):
+        """Active flag last sent to the client (Planet.compute_deltas), None if never sent."""
+        flags = self._array._state[2 * self._index + 1]
+        return bool(flags & _SENT_ACTIVE) if flags & _SENT_KNOWN else None
+
+    @_last_sent.setter
+    def _last_sent(self, active):
+        self._set_flag(_SENT_KNOWN, True)
+        self._set_flag(_SENT_ACTIVE, active)
+
+    def _set_flag(self, flag, on):
+        i = 2 * self._index + 1
+        if on:
+            self._array._state[i] |= flag
+        else:
+            self._array._state[i] &= ~flag & 0xFF
+
+    def __eq__(self, other):
+        if not isinstance(other, Slot):
+            return NotImplemented
+        return self._array is other._array and self._index == other._index
+
+    def __hash__(self):
+        return hash((id(self._array), self._index))
+
     # --- Helpers ---
     def is_empty(self):
         return self.building is None
-    
+
     def clear(self):
         """Reset this slot to empty state."""
         log.info(f"[Slot] Clearing slot ({self.type}).")
@@ -24,7 +204,7 @@ class Slot:
         self.type = "empty"
         self.status = "empty"
         self.active = True
-    
+
     def toggle_active(self):
         """Toggle slot active/inactive."""
         self.active = not self.active
@@ -36,12 +216,13 @@ class Slot:
         Serialize slot state for sending to client.
         Only include minimal info needed for GUI.
         """
+        building = self.building
         return {
             "type": self.type,
             "status": self.status,
             "active": self.active,
-            "has_building": self.building is not None,
-            "building_name": getattr(self.building, "name", None)
+            "has_building": building is not None,
+            "building_name": getattr(building, "name", None)
         }
 
     @classmethod
@@ -58,4 +239,4 @@ class Slot:
         return slot
 
     def __repr__(self):
-        return f"Slot(type={self.type}, status={self.status}, active={self.active}, building={self.building})"
\ No newline at end of file
+        return f"Slot(type={self.type}, status={self.status}, active={self.active}, building={self.building})"
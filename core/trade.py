@@ -1,46 +1,173 @@
 import uuid
+from collections import defaultdict
+import numpy as np
+from core.galaxy.hexgrid import hex_distance
+
+TRADE_BASE_VALUE = 10.0        # per unit moved, could depend on good type
+CAPACITY_PER_DISTANCE = 0.1    # ship capacity needed per unit per distance
+MAX_TRADE_DISTANCE = 1000.0    # distance at which the distance factor bottoms out
+MIN_DISTANCE_FACTOR = 0.1
+
+
+def trade_efficiency(amount, distance, capacity):
+    """
+    Vectorized route efficiency (works on scalars or NumPy arrays):
+    capacity coverage of the required transport times a distance penalty.
+    """
+    amount = np.asarray(amount, dtype=np.float64)
+    distance = np.asarray(distance, dtype=np.float64)
+    capacity = np.asarray(capacity, dtype=np.float64)
+    required = amount * distance * CAPACITY_PER_DISTANCE
+    # Nothing to carry: the route is fully covered
+    ratio = np.divide(capacity, required, out=np.ones_like(required), where=required > 0)
+    np.minimum(ratio, 1.0, out=ratio)
+    distance_factor = np.maximum(MIN_DISTANCE_FACTOR, 1.0 - distance / MAX_TRADE_DISTANCE)
+    return ratio * distance_factor
+
 
 class TradeRoute:
-    def __init__(self, origin, destination, good, amount, route_type="commercial"):
+    """
+    A route between two planets. Once added to a TradeManager its
+    efficiency/profit live in the manager's arrays; changes to amount,
+    ships or endpoints must go through the properties/methods below so the
+    route gets flagged for recomputation.
+    """
+    def __init__(self, origin, destination, good, amount, route_type="commercial", galaxy=None):
         self.id = str(uuid.uuid4())
         self.origin = origin      # Planet
         self.destination = destination  # Planet
         self.good = good          # e.g. "food" or "consumer_goods"
-        self.amount = amount      # units/turn
+        self._amount = amount     # units/turn
         self.route_type = route_type
-        self.assigned_ships = []  # list of Ship
-        self.efficiency = 1.0
-        self.last_profit = 0.0
+        self.galaxy = galaxy      # GalaxyMap, for path-based distances
+        self.assigned_ships = []  # list of Ship, use assign_ship/unassign_ship
+        self.capacity = 0.0       # running total of assigned ship capacity
+        self._efficiency = 1.0
+        self._last_profit = 0.0
+        self._manager = None      # TradeManager holding this route's row
+        self._slot = -1
         self.distance = self._compute_distance()
 
     def _compute_distance(self):
-        """Roughly calculate distance or use map distance."""
+        """
+        Travel cost along the cheapest hex path when the galaxy is known,
+        else straight hex distance (minimum 1 for same-system routes).
+        """
+        origin = getattr(self.origin, "hex_coords", None)
+        destination = getattr(self.destination, "hex_coords", None)
+        if origin is not None and destination is not None:
+            if self.galaxy is not None:
+                cost = self.galaxy.travel_cost(origin, destination)
+                if cost is not None:
+                    return max(1.0, cost)
+            return float(max(1, hex_distance(origin, destination)))
         if hasattr(self.origin, "pos") and hasattr(self.destination, "pos"):
             dx = self.origin.pos[0] - self.destination.pos[0]
             dy = self.origin.pos[1] - self.destination.pos[1]
             return (dx**2 + dy**2) ** 0.5
         return 1.0  # fallback
 
+    # ---------------- Tracked state ----------------
+    @property
+    def amount(self):
+        return self._amount
+
+    @amount.setter
+    def amount(self, value):
+        self._amount = value
+        self._changed()
+
+    @property
+    def efficiency(self):
+        if self._manager is not None:
+            return float(self._manager.efficiency[self._slot])
+        return self._efficiency
+
+    @property
+    def last_profit(self):
+        if self._manager is not None:
+            return float(self._manager.profit[self._slot])
+        return self._last_profit
+
+    def assign_ship(self, ship):
+        self.assigned_ships.append(ship)
+        self.capacity += ship.capacity
+        ship.route = self
+        self._changed()
+
+    def unassign_ship(self, ship):
+        if ship not in self.assigned_ships:
+            return
+        self.assigned_ships.remove(ship)
+        self.capacity -= ship.capacity
+        ship.route = None
+        self._changed()
+
+    def refresh_distance(self):
+        """Recompute the distance (endpoints moved or the map changed)."""
+        self.distance = self._compute_distance()
+        self._changed()
+
+    def _changed(self):
+        if self._manager is not None:
+            self._manager.mark_dirty(self)
+
+    # ---------------- Standalone evaluation ----------------
     def update_efficiency(self):
         """Compute efficiency based on ships, distance, and possible modifiers."""
-        total_capacity = sum(ship.capacity for ship in self.assigned_ships)
-        required_capacity = self.amount * self.distance * 0.1
-        capacity_ratio = min(total_capacity / required_capacity, 1.0)
-        distance_factor = max(0.1, 1.0 - (self.distance / 1000.0))
-        self.efficiency = capacity_ratio * distance_factor
+        if self._manager is not None:
+            self._manager.update_all_routes()
+            return
+        self._efficiency = float(trade_efficiency(self._amount, self.distance, self.capacity))
 
     def calculate_profit(self):
         """Estimate per-turn profit or value."""
-        base_value = 10  # could depend on good type
-        self.last_profit = base_value * self.amount * self.efficiency
+        if self._manager is None:
+            self._last_profit = TRADE_BASE_VALUE * self._amount * self._efficiency
         return self.last_profit
 
+
 class TradeManager:
-    def __init__(self):
+    """
+    Holds every route in parallel NumPy arrays (one row per route) so a tick
+    evaluates all of them in one vectorized pass. Only rows flagged dirty
+    (ships, amount or endpoints changed) are recomputed.
+    """
+    def __init__(self, initial_capacity=64):
         self.routes = {}  # id -> TradeRoute
+        self.routes_by_good = defaultdict(dict)  # good -> {id: TradeRoute}
+        self.listeners = []  # callables(route) told about every route change (e.g. SupplyNetwork)
+        self._rows = []   # row -> TradeRoute
+        self._allocate(initial_capacity)
+
+    def _allocate(self, size):
+        def grow(old, dtype, fill=0):
+            new = np.full(size, fill, dtype=dtype)
+            if old is not None:
+                new[:len(old)] = old
+            return new
+        self.origin_ids = grow(getattr(self, "origin_ids", None), np.int64, -1)
+        self.destination_ids = grow(getattr(self, "destination_ids", None), np.int64, -1)
+        self.amount = grow(getattr(self, "amount", None), np.float64)
+        self.distance = grow(getattr(self, "distance", None), np.float64)
+        self.capacity = grow(getattr(self, "capacity", None), np.float64)
+        self.efficiency = grow(getattr(self, "efficiency", None), np.float64)
+        self.profit = grow(getattr(self, "profit", None), np.float64)
+        self.dirty = grow(getattr(self, "dirty", None), np.bool_)
 
+    def __len__(self):
+        return len(self._rows)
+
+    # ---------------- Route lifecycle ----------------
     def add_route(self, route):
+        if len(self._rows) == len(self.amount):
+            self._allocate(len(self.amount) * 2)
+        route._manager = self
+        route._slot = len(self._rows)
+        self._rows.append(route)
         self.routes[route.id] = route
+        self.routes_by_good[route.good][route.id] = route
+        self.mark_dirty(route)
         route.origin.trade_routes.append(route)
         route.destination.trade_routes.append(route)
 
@@ -48,13 +175,77 @@ class TradeManager:
         route = self.routes.pop(route_id, None)
         if not route:
             return
+        self.routes_by_good[route.good].pop(route_id, None)
+        # Keep the last computed values on the detached route
+        slot = route._slot
+        route._efficiency = float(self.efficiency[slot])
+        route._last_profit = float(self.profit[slot])
+        # Swap-remove: the last row takes the freed slot
+        last = len(self._rows) - 1
+        if slot != last:
+            moved = self._rows[last]
+            self._rows[slot] = moved
+            moved._slot = slot
+            for array in (self.origin_ids, self.destination_ids, self.amount, self.distance,
+                          self.capacity, self.efficiency, self.profit, self.dirty):
+                array[slot] = array[last]
+        self._rows.pop()
+        self.dirty[last] = False
+        route._manager = None
+        route._slot = -1
+        self._notify(route)
         if route in route.origin.trade_routes:
             route.origin.trade_routes.remove(route)
         if route in route.destination.trade_routes:
             route.destination.trade_routes.remove(route)
 
+    def reroute(self, route_id, origin=None, destination=None):
+        """Move a route's endpoints; its distance is recomputed."""
+        route = self.routes.get(route_id)
+        if not route:
+            return
+        if origin is not None and origin is not route.origin:
+            route.origin.trade_routes.remove(route)
+            route.origin = origin
+            origin.trade_routes.append(route)
+        if destination is not None and destination is not route.destination:
+            route.destination.trade_routes.remove(route)
+            route.destination = destination
+            destination.trade_routes.append(route)
+        route.refresh_distance()
+
+    def mark_dirty(self, route):
+        """Copy a route's inputs into its row and flag it for the next tick."""
+        slot = route._slot
+        self.origin_ids[slot] = getattr(route.origin, "global_id", -1)
+        self.destination_ids[slot] = getattr(route.destination, "global_id", -1)
+        self.amount[slot] = route.amount
+        self.distance[slot] = route.distance
+        self.capacity[slot] = route.capacity
+        self.dirty[slot] = True
+        self._notify(route)
+
+    def _notify(self, route):
+        for listener in self.listeners:
+            listener(route)
+
+    # ---------------- Tick ----------------
     def update_all_routes(self):
-        """Called once per turn/tick."""
-        for route in self.routes.values():
-            route.update_efficiency()
-            route.calculate_profit()
+        """
+        Called once per turn/tick. Recomputes efficiency and profit of the
+        dirty routes in one vectorized pass; returns the total profit.
+        """
+        count = len(self._rows)
+        rows = np.flatnonzero(self.dirty[:count])
+        if rows.size:
+            efficiency = trade_efficiency(self.amount[rows], self.distance[rows], self.capacity[rows])
+            self.efficiency[rows] = efficiency
+            self.profit[rows] = TRADE_BASE_VALUE * self.amount[rows] * efficiency
+            self.dirty[rows] = False
+        return float(self.profit[:count].sum())
+
+    def routes_for_planet(self, global_id):
+        """Rows of the routes starting or ending at a planet."""
+        count = len(self._rows)
+        rows = np.flatnonzero((self.origin_ids[:count] == global_id) | (self.destination_ids[:count] == global_id))
+        return [self._rows[i] for i in rows.tolist()]
@@ -0,0 +1,193 @@
+import asyncio
+import json
+import os
+import shlex
+import time
+from server.logging_setup_server import get_logger, set_log_level, log_queue_size
+from server.profiling import TIMINGS
+
+log = get_logger("AdminConsole")
+
+ADMIN_SOCKET = "nexora_admin.sock"   # Unix domain socket, in the server's working directory
+ADMIN_HOST, ADMIN_PORT = "127.0.0.1", 5001   # fallback where Unix sockets aren't available
+
+
+class AdminConsole:
+    """
+    Local-only, line-based admin console for a running GameServer:
+
+        socat - UNIX-CONNECT:nexora_admin.sock     (or: nc 127.0.0.1 5001)
+        > players
+
+    Each line is a command; `help` lists them. Connections are handled on the
+    server's event loop like game clients, and every command only reads
+    state or calls what the periodic jobs already call, so the game keeps
+    ticking while an operator is connected.
+    """
+    def __init__(self, server, path=ADMIN_SOCKET, host=ADMIN_HOST, port=ADMIN_PORT):
+        self.server = server
+        self.path = path
+        self.host = host
+        self.port = port
+        self._listener = None
+
+    async def start(self):
+        if self.path and hasattr(asyncio, "start_unix_server"):
+            if os.path.exists(self.path):
+                os.remove(self.path)   # stale socket from a previous run
+            self._listener = await asyncio.start_unix_server(self.handle_connection, path=self.path)
+            os.chmod(self.path, 0o600)
+            log.info("[Admin] Console listening on %s", self.path)
+        else:
+            self._listener = await asyncio.start_server(self.handle_connection, self.host, self.port)
+            log.info("[Admin] Console listening on %s:%d", self.host, self.port)
+        return self._listener
+
+    async def stop(self):
+        if self._listener is not None:
+            self._listener.close()
+            await self._listener.wait_closed()
+            self._listener = None
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+    async def handle_connection(self, reader, writer):
+        log.info("[Admin] Console session opened")
+        writer.write(b"Nexora admin console, 'help' for commands\n> ")
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                reply = await self.execute(line.decode("utf-8", "replace"))
+                if reply is None:
+                    break
+                writer.write(reply.encode("utf-8") + b"\n> ")
+                await writer.drain()
+        except (ConnectionResetError, BrokenPipeError):
+            pass
+        finally:
+            writer.close()
+            log.info("[Admin] Console session closed")
+
+    async def execute(self, line):
+        """Run one command line and return its output (None closes the session)."""
+        try:
+            words = shlex.split(line)
+        except ValueError as e:
+            return f"error: {e}"
+        if not words:
+            return ""
+        command, args = words[0].lower(), words[1:]
+        if command in ("quit", "exit"):
+            return None
+        method = getattr(self, f"cmd_{command}", None)
+        if not callable(method):
+            return f"Unknown command '{command}', try 'help'"
+        log.info("[Admin] %s %s", command, " ".join(args))
+        try:
+            result = method(*args)
+            if asyncio.iscoroutine(result):
+                result = await result
+        except TypeError as e:
+            return f"error: bad arguments for '{command}' ({e})"
+        except Exception as e:
+            log.exception("[Admin] Command '%s' failed: %s", command, e)
+            return f"error: {e}"
+        return result
+
+    # ---------------- Commands ----------------
+    def cmd_help(self):
+        """help: list commands"""
+        lines = []
+        for name in sorted(dir(self)):
+            if name.startswith("cmd_"):
+                lines.append("  " + (getattr(self, name).__doc__ or name[4:]).strip())
+        lines.append("  quit: close this session")
+        return "\n".join(lines)
+
+    def cmd_players(self):
+        """players: every known player, connected ones marked with *"""
+        connected = self.server.client_for_player
+        lines = []
+        for player in self.server.player_manager.all_players():
+            galaxy = player.galaxy
+            planets = len(galaxy.active_planets()) if galaxy else 0
+            lines.append(f"{'*' if player.id in connected else ' '} {player.id}  {player.name:<20} "
+                         f"colonized planets: {planets}")
+        lines.append(f"{len(connected)} connected / {len(lines)} known")
+        return "\n".join(lines)
+
+    def cmd_planet(self, global_id):
+        """planet <global_id>: dump a planet's state"""
+        try:
+            global_id = int(global_id)   # the grid's planet index is keyed by int IDs
+        except ValueError:
+            return f"usage: planet <global_id> (an integer, got '{global_id}')"
+        for player in self.server.player_manager.all_players():
+            if player.galaxy is None:
+                continue
+            planet = player.galaxy.find_planet(global_id)
+            if planet is not None:
+                state = planet.to_dict()
+                state["owner_player"] = f"{player.name} ({player.id})"
+                return json.dumps(state, indent=2, default=str)
+        return f"No planet with global ID {global_id}"
+
+    def cmd_save(self):
+        """save: save every player and galaxy now"""
+        start = time.perf_counter()
+        self.server.player_manager.save_players()
+        return f"Saved {len(self.server.player_manager.players)} players in {(time.perf_counter() - start) * 1000:.0f} ms"
+
+    def cmd_stats(self):
+        """stats: scheduled tasks, client queues, log queue and section timings"""
+        lines = ["Tasks:"]
+        tasks = sorted(asyncio.all_tasks(), key=lambda task: task.get_name())
+        for task in tasks:
+            coro = task.get_coro()
+            lines.append(f"  {task.get_name():<12} {getattr(coro, '__qualname__', coro)}")
+        lines.append(f"  {len(tasks)} tasks")
+
+        lines.append("Clients:")
+        for player_id, writer in self.server.client_for_player.items():
+            transport = writer.transport
+            buffered = transport.get_write_buffer_size() if transport is not None else 0
+            lock = self.server.client_locks.get(writer)
+            lines.append(f"  {player_id}  write buffer {buffered} B  lock {'held' if lock and lock.locked() else 'free'}")
+        lines.append(f"Log queue: {log_queue_size()} records pending")
+
+        lines.append("Timed sections (count, total ms, mean ms, max ms):")
+        stats = TIMINGS.snapshot()
+        for name, (count, total, longest) in sorted(stats.items(), key=lambda item: item[1][1], reverse=True):
+            lines.append(f"  {name:<32} {count:7d} {total * 1000:10.1f} {total * 1000 / count:8.2f} {longest * 1000:8.1f}")
+        return "\n".join(lines)
+
+    def cmd_profile(self, seconds="10", mode="both"):
+        """profile [seconds] [cprofile|sample|both]: capture into logs/profiles/"""
+        if not self.server.start_profiling(float(seconds), mode):
+            return "A capture is already running"
+        return f"Capturing {seconds} s ({mode}), files go to {self.server.profiler.folder}"
+
+    async def cmd_reload(self):
+        """reload: reload data/*.json and push the delta to clients"""
+        delta = await self.server.reload_registry()
+        if not delta:
+            return "Registry unchanged"
+        changed = sum(len(entries) for entries in delta["changed"].values())
+        removed = sum(len(ids) for ids in delta["removed"].values())
+        return f"Reloaded: {changed} entries changed, {removed} removed"
+
+    def cmd_evict(self, max_idle="0"):
+        """evict [max_idle_s]: drop cold chunks of offline players' galaxies (colonized planets stay)"""
+        connected = self.server.client_for_player
+        evicted = 0
+        for player in self.server.player_manager.all_players():
+            if player.galaxy is not None and player.id not in connected:
+                evicted += player.galaxy.evict_cold_chunks(float(max_idle))
+        return f"Evicted {evicted} chunks"
+
+    def cmd_loglevel(self, subsystem, level):
+        """loglevel <subsystem|root> <LEVEL>: change a logger's level"""
+        set_log_level(subsystem, level)
+        return f"{subsystem} -> {level.upper()}"
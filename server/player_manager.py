@@ -4,6 +4,7 @@ import time
 from pathlib import Path
 from server.logging_setup_server import get_logger
 from core.galaxy.galaxy_map import *
+from core.patents import Patent, PatentIndex
 
 log = get_logger("PlayerManager")
 
@@ -19,6 +20,33 @@ class Player:
         self.tiles_owned = set()
         self.army = []
         self.galaxy_path=galaxy_path
+        self.patents = {}  # patent ID -> Patent owned or licensed
+        self.patent_index = PatentIndex()
+
+    # --------------------------
+    # Patents
+    # --------------------------
+    def grant_patent(self, patent):
+        self.patents[patent.id] = patent
+        self.patent_index.rebuild(self.patents.values())
+        log.info(f"Player '{self.name}' was granted patent {patent.id}")
+
+    def revoke_patent(self, patent_id):
+        """Sold, revoked or lost: the patent stops applying immediately."""
+        if self.patents.pop(patent_id, None) is not None:
+            self.patent_index.rebuild(self.patents.values())
+            log.info(f"Player '{self.name}' lost patent {patent_id}")
+
+    def expire_patents(self, now=None):
+        """Drop expired patents; the index already ignores them, this keeps the save clean."""
+        now = now or time.time()
+        expired = [pid for pid, patent in self.patents.items() if patent.is_expired(now)]
+        for patent_id in expired:
+            del self.patents[patent_id]
+        if expired:
+            self.patent_index.rebuild(self.patents.values())
+            log.info(f"Player '{self.name}': patents expired {expired}")
+        return expired
 
     def to_dict(self):
         return {
@@ -27,12 +55,13 @@ class Player:
             "token": self.token,
             "home_system_id": self.home_system_id,
             "last_seen": self.last_seen,
+            "patents": [p.to_dict() for p in self.patents.values()],
             #Galaxy path is treated separately, see save_players function
         }
 
     @staticmethod
     def from_dict(data):
-        return Player(
+        player = Player(
             player_id=data["id"],
             name=data["name"],
             token=data.get("token"),
@@ -40,6 +69,9 @@ class Player:
             last_seen=data.get("last_seen"),
             galaxy_path=data.get("galaxy_path", None)
         )
+        player.patents = {p["id"]: Patent.from_dict(p) for p in data.get("patents", [])}
+        player.patent_index.rebuild(player.patents.values())
+        return player
 
 
 class PlayerManager:
@@ -141,6 +173,7 @@ class PlayerManager:
         log.debug("Generating new galaxy for new player")
         if galaxy_template:
             player.galaxy = GalaxyMap.from_dict(galaxy_template.to_dict())
+            player.galaxy.global_id = str(uuid.uuid4())  # from_dict keeps the template's ID
             player.home_system_id = player.galaxy.global_id
             #don\t forget to set the protected and owner attribute
             log.info(f"Created new galaxy for player '{player.name}' from template")
@@ -0,0 +1,218 @@
+import asyncio
+import cProfile
+import functools
+import os
+import pstats
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from server.logging_setup_server import get_logger
+
+log = get_logger("Profiler")
+
+PROFILE_DIR = os.path.join("logs", "profiles")
+SLOW_TICK_SECONDS = 0.25    # scheduled job iterations slower than this are logged
+
+
+def now_ms():
+    """Monotonic milliseconds, for stage times sent back to clients (see client.latency)."""
+    return time.perf_counter() * 1000.0
+
+
+# --------------------------------------------------------------------
+# Always-on timings (handle_packet, action_*, scheduled jobs)
+# --------------------------------------------------------------------
+class Timings:
+    """count / total / max seconds per named section."""
+    def __init__(self):
+        self.stats = {}   # name -> [count, total, max]
+
+    def record(self, name, elapsed):
+        entry = self.stats.get(name)
+        if entry is None:
+            self.stats[name] = [1, elapsed, elapsed]
+        else:
+            entry[0] += 1
+            entry[1] += elapsed
+            if elapsed > entry[2]:
+                entry[2] = elapsed
+
+    def snapshot(self):
+        return {name: tuple(entry) for name, entry in self.stats.items()}
+
+    def since(self, snapshot):
+        """Per-section stats accumulated after `snapshot` (max is over the whole run)."""
+        diff = {}
+        for name, (count, total, longest) in self.stats.items():
+            old_count, old_total, _ = snapshot.get(name, (0, 0.0, 0.0))
+            if count > old_count:
+                diff[name] = (count - old_count, total - old_total, longest)
+        return diff
+
+
+TIMINGS = Timings()
+
+
+@contextmanager
+def timing(name, slow=None):
+    """Time a block into TIMINGS; logs a warning when it takes longer than `slow` seconds."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        TIMINGS.record(name, elapsed)
+        if slow is not None and elapsed > slow:
+            log.warning("[Profiler] %s took %.1f ms (budget %.1f ms)", name, elapsed * 1000, slow * 1000)
+
+
+def timed(name=None):
+    """Decorator timing every call of a function or coroutine function into TIMINGS."""
+    def decorate(fn):
+        label = name or fn.__qualname__
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    TIMINGS.record(label, time.perf_counter() - start)
+        else:
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    TIMINGS.record(label, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+# --------------------------------------------------------------------
+# Stack sampler
+# --------------------------------------------------------------------
+class StackSampler(threading.Thread):
+    """Records the stack of one thread (the event loop) every `interval` seconds as collapsed stacks."""
+    def __init__(self, thread_id, interval=0.005):
+        super().__init__(name="StackSampler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(names))] += 1
+            self.samples += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+# --------------------------------------------------------------------
+# Captures
+# --------------------------------------------------------------------
+class Profiler:
+    """
+    Runtime-triggered captures of the live server. A capture runs for N
+    seconds and writes into logs/profiles/:
+      capture_<ts>.pstats     cProfile data (mode "cprofile" or "both")
+      capture_<ts>.collapsed  sampled event-loop stacks, flamegraph.pl /
+                              speedscope format (mode "sample" or "both")
+      capture_<ts>.txt        top functions plus the timed sections
+    """
+    MODES = ("cprofile", "sample", "both")
+
+    def __init__(self, loop_thread_id=None, folder=PROFILE_DIR):
+        self.loop_thread_id = loop_thread_id or threading.get_ident()
+        self.folder = folder
+        self.active = None   # running capture: dict, or None
+        self.last_report = None
+
+    def start(self, seconds=10.0, mode="both", interval=0.005):
+        """Start a capture; it stops by itself after `seconds`. Returns False if one is already running."""
+        if self.active is not None:
+            log.warning("[Profiler] A capture is already running")
+            return False
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown profiling mode '{mode}' (expected one of {self.MODES})")
+        capture = {"mode": mode, "started": time.time(), "timings": TIMINGS.snapshot()}
+        if mode in ("cprofile", "both"):
+            capture["profile"] = cProfile.Profile()
+            capture["profile"].enable()
+        if mode in ("sample", "both"):
+            capture["sampler"] = StackSampler(self.loop_thread_id, interval)
+            capture["sampler"].start()
+        self.active = capture
+        asyncio.get_running_loop().call_later(seconds, self.stop)
+        log.info("[Profiler] Capture started (%s, %g s)", mode, seconds)
+        return True
+
+    def stop(self):
+        """Stop the running capture and write its files; returns the report path."""
+        capture, self.active = self.active, None
+        if capture is None:
+            return None
+        os.makedirs(self.folder, exist_ok=True)
+        base = os.path.join(self.folder, "capture_" + time.strftime("%Y%m%d_%H%M%S", time.localtime(capture["started"])))
+        lines = [f"Capture {capture['mode']}, {time.time() - capture['started']:.1f} s", ""]
+
+        profile = capture.get("profile")
+        if profile is not None:
+            profile.disable()
+            profile.dump_stats(base + ".pstats")
+            stats = pstats.Stats(profile)
+            top = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:25]
+            lines.append("Top functions by cumulative time:")
+            for (filename, line, func), (_, calls, own, cumulative, _) in top:
+                lines.append(f"  {cumulative * 1000:9.1f} ms cum {own * 1000:9.1f} ms own {calls:8d} calls  "
+                             f"{func} ({os.path.basename(filename)}:{line})")
+            lines.append("")
+
+        sampler = capture.get("sampler")
+        if sampler is not None:
+            sampler.stop()
+            with open(base + ".collapsed", "w", encoding="utf-8") as f:
+                for stack, count in sampler.stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+            lines.append(f"{sampler.samples} stack samples of the event loop thread")
+            lines.append("")
+
+        lines.append("Timed sections (count, total ms, mean ms, max ms):")
+        sections = TIMINGS.since(capture["timings"])
+        for name, (count, total, longest) in sorted(sections.items(), key=lambda item: item[1][1], reverse=True):
+            lines.append(f"  {name:<32} {count:7d} {total * 1000:10.1f} {total * 1000 / count:8.2f} {longest * 1000:8.1f}")
+        with open(base + ".txt", "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+        self.last_report = base + ".txt"
+        log.info("[Profiler] Capture written to %s.*", base)
+        return self.last_report
+
+    def install_signal(self, seconds=10.0, mode="both", signum=getattr(signal, "SIGUSR1", None)):
+        """`kill -USR1 <pid>` starts a capture (Unix only)."""
+        if signum is None:
+            log.debug("[Profiler] No SIGUSR1 on this platform, signal trigger disabled")
+            return False
+        try:
+            asyncio.get_running_loop().add_signal_handler(signum, lambda: self.start(seconds, mode))
+        except (NotImplementedError, RuntimeError) as e:
+            log.debug(f"[Profiler] Signal trigger unavailable: {e}")
+            return False
+        log.info("[Profiler] Send SIGUSR1 to pid %d to capture %g s (%s)", os.getpid(), seconds, mode)
+        return True
@@ -2,11 +2,14 @@ import asyncio
 import msgpack
 import uuid
 import time
-from server.logging_setup_server import get_logger
+from server.logging_setup_server import get_logger, player_logger
 from core.registry import *
 from core.galaxy.galaxy_map import GalaxyMap
+from core.recipes import get_recipe_graph
 from core.buildings import BuildingManager
 from server.player_manager import PlayerManager
+from server.profiling import Profiler, timed, timing, now_ms, SLOW_TICK_SECONDS
+from server.admin_console import AdminConsole
 
 log = get_logger("GameServer")
 
@@ -17,6 +20,8 @@ class GameServer:
         self.client_for_player = {}  # maps player.id → writer
         self.galaxy = None
         self.building_manager = BuildingManager()
+        self.profiler = None   # created in start_server, on the event loop thread
+        self.admin_console = None
         
 
     async def handle_client(self, reader, writer):
@@ -46,7 +51,7 @@ class GameServer:
         writer.write(len(packed_ack).to_bytes(4, "big") + packed_ack)
         await writer.drain()
 
-        log.info(f"Player '{player.name}' logged in successfully.")
+        player_logger(log, player).info("Player '%s' logged in successfully.", player.name)
 
         # --- Associate player with this connection ---
         self.client_for_player[player.id] = writer
@@ -85,9 +90,10 @@ class GameServer:
                 raw_len = await reader.readexactly(4)
                 msg_len = int.from_bytes(raw_len, "big")
                 data = await reader.readexactly(msg_len)
+                received_at = now_ms()
                 packet = msgpack.unpackb(data, raw=False)
 
-                await self.handle_packet(packet, writer)
+                await self.handle_packet(packet, writer, received_at)
         except asyncio.IncompleteReadError:
             log.info(f"Client {addr} disconnected.")
         except Exception as e:
@@ -105,40 +111,50 @@ class GameServer:
     # ===============================
     # Dispatcher
     # ===============================
-    async def handle_packet(self, packet, writer):
+    @timed("handle_packet")
+    async def handle_packet(self, packet, writer, received_at=None):
         packet_type = packet.get("type")
 
         if packet_type == "planet_action":
-            await self.handle_planet_action(packet, writer)
+            await self.handle_planet_action(packet, writer, received_at)
+        elif packet_type == "ping":
+            await self.send_pong(packet, writer)
         else:
             log.warning(f"Unknown packet type: {packet_type}")
 
     # ===============================
     # Planet Action Handler
     # ===============================
-    async def handle_planet_action(self, packet, writer):
+    async def handle_planet_action(self, packet, writer, received_at=None):
+        # Stage times (server clock, ms) returned on the ack for client-side latency breakdowns
+        timing = {"recv": received_at or now_ms()}
         action = packet.get("action")
         planet_gloabl_id = packet.get("planet_global_id")
         data = packet.get("data")
         player_id = packet.get("player_id")
 
-        log.info(f"Received planet action '{action}' for planet ID (gloabl ID {planet_gloabl_id}),  with data {data}.\n player_id : {player_id}")
         player = self.player_manager.get_player_by_id(player_id)
         if not player:
-            log.warning(f"Player with ID {player_id} not found.")
+            log.warning("Player with ID %s not found.", player_id)
             return
+        # Also written to logs/players/player_<id>.log
+        plog = player_logger(log, player)
+        plog.info("Received planet action '%s' for planet (global ID %s) with data %s, player_id : %s",
+                  action, planet_gloabl_id, data, player_id)
         planet = self.find_planet_by_global_id(planet_gloabl_id, player.galaxy)
         if not planet:
-            log.warning(f"Planet with global ID {planet_gloabl_id} not found.")
+            plog.warning("Planet with global ID %s not found.", planet_gloabl_id)
             return
 
         # Apply the requested change
         # --- Dispatch the action ---
+        timing["handler_start"] = now_ms()
         try:
             self.handle_action(action, data, planet)
         except Exception as e:
-            log.exception(f"Error while handling action '{action}' for planet {planet.name}: {e}")
+            plog.exception("Error while handling action '%s' for planet %s: %s", action, planet.name, e)
             return
+        timing["handler_end"] = now_ms()
 
         # Optionally confirm to the client
         ack_packet = {
@@ -147,18 +163,32 @@ class GameServer:
             "planet_global_id": planet.global_id,
             "action": action,
             "new_state": planet.to_dict(),
+            "corr_id": packet.get("corr_id"),
+            "client_ts": packet.get("client_ts"),
+            "timing": timing,
         }
         try:
-            packed = msgpack.packb(ack_packet, use_bin_type=True)
+            timing["enqueue"] = now_ms()
             # TODO : only send to the relevant client
             async with self.client_locks[writer]:
+                timing["write"] = now_ms()
+                packed = msgpack.packb(ack_packet, use_bin_type=True)
                 writer.write(len(packed).to_bytes(4, "big") + packed)
                 await writer.drain()
-            log.debug(f"✅ Sent planet_update ack for planet {planet.name}, global ID {planet.global_id}, local ID {planet.id}")
+            plog.debug("✅ Sent planet_update ack for planet %s, global ID %s, local ID %s (corr %s, %.1f ms in server)",
+                       planet.name, planet.global_id, planet.id, packet.get("corr_id"), timing["write"] - timing["recv"])
         except Exception as e:
-            log.exception(f"Failed to send planet_update for {planet.id}: {e}")
+            plog.exception("Failed to send planet_update for %s: %s", planet.id, e)
             return
 
+    async def send_pong(self, packet, writer):
+        """Answer a client ping right away so it measures the network round trip only."""
+        pong = {"type": "pong", "client_ts": packet.get("client_ts")}
+        packed = msgpack.packb(pong, use_bin_type=True)
+        async with self.client_locks[writer]:
+            writer.write(len(packed).to_bytes(4, "big") + packed)
+            await writer.drain()
+
     def handle_action(self, action, data, planet):
         """
         Dynamically dispatches planet-related actions to corresponding methods.
@@ -170,33 +200,40 @@ class GameServer:
         if callable(method):
             method(planet, data)
         else:
-            log.warning(f"[PlanetHandler] Unknown action '{action}' for planet '{planet.name}'")
+            log.warning("[PlanetHandler] Unknown action '%s' for planet '%s'", action, planet.name)
     
+    @timed("action_set_mode")
     def action_set_mode(self, planet, data):
         planet.mode = data
-        log.info(f"Planet {planet.name} mode changed to {data}")
+        log.info("Planet %s mode changed to %s", planet.name, data)
 
+    @timed("action_apply_resource")
     def action_apply_resource(self, planet, data):
         planet.set_resource(data)
-        log.info(f"Planet {planet.name} current resource modified to {planet.current_resource}")
+        log.info("Planet %s current resource modified to %s", planet.name, planet.current_resource)
 
+    @timed("action_toggle_slot")
     def action_toggle_slot(self, planet, data):
-        planet.data.active = not planet.data.active
-        log.info(f"Planet {planet.name} slot {data} toggled to {planet.data.active}")
+        # data is the slot's index in planet.slots
+        slot = planet.toggle_slot(int(data))
+        log.info("Planet %s slot %s (%s) toggled to %s", planet.name, data, slot.type, slot.active)
 
+    @timed("action_add_slot")
     def action_add_slot(self, planet, data):
         msg = planet.start_build(f"{data}", self.building_manager)
         planet.on_slots_changed(slot_type=data, action="add")
-        log.info(f"Added slot '{data}' on planet {planet.name}")
+        log.info("Added slot '%s' on planet %s", data, planet.name)
 
+    @timed("action_remove_slot")
     def action_remove_slot(self, planet, data):
         msg = planet.remove_building_from_slot(f"{data}")
         planet.on_slots_changed(slot_type=data, action="remove")
-        log.info(f"Removed slot '{data}' on planet {planet.name}")
+        log.info("Removed slot '%s' on planet %s", data, planet.name)
 
+    @timed("action_build_defense_unit")
     def action_build_defense_unit(self, planet, data):
         msg = planet.start_build(data, self.building_manager)
-        log.info(f"{planet.name} started building defense unit ID : {data}")
+        log.info("%s started building defense unit ID : %s", planet.name, data)
 
     # ===============================
     # Helper to locate planets
@@ -210,12 +247,8 @@ class GameServer:
         return None
     
     def find_planet_by_global_id(self, global_id, galaxy):
-        for hex in galaxy.grid:
-            if hex.feature == "star_system" and hex.contents:
-                for planet in hex.contents.planets:
-                    if planet.global_id == global_id:
-                        return planet
-        return None
+        # O(1) through the grid's planet index instead of a full grid scan
+        return galaxy.find_planet(global_id)
 
     # ===============================
     # Periodic updates
@@ -226,15 +259,11 @@ class GameServer:
             delta_packet = {"type": "delta", "slots": [], "resources": []}
             
             # Collect deltas from all colonized planets
-            for hex in self.galaxy.grid:
-                if hex.feature == "star_system":
-                    system=hex.contents
-                    for planet in system.planets:
-                        if planet.is_colonized:
-                            d = planet.compute_deltas()  # should return {"slots": [...], "resources": [...]}
-                            # Make sure slots are converted to dicts if needed
-                            delta_packet["slots"].extend(d.get("slots", []))
-                            delta_packet["resources"].extend(d.get("resources", []))
+            for planet in self.galaxy.active_planets():
+                d = planet.compute_deltas()  # should return {"slots": [...], "resources": [...]}
+                # Make sure slots are converted to dicts if needed
+                delta_packet["slots"].extend(d.get("slots", []))
+                delta_packet["resources"].extend(d.get("resources", []))
 
             # Only send if there are actual changes
             if delta_packet["slots"] or delta_packet["resources"]:
@@ -260,23 +289,21 @@ class GameServer:
     async def update_builds(self):
         while True:
             await asyncio.sleep(1)
-            for player in self.player_manager.all_players():
-                for hex in player.galaxy.grid:
-                    if hex.feature == "star_system" and hex.contents:
-                        for planet in hex.contents.planets:
-                            if planet.is_colonized:
-                                planet.update_build_queue(1, server=self, player=player)
+            with timing("job.update_builds", slow=SLOW_TICK_SECONDS):
+                for player in self.player_manager.all_players():
+                    for planet in player.galaxy.active_planets():
+                        planet.update_build_queue(1, server=self, player=player)
 
     async def update_production(self):
         while True:
             await asyncio.sleep(60)
-            for player in self.player_manager.all_players():
-                # TODO iterate through player owned tiles for less compute costs
-                for hex in player.galaxy.grid:
-                    if hex.feature == "star_system" and hex.contents:
-                        for planet in hex.contents.planets:
-                            if planet.is_colonized:
-                                changed = planet.extract_resources(server=self, player=player)
+            with timing("job.update_production", slow=SLOW_TICK_SECONDS):
+                for player in self.player_manager.all_players():
+                    # Only live chunks can hold colonized planets: untouched space is never visited
+                    for planet in player.galaxy.active_planets():
+                        changed = planet.extract_resources(server=self, player=player)
+                    # Planets only registered their rates above; stocks move here in one array pass
+                    player.galaxy.tick_production()
     
     async def periodic_resource_sync(self):
         """
@@ -290,30 +317,90 @@ class GameServer:
                 if not player.galaxy:
                     continue
 
-                for hex in player.galaxy.grid:
-                    if hex.feature != "star_system" or not hex.contents:
-                        continue
+                planets = player.galaxy.active_planets()
+                # Compute production rates, then apply them to every planet at once
+                changed_planets = {p.global_id for p in planets if p.extract_resources(player=player)}
+                player.galaxy.tick_production()
 
-                    for planet in hex.contents.planets:
-                        if not planet.is_colonized:
-                            continue
+                for planet in planets:
+                    changed = planet.global_id in changed_planets
+                    # --- only send if resources changed significantly ---
+                    if changed or now - planet._last_resource_sync > 600:  # fallback 10-min sync
+                        await self.send_planet_resource_update(player, planet)
+                        planet._last_sent_resources = planet.resources.copy()
+                        planet._last_resource_sync = now
 
-                        # Compute production
-                        changed = planet.extract_resources(player=player)
-
-                        # --- only send if resources changed significantly ---
-                        if changed or now - planet._last_resource_sync > 600:  # fallback 10-min sync
-                            await self.send_planet_resource_update(player, planet)
-                            planet._last_sent_resources = dict(planet.resources)
-                            planet._last_resource_sync = now
+    # ===============================
+    # Registry hot reload
+    # ===============================
+    @timed("reload_registry")
+    async def reload_registry(self):
+        """
+        Re-read data/*.json and push what changed to every connected client
+        as a registry_delta. Planet caches key on the registry version, so
+        they recompute on their next tick. Returns the delta (None if
+        nothing changed or the files couldn't be read).
+        """
+        try:
+            delta = reload_registry()
+        except Exception as e:
+            log.exception(f"[Registry] Reload failed, keeping the current registry: {e}")
+            return None
+        if delta is None:
+            return None
+
+        recipes = get_recipe_graph()
+        if recipes.errors:
+            log.warning(f"Recipe graph has {len(recipes.errors)} problems: {recipes.errors}")
+
+        packet = {"type": "registry_delta", "version": registry_version(), "delta": delta}
+        packed = msgpack.packb(packet, use_bin_type=True)
+        frame = len(packed).to_bytes(4, "big") + packed
+        for writer in list(self.clients):
+            try:
+                async with self.client_locks[writer]:
+                    writer.write(frame)
+                    await writer.drain()
+            except (ConnectionResetError, BrokenPipeError, KeyError):
+                log.warning("Could not push registry delta to a disconnected client")
+        log.info(f"[Registry] Pushed registry delta (version {registry_version()}) to {len(self.clients)} clients")
+        return delta
+
+    async def watch_registry(self, interval=5, folder_path="data/"):
+        """Reload the registry when a data file changes on disk."""
+        last_mtime = registry_files_mtime(folder_path)
+        while True:
+            await asyncio.sleep(interval)
+            with timing("job.watch_registry", slow=SLOW_TICK_SECONDS):
+                mtime = registry_files_mtime(folder_path)
+            if mtime != last_mtime:
+                last_mtime = mtime
+                log.info("[Registry] Data files changed on disk, reloading")
+                await self.reload_registry()
 
     async def periodic_save(self, interval=60):
         while True:
             await asyncio.sleep(interval)
-            self.player_manager.save_players()
+            with timing("job.periodic_save", slow=SLOW_TICK_SECONDS):
+                self.player_manager.save_players()
+                # Saved state is on disk: drop hex objects of chunks nobody looked at recently
+                for player in self.player_manager.all_players():
+                    if player.galaxy:
+                        player.galaxy.evict_cold_chunks()
             log.debug("Periodic save of all players and galaxies completed.")
 
 
+    # ===============================
+    # Profiling
+    # ===============================
+    def start_profiling(self, seconds=10.0, mode="both"):
+        """
+        Capture `seconds` of the live server into logs/profiles/ (see
+        server.profiling.Profiler). mode: "cprofile", "sample" or "both".
+        Also triggered by SIGUSR1.
+        """
+        return self.profiler.start(seconds, mode)
+
     # ===============================
     # Startup
     # ===============================
@@ -323,14 +410,23 @@ class GameServer:
         try:      
             load_registry()
             log.debug("Registry loaded")
+            # Compile the recipe graph now so broken recipes show up at startup
+            recipes = get_recipe_graph()
+            if recipes.errors:
+                log.warning(f"Recipe graph has {len(recipes.errors)} problems: {recipes.errors}")
         except Exception as e:
             log.exception(f"Failed to load the registry, error : {e}")
             return
         log.debug("Instantiate player manager")
         self.player_manager = PlayerManager()
+        self.profiler = Profiler()
+        self.profiler.install_signal()
+        self.admin_console = AdminConsole(self)
+        await self.admin_console.start()
         server = await asyncio.start_server(self.handle_client, "0.0.0.0", 5000)
         print("Server listening on 0.0.0.0:5000")
         asyncio.create_task(self.periodic_save(60))  # save every 60s
+        asyncio.create_task(self.watch_registry())   # hot reload on data/*.json edits
         async with server:
             await asyncio.gather(
                 server.serve_forever(),
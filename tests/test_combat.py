@@ -0,0 +1,110 @@
+"""
+Combat resolver checks on synthetic units (python -m pytest tests/test_combat.py).
+
+The shipped offense units have no stats, so these build their own unit table
+where both sides deal damage.
+"""
+import numpy as np
+from core.combat import CombatUnits, resolve_arrays, _casualties, LAYERS
+from core.defense import DefenseLayer
+from core.registry_records import CompiledRegistry
+
+
+def make_units():
+    registry = {
+        "offense_units": {
+            "fighter": {"id": "fighter", "stats": {"offense": 10, "hp": 10, "defense": 0}},
+        },
+        "defense_units": {
+            "picket": {"id": "picket", "layer": "deep_space", "stats": {"offense": 1, "hp": 5, "defense": 0}},
+            "orbital_gun": {"id": "orbital_gun", "layer": "orbital", "stats": {"offense": 5, "hp": 20, "defense": 100}},
+            "trooper": {"id": "trooper", "layer": "ground", "stats": {"offense": 2, "hp": 10, "defense": 0}},
+        },
+    }
+    return CombatUnits(CompiledRegistry(registry, version=0))
+
+
+def counts(units, **by_id):
+    return units.vector(by_id)
+
+
+def test_toughness_includes_defense():
+    units = make_units()
+    assert units.toughness[units.index["orbital_gun"]] == 40.0   # 20 hp * (1 + 100 / 100)
+    assert units.toughness[units.index["fighter"]] == 10.0
+
+
+def test_same_seed_replays_identically():
+    units = make_units()
+    attackers = np.stack([counts(units, fighter=30), counts(units, fighter=12)])
+    defenders = np.stack([counts(units, picket=10, orbital_gun=6, trooper=8), counts(units, orbital_gun=6, trooper=20)])
+    first = resolve_arrays(attackers, defenders, [7, 99], units)
+    second = resolve_arrays(attackers, defenders, [7, 99], units)
+    for a, b in zip(first, second):
+        assert np.array_equal(a, b)
+
+    # A battle resolves the same alone or inside a batch
+    alone = resolve_arrays(attackers[1:], defenders[1:], [99], units)
+    for batched, single in zip(first, alone):
+        assert np.array_equal(batched[1:], single)
+
+    # Different seeds roll different damage
+    other = resolve_arrays(attackers, defenders, [8, 100], units, max_rounds=1)
+    once = resolve_arrays(attackers, defenders, [7, 99], units, max_rounds=1)
+    assert not all(np.array_equal(a, b) for a, b in zip(other[:2], once[:2]))
+
+
+def test_layer_advances_once_cleared():
+    units = make_units()
+    attackers = counts(units, fighter=50)[None, :]
+    defenders = counts(units, picket=2, trooper=5)[None, :]
+    survivors, defenders_left, outcome, rounds, layer = resolve_arrays(attackers, defenders, [1], units, max_rounds=1)
+
+    assert defenders_left[0, units.index["picket"]] == 0
+    # Ground troops weren't engaged while deep space held
+    assert defenders_left[0, units.index["trooper"]] == 5
+    assert LAYERS[layer[0]] == DefenseLayer.GROUND
+    assert outcome[0] == 0 and rounds[0] == 1
+
+
+def test_attacker_wins_when_every_layer_falls():
+    units = make_units()
+    attackers = counts(units, fighter=60)[None, :]
+    defenders = counts(units, picket=3, orbital_gun=2, trooper=4)[None, :]
+    survivors, defenders_left, outcome, rounds, layer = resolve_arrays(attackers, defenders, [3], units)
+
+    assert outcome[0] == 1
+    assert layer[0] == len(LAYERS)
+    assert defenders_left.sum() == 0
+    assert 0 < survivors[0, units.index["fighter"]] <= 60
+    assert rounds[0] >= 3   # one layer per round at best
+
+
+def test_defender_wins_against_a_weak_attack():
+    units = make_units()
+    attackers = counts(units, fighter=2)[None, :]
+    defenders = counts(units, orbital_gun=10)[None, :]
+    survivors, defenders_left, outcome, _, layer = resolve_arrays(attackers, defenders, [5], units)
+
+    assert outcome[0] == -1
+    assert survivors.sum() == 0
+    assert LAYERS[layer[0]] == DefenseLayer.ORBITAL
+
+
+def test_casualties_carry_damage_over_rounds():
+    toughness = np.array([10.0])
+    targets = np.array([[3.0]])
+    carry = np.zeros((1, 1))
+    rows = np.array([0])
+
+    # 6 damage on 10-toughness units: nobody dies, the damage is remembered
+    killed = _casualties(targets, np.array([6.0]), carry, rows, toughness)
+    assert killed[0, 0] == 0 and carry[0, 0] == 6.0
+
+    # 6 more: one unit dies, 2 carries over
+    killed = _casualties(targets, np.array([6.0]), carry, rows, toughness)
+    assert killed[0, 0] == 1 and carry[0, 0] == 2.0
+
+    # Overkill is capped at the targets left and drops the carry
+    killed = _casualties(np.array([[2.0]]), np.array([500.0]), carry, rows, toughness)
+    assert killed[0, 0] == 2 and carry[0, 0] == 0.0
@@ -0,0 +1,44 @@
+"""
+Ledger-backed refining statistics (python -m pytest tests/test_refining.py).
+
+Uses the shipped data/ registry: metal_bars refine from basaltic_ore (2 per
+unit of yield) and coolant (0.2), at a 0.8 yield.
+"""
+import random
+from core.registry import load_registry
+from core.ledger import ResourceLedger
+from core.planet import Planet
+
+load_registry()
+
+
+def make_refinery():
+    planet = Planet(name="Forge", population=4, rng=random.Random(1))
+    planet.colonize("ore", "metal_bars", mode="refine")
+    planet.update_slot(planet.slots[0], slot_type="refine", status="built")
+    ledger = ResourceLedger()
+    ledger.attach(planet)
+    return planet, ledger
+
+
+def test_refine_statistic_follows_blocked_ticks():
+    planet, ledger = make_refinery()
+    refined = planet.compute_refining(1.0, [])
+    # Registered, but no tick has checked the inputs yet
+    assert planet.statistics["refine"] == 0
+
+    # No inputs in stock: the tick skips the conversion
+    ledger.tick()
+    planet.compute_refining(1.0, [])
+    assert planet.resources.conversion_blocked
+    assert planet.statistics["refine"] == 0
+    assert planet.resources["metal_bars"] == 0
+
+    # Inputs arrive: the next tick refines and the cached call reports it again
+    planet.resources["basaltic_ore"] = 100
+    planet.resources["coolant"] = 10
+    ledger.tick()
+    planet.compute_refining(1.0, [])
+    assert not planet.resources.conversion_blocked
+    assert planet.statistics["refine"] == round(refined, 3)
+    assert planet.resources["metal_bars"] == refined